@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+from corpus import write_corpus
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption(
+        "--corpus-size",
+        type=int,
+        default=2000,
+        help="number of entries in the synthetic benchmark corpus (default: 2000)",
+    )
+
+
+@pytest.fixture(scope="session")
+def corpus_size(request: pytest.FixtureRequest) -> int:
+    return request.config.getoption("corpus_size")
+
+
+@pytest.fixture(scope="session")
+def corpus_path(tmp_path_factory: pytest.TempPathFactory, corpus_size: int) -> Path:
+    path = tmp_path_factory.mktemp("corpus") / f"corpus-{corpus_size}.bib"
+    with path.open("w") as f:
+        write_corpus(corpus_size, f)
+    return path
+
+
+@pytest.fixture(scope="session")
+def corpus_text(corpus_path: Path) -> str:
+    return corpus_path.read_text()
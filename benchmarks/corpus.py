@@ -0,0 +1,223 @@
+"""Generate deterministic synthetic BibTeX corpora for benchmarks.
+
+The distributions of entry types, fields, names and values roughly follow
+real-world bibliographies, including some of the mess that bibfmt cleans up:
+inconsistent month formats, Unicode dashes in page ranges, DOI URLs,
+repeated spaces and all-caps titles.
+
+Run ``python benchmarks/corpus.py 100000 -o big.bib`` to write a file.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Sequence
+    from typing import IO
+
+
+ENTRY_TYPES = {
+    "article": 60,
+    "inproceedings": 20,
+    "book": 6,
+    "incollection": 4,
+    "misc": 4,
+    "phdthesis": 3,
+    "techreport": 3,
+}
+
+FIRST_NAMES = [
+    *("John", "Jane", "Maria", "Wei", "Yuki", "Olga", "Ahmed", "Priya", "Lars"),
+    *("Ana", "Pierre", "Giulia", "Kwame", "Sofia", "Hiroshi", "Li", "Emma"),
+    *("J.", "M.", "A.~B.", "K.", "R. J.", "Jean-Paul", "S{\\o}ren", "Ren{\\'e}"),
+]
+LAST_NAMES = [
+    *("Smith", "Müller", "Wang", "Tanaka", "Ivanova", "Hassan", "Patel", "Berg"),
+    *("Garcia", "Dubois", "Rossi", "Mensah", "Nowak", "Kim", "Nguyen", "Brown"),
+    *('M{\\"u}ller', 'Schr{\\"o}dinger', "Erd{\\H{o}}s", "{\\v{C}}apek", "Ng"),
+    *("{Van Der Berg}", "O'Neil", "Lévy", "Fourier", "Gauss", "Runge", "Kutta"),
+]
+PRELAST_NAMES = ["van", "von", "de", "van der", "de la", "di"]
+LINEAGE_NAMES = ["Jr.", "Sr.", "III"]
+
+TITLE_WORDS = [
+    *("the", "of", "a", "on", "for", "and", "with", "in", "to", "via", "using"),
+    *("analysis", "method", "methods", "model", "models", "learning", "deep"),
+    *("numerical", "stable", "efficient", "fast", "robust", "adaptive", "sparse"),
+    *("approximation", "convergence", "solver", "equations", "networks", "graph"),
+    *("quantum", "dynamics", "system", "systems", "optimization", "estimation"),
+    *("Gaussian", "Bayesian", "Markov", "Krylov", "Newton", "Fourier", "Hilbert"),
+    *("GMRES", "PDE", "ODE", "GPU", "MRI", "DNA", "RNA", "Runge-Kutta"),
+    *("high-order", "non-linear", "$\\mathcal{O}(n)$", "{LaTeX}", "{3D}"),
+]
+JOURNALS = [
+    "Journal of Computational Physics",
+    "SIAM Journal on Numerical Analysis",
+    "Physical Review Letters",
+    "Nature",
+    "Bioinformatics",
+    "ACM Transactions on Mathematical Software",
+    "IEEE Transactions on Pattern Analysis and Machine Intelligence",
+    "Numerische Mathematik",
+    "J. Chem. Phys.",
+]
+CONFERENCES = ["NeurIPS", "ICML", "CVPR", "SC", "ISMB", "STOC", "ICLR"]
+PUBLISHERS = ["Springer", "Elsevier", "Wiley", "Cambridge University Press", "SIAM"]
+MONTHS = [
+    *("jan", "feb", "mar", "apr", "may", "jun"),
+    *("jul", "aug", "sep", "oct", "nov", "dec"),
+]
+DASHES = ["--", "-", "\N{EN DASH}", "\N{EM DASH}", "---", "\N{HYPHEN}"]
+KEYWORDS = ["simulation", "benchmark", "theory", "software", "review", "dataset"]
+
+
+def _person(rng: random.Random) -> str:
+    last = rng.choice(LAST_NAMES)
+    first = rng.choice(FIRST_NAMES)
+    style = rng.random()
+    if style < 0.1:
+        return f"{first} {rng.choice(PRELAST_NAMES)} {last}"
+    if style < 0.15:
+        return f"{last}, {rng.choice(LINEAGE_NAMES)}, {first}"
+    if style < 0.6:
+        return f"{last}, {first}"
+    return f"{first} {last}"
+
+
+def _persons(rng: random.Random) -> str:
+    # Most papers have a few authors, some have very many
+    n = min(int(rng.expovariate(1 / 3)) + 1, 50)
+    return " and ".join(_person(rng) for _ in range(n))
+
+
+def _title(rng: random.Random) -> str:
+    title = " ".join(rng.choices(TITLE_WORDS, k=rng.randint(4, 16)))
+    title = title[0].upper() + title[1:]
+    if rng.random() < 0.05:
+        title = title.upper()
+    if rng.random() < 0.1:
+        title = title.replace(" ", "  ", 2)
+    return title
+
+
+def _month(rng: random.Random) -> str:
+    i = rng.randrange(12)
+    return rng.choice(
+        [
+            MONTHS[i],  # macro
+            f"{{{i + 1}}}",
+            f"{{{MONTHS[i].capitalize()}}}",
+            f"{{{MONTHS[i]}-{MONTHS[(i + 1) % 12]}}}",
+        ]
+    )
+
+
+def _pages(rng: random.Random) -> str:
+    start = rng.randint(1, 3000)
+    if rng.random() < 0.1:
+        return f"{{{start}}}"
+    return f"{{{start}{rng.choice(DASHES)}{start + rng.randint(1, 40)}}}"
+
+
+def _doi(rng: random.Random, i: int) -> str:
+    return f"10.{rng.randint(1000, 9999)}/{rng.choice(['j', 's', 'pr'])}.{i}"
+
+
+def _type_fields(rng: random.Random, entry_type: str) -> list[tuple[str, str]]:
+    """Get the fields specific to `entry_type`."""
+    if entry_type == "article":
+        journal = rng.choice(JOURNALS)
+        # Use the macro defined in `generate`
+        journal = "jcp" if journal == JOURNALS[0] else f"{{{journal}}}"
+        fields = [("journal", journal), ("volume", str(rng.randint(1, 400)))]
+        if rng.random() < 0.7:
+            fields.append(("number", f"{{{rng.randint(1, 12)}}}"))
+        return fields
+    if entry_type in {"inproceedings", "incollection"}:
+        return [("booktitle", f'"Proceedings of {rng.choice(CONFERENCES)}"')]
+    if entry_type == "book":
+        fields = [("editor", f"{{{_persons(rng)}}}")] if rng.random() < 0.3 else []
+        return [*fields, ("publisher", f"{{{rng.choice(PUBLISHERS)}}}")]
+    if entry_type == "phdthesis":
+        return [("school", "{University of Somewhere}")]
+    if entry_type == "techreport":
+        return [("institution", "{Institute of Technology}")]
+    return []
+
+
+def _fields(rng: random.Random, entry_type: str, i: int) -> list[tuple[str, str]]:
+    fields = [
+        ("author", f"{{{_persons(rng)}}}"),
+        ("title", f"{{{_title(rng)}}}"),
+        *_type_fields(rng, entry_type),
+    ]
+    fields.append(("year", str(rng.randint(1950, 2025))))
+    if rng.random() < 0.4:
+        fields.append(("month", _month(rng)))
+    if entry_type != "book" and rng.random() < 0.8:
+        fields.append(("pages", _pages(rng)))
+    if rng.random() < 0.7:
+        doi = _doi(rng, i)
+        fields.append(("doi", f"{{{doi}}}"))
+        if rng.random() < 0.5:
+            prefix = rng.choice(["https://doi.org/", "http://dx.doi.org/"])
+            fields.append(("url", f"{{{prefix}{doi}}}"))
+    elif rng.random() < 0.3:
+        fields.append(("url", f"{{https://example.org/papers/{i}.pdf}}"))
+    if rng.random() < 0.2:
+        fields.append(("abstract", f"{{{_title(rng)}. {_title(rng)}.}}"))
+    if rng.random() < 0.2:
+        fields.append(("keywords", f"{{{', '.join(rng.sample(KEYWORDS, 3))}}}"))
+    if rng.random() < 0.1:
+        fields.append(("file", f"{{:papers/{i}.pdf:PDF}}"))
+    return fields
+
+
+def generate(n_entries: int, seed: int = 0) -> Iterator[str]:
+    """Yield the ``@command`` strings of a synthetic bibliography.
+
+    The same `n_entries` and `seed` always produce the same output,
+    and the first entries don’t depend on `n_entries`.
+    """
+    rng = random.Random(seed)  # noqa: S311
+    yield '@string{jcp = "Journal of Computational Physics"}'
+    types = list(ENTRY_TYPES)
+    weights = list(ENTRY_TYPES.values())
+    for i in range(n_entries):
+        [entry_type] = rng.choices(types, weights)
+        fields = _fields(rng, entry_type, i)
+        width = max(len(name) for name, _ in fields)
+        body = "".join(f"  {name:<{width}} = {value},\n" for name, value in fields)
+        yield f"@{entry_type}{{key{i},\n{body}}}"
+
+
+def write_corpus(n_entries: int, outfile: IO[str], seed: int = 0) -> None:
+    """Write a synthetic bibliography with `n_entries` entries to `outfile`."""
+    for command in generate(n_entries, seed):
+        outfile.write(command)
+        outfile.write("\n\n")
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("n_entries", type=int, help="number of entries")
+    parser.add_argument(
+        "-o", "--output", type=Path, help="output file (default: stdout)"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="random seed (default: 0)")
+    args = parser.parse_args(argv)
+    if args.output is None:
+        write_corpus(args.n_entries, sys.stdout, args.seed)
+        return
+    with args.output.open("w") as f:
+        write_corpus(args.n_entries, f, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""Benchmark duplicate detection on a synthetic corpus."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from bibfmt import model, tools
+from bibfmt.dedupe import DuplicateIndex
+
+
+if TYPE_CHECKING:
+    from pytest_benchmark.fixture import BenchmarkFixture
+
+    from bibfmt.model import Entry
+
+
+@pytest.fixture(scope="module")
+def entries(corpus_text: str) -> dict[str, Entry]:
+    return model.from_pybtex(tools.new_parser("fast").parse_string(corpus_text).entries)
+
+
+def test_duplicate_index(
+    benchmark: BenchmarkFixture, entries: dict[str, Entry], corpus_size: int
+) -> None:
+    def run() -> list[list[int]]:
+        index = DuplicateIndex()
+        # The same bibliography twice, so every entry has a duplicate
+        index.add_all(entries, source="a.bib")
+        index.add_all(entries, source="b.bib")
+        return index.groups()
+
+    groups = benchmark.pedantic(run, rounds=3)
+    assert sum(map(len, groups)) == 2 * corpus_size
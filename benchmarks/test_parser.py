@@ -0,0 +1,47 @@
+"""Compare the throughput of the BibTeX parser backends.
+
+Run with ``pytest benchmarks``.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from bibfmt.tools import new_parser
+
+
+if TYPE_CHECKING:
+    from typing import Literal
+
+    from pytest_benchmark.fixture import BenchmarkFixture
+
+
+N_ENTRIES = 2000
+
+
+@pytest.fixture(scope="module")
+def bibtex_text() -> str:
+    return "\n".join(
+        f"@article{{key{i},\n"
+        f'  author  = {{Doe, John and Roe, Jane{i % 100} and M{{\\"u}}ller, K.}},\n'
+        f"  title   = {{On the {{Nested}} title number {i}}},\n"
+        f'  journal = "Journal of Things",\n'
+        f"  year    = {1950 + i % 70},\n"
+        f"  month   = {['jan', 'feb', 'mar'][i % 3]},\n"
+        f"  pages   = {{{i}--{i + 10}}},\n"
+        f"  doi     = {{10.1000/{i}}},\n"
+        "}\n"
+        for i in range(N_ENTRIES)
+    )
+
+
+@pytest.mark.parametrize("parser", ["pybtex", "fast"])
+def test_parse(
+    benchmark: BenchmarkFixture,
+    bibtex_text: str,
+    parser: Literal["pybtex", "fast"],
+) -> None:
+    data = benchmark(lambda: new_parser(parser).parse_string(bibtex_text))
+    assert len(data.entries) == N_ENTRIES
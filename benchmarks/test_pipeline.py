@@ -0,0 +1,210 @@
+"""Benchmark each stage of the formatting pipeline on a synthetic corpus.
+
+Run with ``pytest benchmarks``, and e.g. ``--corpus-size=100000`` for larger inputs.
+Stages that modify entries in place get a fresh copy of the entries for each round.
+"""
+
+from __future__ import annotations
+
+import io
+from copy import deepcopy
+from typing import TYPE_CHECKING
+
+import pytest
+
+from bibfmt import inputs, latex, model, pipeline, sort, tools
+from bibfmt.adapt_doi_urls import adapt_doi_urls
+from bibfmt.cli._main import FormatArgs, format_file, parser
+
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pathlib import Path
+
+    from pybtex.database import BibliographyData
+    from pytest_benchmark.fixture import BenchmarkFixture
+
+    from bibfmt.model import Entry
+
+
+@pytest.fixture(scope="module")
+def data(corpus_text: str) -> BibliographyData:
+    return tools.new_parser("fast").parse_string(corpus_text)
+
+
+@pytest.fixture(scope="module")
+def entries(data: BibliographyData) -> dict[str, Entry]:
+    return model.from_pybtex(data.entries)
+
+
+def _run_in_place(
+    benchmark: BenchmarkFixture,
+    func: Callable[[dict[str, Entry]], object],
+    entries: dict[str, Entry],
+) -> None:
+    benchmark.pedantic(
+        func, setup=lambda: ((deepcopy(entries),), {}), rounds=5, warmup_rounds=1
+    )
+
+
+def test_from_pybtex(benchmark: BenchmarkFixture, data: BibliographyData) -> None:
+    benchmark(model.from_pybtex, data.entries)
+
+
+@pytest.mark.parametrize(
+    "excludes",
+    [["abstract", "file", "keywords"], ["abstract", "file*", "/^(keywords|x-)/"]],
+    ids=["names", "patterns"],
+)
+def test_filter_fields(
+    benchmark: BenchmarkFixture, data: BibliographyData, excludes: list[str]
+) -> None:
+    def setup() -> tuple[tuple[BibliographyData, list[str]], dict[str, object]]:
+        return (deepcopy(data), excludes), {}
+
+    benchmark.pedantic(tools.filter_fields, setup=setup, rounds=5, warmup_rounds=1)
+
+
+def test_adapt_doi_urls(benchmark: BenchmarkFixture, entries: dict[str, Entry]) -> None:
+    _run_in_place(benchmark, lambda d: adapt_doi_urls(d, "new"), entries)
+
+
+def test_set_page_range_separator(
+    benchmark: BenchmarkFixture, entries: dict[str, Entry]
+) -> None:
+    _run_in_place(benchmark, lambda d: tools.set_page_range_separator(d, "--"), entries)
+
+
+def test_remove_multiple_spaces(
+    benchmark: BenchmarkFixture, entries: dict[str, Entry]
+) -> None:
+    _run_in_place(benchmark, tools.remove_multiple_spaces, entries)
+
+
+def _sequential(d: dict[str, Entry]) -> None:
+    for entry in d.values():
+        tools.drop_fields(entry, ["abstract", "file", "keywords"])
+    tools.preserve_title_capitalization(d)
+    adapt_doi_urls(d, "new")
+    tools.set_page_range_separator(d, "--")
+
+
+@pytest.mark.parametrize("fused", [False, True], ids=["sequential", "fused"])
+def test_transforms(
+    benchmark: BenchmarkFixture, entries: dict[str, Entry], *, fused: bool
+) -> None:
+    fused_pipeline = pipeline.default_pipeline(
+        drop=["abstract", "file", "keywords"], preserve_title_capitalization=True
+    )
+    _run_in_place(benchmark, fused_pipeline.run if fused else _sequential, entries)
+
+
+def test_translate_month(
+    benchmark: BenchmarkFixture, entries: dict[str, Entry]
+) -> None:
+    months = [e.fields["month"] for e in entries.values() if "month" in e.fields]
+
+    benchmark(lambda: [tools.translate_month(m) for m in months])
+
+
+def test_person_str(benchmark: BenchmarkFixture, entries: dict[str, Entry]) -> None:
+    persons = [p for e in entries.values() for ps in e.persons.values() for p in ps]
+
+    benchmark(lambda: [tools._get_person_str(p) for p in persons])
+
+
+@pytest.mark.parametrize("cold", [False, True], ids=["warm", "cold"])
+def test_pybtex_to_bibtex_string(
+    benchmark: BenchmarkFixture, entries: dict[str, Entry], *, cold: bool
+) -> None:
+    def run() -> list[str]:
+        return [tools.pybtex_to_bibtex_string(e, k) for k, e in entries.items()]
+
+    setup = tools.format_cache_clear if cold else None
+    benchmark.pedantic(run, setup=setup, rounds=5)
+
+
+@pytest.mark.parametrize("func", [tools.decode_all, tools.pybtex_to_dicts])
+def test_latex_conversion(
+    benchmark: BenchmarkFixture,
+    entries: dict[str, Entry],
+    func: Callable[[dict[str, Entry]], object],
+) -> None:
+    benchmark.pedantic(func, (entries,), setup=latex.cache_clear, rounds=3)
+
+
+@pytest.mark.parametrize("run_size", [None, 1 << 20], ids=["memory", "external"])
+def test_sort(
+    benchmark: BenchmarkFixture, entries: dict[str, Entry], run_size: int | None
+) -> None:
+    segments = list(tools.iter_segments(entries, "braces"))
+
+    def run() -> list[str]:
+        with sort.ExternalSorter(run_size=run_size) as sorter:
+            for (key, entry), segment in zip(entries.items(), segments):
+                sorter.add(sort.sort_key("author", key, entry), segment)
+            return list(sorter)
+
+    assert len(benchmark(run)) == len(entries)
+
+
+def test_dict_to_string(
+    benchmark: BenchmarkFixture, data: BibliographyData, corpus_size: int
+) -> None:
+    string = benchmark(tools.dict_to_string, data.entries, "braces")
+    assert string.count("\n@") == corpus_size - 1
+
+
+@pytest.mark.parametrize("use_dump", [False, True], ids=["string", "dump"])
+def test_write_output(
+    benchmark: BenchmarkFixture,
+    data: BibliographyData,
+    tmp_path: Path,
+    *,
+    use_dump: bool,
+) -> None:
+    path = tmp_path / "out.bib"
+
+    def run() -> None:
+        with path.open("wb") as f:
+            if use_dump:
+                tools.dump(data.entries, f)
+            else:
+                f.write(tools.dict_to_string(data.entries, "braces").encode())
+
+    benchmark.pedantic(run, rounds=5)
+    assert path.read_text(encoding="utf-8") == tools.dict_to_string(
+        data.entries, "braces"
+    )
+
+
+@pytest.mark.parametrize("mmap", [False, True], ids=["open", "mmap"])
+def test_read(
+    benchmark: BenchmarkFixture,
+    corpus_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    *,
+    mmap: bool,
+) -> None:
+    if mmap:
+        monkeypatch.setattr(inputs, "MMAP_MIN_SIZE", 1)
+        text = benchmark(inputs.read_text, corpus_path)
+    else:
+        text = benchmark(corpus_path.read_text)
+    assert text.startswith("@")
+
+
+@pytest.mark.parametrize("extra_args", [[], ["--parser=fast"]], ids=["pybtex", "fast"])
+def test_format_file(
+    benchmark: BenchmarkFixture, corpus_path: Path, extra_args: list[str]
+) -> None:
+    args = parser().parse_args([*extra_args, str(corpus_path)], namespace=FormatArgs())
+    args.infiles[0].close()
+    text = corpus_path.read_text()
+
+    def run() -> str:
+        infile = io.StringIO(text)
+        infile.name = str(corpus_path)
+        return format_file(infile, args)
+
+    benchmark.pedantic(run, rounds=3)
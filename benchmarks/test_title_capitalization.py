@@ -0,0 +1,101 @@
+"""Benchmark title capitalization protection and dictionary loading.
+
+Run with ``pytest benchmarks``.
+"""
+
+from __future__ import annotations
+
+import random
+from typing import TYPE_CHECKING
+
+import pytest
+from pybtex.database import Entry
+
+from bibfmt import tools
+from bibfmt.wordindex import WordIndex, build_word_index
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from pytest_benchmark.fixture import BenchmarkFixture
+
+
+N_ENTRIES = 2000
+WORDS = [
+    "the",
+    "on",
+    "of",
+    "a",
+    "for",
+    "and",
+    "with",
+    "in",
+    "numerical",
+    "analysis",
+    "Gaussian",
+    "Runge-Kutta",
+    "methods",
+    "GMRES:",
+    "solver",
+    "Krylov",
+    "subspace",
+    "Newton's",
+    "iteration",
+    "finite",
+    "element",
+    "Hermitian",
+    "ODE",
+    "PDE",
+    "problems",
+    "stability",
+    "convergence",
+    "Jacobian-free",
+    "parabolic",
+    "equations",
+]
+
+
+@pytest.fixture(scope="module")
+def titles() -> list[str]:
+    rng = random.Random(0)  # noqa: S311
+    return [" ".join(rng.choices(WORDS, k=10)) for _ in range(N_ENTRIES)]
+
+
+@pytest.mark.parametrize("memoized", [False, True], ids=["cold", "warm"])
+def test_preserve_title_capitalization(
+    benchmark: BenchmarkFixture, titles: list[str], *, memoized: bool
+) -> None:
+    tools.get_dict()  # load outside of the benchmark
+
+    def run() -> None:
+        if not memoized:
+            tools._translate_title.cache_clear()
+            tools._translate_word.cache_clear()
+        d = {
+            str(i): Entry("article", fields={"title": t}) for i, t in enumerate(titles)
+        }
+        tools.preserve_title_capitalization(d)
+
+    benchmark(run)
+
+
+@pytest.fixture(scope="module")
+def word_index_path(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    from english_words import get_english_words_set
+
+    path = tmp_path_factory.mktemp("words") / "web2.words"
+    build_word_index(get_english_words_set(["web2"]), path)
+    return path
+
+
+def test_load_set(benchmark: BenchmarkFixture) -> None:
+    from english_words import get_english_words_set
+
+    words = benchmark(get_english_words_set, ["web2"])
+    assert "kernel" in words
+
+
+def test_load_index(benchmark: BenchmarkFixture, word_index_path: Path) -> None:
+    words = benchmark(WordIndex, word_index_path)
+    assert "kernel" in words
@@ -2,25 +2,45 @@
 
 from __future__ import annotations
 
-from . import cli
+import importlib
+from typing import TYPE_CHECKING
+
 from .adapt_doi_urls import adapt_doi_urls
 from .tools import (
     decode,
+    decode_all,
     dict_to_string,
+    dump,
     merge,
     pybtex_to_bibtex_string,
     pybtex_to_dict,
+    pybtex_to_dicts,
     translate_month,
 )
 
 
+if TYPE_CHECKING:
+    from . import cli
+
+
 __all__ = [
     "cli",
     "decode",
+    "decode_all",
     "pybtex_to_dict",
+    "pybtex_to_dicts",
     "pybtex_to_bibtex_string",
     "dict_to_string",
+    "dump",
     "merge",
     "translate_month",
     "adapt_doi_urls",
 ]
+
+
+def __getattr__(name: str) -> object:
+    # Import the CLI only when it is used, it pulls in the parser and all transforms
+    if name == "cli":
+        return importlib.import_module(f"{__name__}.cli")
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
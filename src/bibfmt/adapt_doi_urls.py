@@ -2,50 +2,110 @@
 
 from __future__ import annotations
 
+from functools import partial
 from typing import TYPE_CHECKING
 
 from . import tools
 
 
 if TYPE_CHECKING:
-    from collections.abc import MutableMapping
+    from collections.abc import Iterable, Iterator, Mapping
     from typing import Callable, Literal
 
+    import requests
     from pybtex.database import Entry
 
 
 def adapt_doi_urls(
-    d: MutableMapping[str, Entry], doi_url_type: Literal["new", "short", "unchanged"]
+    d: Mapping[str, Entry],
+    doi_url_type: Literal["new", "short", "unchanged"],
+    *,
+    max_workers: int = 8,
+    session: requests.Session | None = None,
 ) -> None:
-    """Adapt DOI URLs."""
-    if doi_url_type == "new":
-        _update_doi_url(d, lambda doi: f"https://doi.org/{doi}")
+    """Adapt DOI URLs.
 
-    elif doi_url_type == "short":
+    Parameters
+    ----------
+    d
+        dictionary of bibtex entries
+    doi_url_type
+        how to rewrite DOI URLs
+    max_workers
+        maximum number of concurrent shortDOI lookups
+    session
+        HTTP session for shortDOI lookups (default: `tools.shortdoi_session()`)
 
-        def update_to_short_doi(doi: str) -> str | None:
-            short_doi = tools.get_short_doi(doi)
-            if short_doi:
-                return f"https://doi.org/{short_doi}"
-            return None
-
-        _update_doi_url(d, update_to_short_doi)
-
-    elif doi_url_type != "unchanged":
+    """
+    if doi_url_type == "unchanged":
+        return
+    if doi_url_type == "short":
+        short_dois = resolve_short_dois(
+            iter_dois(d.values()), max_workers=max_workers, session=session
+        )
+        url_from_doi = short_doi_url_factory(short_dois)
+    elif doi_url_type == "new":
+        url_from_doi = new_doi_url
+    else:
         msg = f"Unknown doi_url_type {doi_url_type}"
         raise AssertionError(msg)
 
+    for entry in d.values():
+        update_doi_url(entry, url_from_doi)
 
-def _update_doi_url(
-    d: MutableMapping[str, Entry], url_from_doi: Callable[[str], str | None]
-) -> None:
-    for bib_id, value in d.items():
-        assert value.fields is not None  # noqa: S101
-        if "url" not in value.fields:
-            continue
-
-        doi = tools.doi_from_url(value.fields["url"])
-        if doi:
-            new_url = url_from_doi(doi)
-            if new_url:
-                d[bib_id].fields["url"] = new_url
+
+def new_doi_url(doi: str) -> str:
+    """Get the doi.org URL of `doi`."""
+    return f"https://doi.org/{doi}"
+
+
+def short_doi_url_factory(
+    short_dois: Mapping[str, str | None],
+) -> Callable[[str], str | None]:
+    """Get a function returning the short DOI URL of a DOI in `short_dois`."""
+
+    def url_from_doi(doi: str) -> str | None:
+        if short_doi := short_dois[doi]:
+            return new_doi_url(short_doi)
+        return None
+
+    return url_from_doi
+
+
+def resolve_short_dois(
+    dois: Iterable[str],
+    *,
+    max_workers: int = 8,
+    session: requests.Session | None = None,
+) -> Mapping[str, str | None]:
+    """Look up the short DOIs of `dois` concurrently.
+
+    Each unique DOI is only looked up once.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    unique_dois = list(dict.fromkeys(dois))
+    if session is None:
+        session = tools.shortdoi_session(max_workers)
+    get_short_doi = partial(tools.get_short_doi, session=session)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(unique_dois, executor.map(get_short_doi, unique_dois)))
+
+
+def iter_dois(entries: Iterable[Entry]) -> Iterator[str]:
+    """Yield the DOIs of `entries` that have a DOI URL."""
+    for entry in entries:
+        assert entry.fields is not None  # noqa: S101
+        if "url" in entry.fields and (doi := tools.doi_from_url(entry.fields["url"])):
+            yield doi
+
+
+def update_doi_url(entry: Entry, url_from_doi: Callable[[str], str | None]) -> None:
+    """Replace the DOI URL of `entry` with the result of `url_from_doi`, if any."""
+    assert entry.fields is not None  # noqa: S101
+    if "url" not in entry.fields:
+        return
+    if (doi := tools.doi_from_url(entry.fields["url"])) and (
+        new_url := url_from_doi(doi)
+    ):
+        entry.fields["url"] = new_url
@@ -0,0 +1,254 @@
+"""Asynchronous API for services that format bibliographies in an event loop.
+
+Parsing, transforming and formatting are CPU-bound, so they run in a thread pool
+(by default the event loop’s executor). Entries are transformed in place,
+so process pools are not supported. shortDOI lookups run in the thread pool
+as well, at most `max_workers` at a time per call, so the event loop keeps
+serving other requests while they wait for the network:
+
+>>> from bibfmt import aio
+>>> async def handle(text: str) -> str:
+...     return await aio.format_string(text, pipeline_options={"doi_url_type": "short"})
+"""
+
+from __future__ import annotations
+
+import asyncio
+from functools import partial
+from typing import TYPE_CHECKING
+
+from . import tools
+from .adapt_doi_urls import update_doi_url
+from .pipeline import AdaptDoiUrls, check_executor, default_pipeline
+from .sort import sort_entries
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+    from concurrent.futures import ThreadPoolExecutor
+    from typing import Any, Literal
+
+    import requests
+    from _typeshed import StrPath
+    from pybtex.database import Entry
+
+    from .model import Entry as ModelEntry
+
+
+async def resolve_short_dois_async(
+    dois: Iterable[str],
+    *,
+    max_workers: int = 8,
+    session: requests.Session | None = None,
+    executor: ThreadPoolExecutor | None = None,
+) -> dict[str, str | None]:
+    """Look up the short DOIs of `dois` without blocking the event loop.
+
+    Like `adapt_doi_urls.resolve_short_dois`, each unique DOI is looked up once.
+
+    Parameters
+    ----------
+    dois
+        DOIs to look up
+    max_workers
+        maximum number of concurrent lookups
+    session
+        HTTP session for shortDOI lookups (default: `tools.shortdoi_session()`)
+    executor
+        thread pool to run the lookups in (default: the event loop’s executor)
+
+    Returns
+    -------
+    short DOIs by DOI, None for DOIs without short DOI
+
+    """
+    check_executor(executor)
+    loop = asyncio.get_running_loop()
+    unique_dois = list(dict.fromkeys(dois))
+    if session is None:
+        session = tools.shortdoi_session(max_workers)
+    get_short_doi = partial(tools.get_short_doi, session=session)
+    semaphore = asyncio.Semaphore(max_workers)
+
+    async def lookup(doi: str) -> str | None:
+        async with semaphore:
+            return await loop.run_in_executor(executor, get_short_doi, doi)
+
+    short_dois = await asyncio.gather(*map(lookup, unique_dois))
+    return dict(zip(unique_dois, short_dois))
+
+
+async def adapt_doi_urls_async(
+    d: Mapping[str, Entry | ModelEntry],
+    doi_url_type: Literal["new", "short", "unchanged"],
+    *,
+    max_workers: int = 8,
+    session: requests.Session | None = None,
+    executor: ThreadPoolExecutor | None = None,
+) -> None:
+    """Adapt DOI URLs like `bibfmt.adapt_doi_urls`, without blocking the event loop.
+
+    Parameters
+    ----------
+    d
+        dictionary of bibtex entries
+    doi_url_type
+        how to rewrite DOI URLs
+    max_workers
+        maximum number of concurrent shortDOI lookups
+    session
+        HTTP session for shortDOI lookups (default: `tools.shortdoi_session()`)
+    executor
+        thread pool to run lookups and rewriting in
+        (default: the event loop’s executor)
+
+    """
+    check_executor(executor)
+    if doi_url_type == "unchanged":
+        return
+    transform = AdaptDoiUrls(doi_url_type, max_workers=max_workers, session=session)
+    await transform.prepare_async(d.values(), executor)
+    await asyncio.get_running_loop().run_in_executor(
+        executor, _update_doi_urls, d.values(), transform
+    )
+
+
+def _update_doi_urls(
+    entries: Iterable[Entry | ModelEntry], transform: AdaptDoiUrls
+) -> None:
+    for entry in entries:
+        update_doi_url(entry, transform.url_from_doi)
+
+
+def _parse(
+    text: str, name: str, parser: Literal["pybtex", "fast"]
+) -> tuple[dict[str, ModelEntry], list[str]]:
+    """Parse `text`, returning the entries by key and the preamble."""
+    from .model import pop_pybtex
+
+    bib_parser = tools.new_parser(parser)
+    bib_parser.filename = name
+    data = bib_parser.parse_string(text)
+    return pop_pybtex(data.entries), data._preamble  # noqa: SLF001
+
+
+def _to_string(
+    d: dict[str, ModelEntry],
+    preamble: list[str],
+    *,
+    sort_by: str | None,
+    delimiter_type: Literal["braces", "quotes"],
+    indent: int | Literal["tab"],
+) -> str:
+    if sort_by:
+        d = sort_entries(d, sort_by)
+    return tools.dict_to_string(d, delimiter_type, indent=indent, preamble=preamble)
+
+
+async def format_string(
+    text: str,
+    name: str = "<string>",
+    *,
+    parser: Literal["pybtex", "fast"] = "pybtex",
+    pipeline_options: Mapping[str, Any] | None = None,
+    sort_by: str | None = None,
+    delimiter_type: Literal["braces", "quotes"] = "braces",
+    indent: int | Literal["tab"] = 2,
+    executor: ThreadPoolExecutor | None = None,
+) -> str:
+    """Parse, transform and format a bibliography without blocking the event loop.
+
+    Parameters
+    ----------
+    text
+        BibTeX source
+    name
+        name for error messages
+    parser
+        which parser backend to use
+    pipeline_options
+        arguments for `pipeline.default_pipeline`
+    sort_by
+        how to sort the entries, see `sort.sort_key` (default: keep the order)
+    delimiter_type
+        which delimiters to use
+    indent
+        number of spaces to indent fields with, or ``"tab"``
+    executor
+        thread pool for the CPU-bound stages and shortDOI lookups
+        (default: the event loop’s executor)
+
+    Returns
+    -------
+    the formatted bibliography, the same as the CLI writes
+
+    Raises
+    ------
+    TypeError
+        if `executor` is a process pool
+
+    """
+    check_executor(executor)
+    loop = asyncio.get_running_loop()
+    d, preamble = await loop.run_in_executor(executor, _parse, text, name, parser)
+    pipeline = default_pipeline(**(pipeline_options or {}))
+    await pipeline.run_async(d, executor=executor, file=name)
+    return await loop.run_in_executor(
+        executor,
+        partial(
+            _to_string,
+            d,
+            preamble,
+            sort_by=sort_by,
+            delimiter_type=delimiter_type,
+            indent=indent,
+        ),
+    )
+
+
+async def format_files(
+    paths: Iterable[StrPath],
+    *,
+    in_place: bool = False,
+    max_files: int = 8,
+    executor: ThreadPoolExecutor | None = None,
+    **kwargs: Any,  # noqa: ANN401
+) -> list[str]:
+    """Format several files concurrently.
+
+    Parameters
+    ----------
+    paths
+        BibTeX files
+    in_place
+        whether to write the results back to the files
+        (files are only replaced if their content changes)
+    max_files
+        maximum number of files formatted at the same time
+    executor
+        thread pool for reading, writing and the stages of `format_string`
+        (default: the event loop’s executor)
+    kwargs
+        passed to `format_string`
+
+    Returns
+    -------
+    the formatted bibliographies, in the order of `paths`
+
+    """
+    from .inputs import InputFile, read_text
+
+    check_executor(executor)
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(max_files)
+
+    async def format_path(path: StrPath) -> str:
+        async with semaphore:
+            infile = InputFile(path)
+            text = await loop.run_in_executor(executor, read_text, path)
+            string = await format_string(text, infile.name, executor=executor, **kwargs)
+            if in_place:
+                await loop.run_in_executor(executor, tools.write, string, infile)
+            return string
+
+    return await asyncio.gather(*map(format_path, paths))
@@ -0,0 +1,144 @@
+"""Persistent cache of formatting results."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+from importlib.metadata import PackageNotFoundError, version
+from typing import TYPE_CHECKING
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+    from pathlib import Path
+
+
+def _version() -> str:
+    try:
+        return version("bibfmt")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def _digest(*parts: str) -> bytes:
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode("utf-8", "surrogatepass"))
+        h.update(b"\0")
+    return h.digest()
+
+
+def _fingerprint(options: Mapping[str, object]) -> str:
+    return json.dumps({"version": _version(), **options}, sort_keys=True, default=str)
+
+
+class FormatCache:
+    """Cache of formatting results, stored in an SQLite database in `cache_dir`.
+
+    All keys include the formatting `options` and the bibfmt version,
+    so changing either invalidates earlier results.
+
+    Two things are cached:
+
+    - hashes of file contents that are known to be formatted already
+    - the formatted text of single entries, keyed on their source text
+    """
+
+    def __init__(self, cache_dir: Path, options: Mapping[str, object]) -> None:
+        """Open (or create) the cache database."""
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        self.fingerprint = _fingerprint(options)
+        self.db = sqlite3.connect(cache_dir / "bibfmt-cache.sqlite3", timeout=60)
+        with self.db:
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS formatted_files (key BLOB PRIMARY KEY)"
+            )
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS entries "
+                "(key BLOB PRIMARY KEY, bib_id TEXT, segment TEXT)"
+            )
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.db.close()
+
+    def is_formatted(self, content: str) -> bool:
+        """Check if `content` is known to be formatted with these options."""
+        key = _digest(self.fingerprint, content)
+        cur = self.db.execute("SELECT 1 FROM formatted_files WHERE key = ?", (key,))
+        return cur.fetchone() is not None
+
+    def mark_formatted(self, content: str) -> None:
+        """Remember that `content` is formatted with these options."""
+        key = _digest(self.fingerprint, content)
+        with self.db:
+            self.db.execute(
+                "INSERT OR IGNORE INTO formatted_files (key) VALUES (?)", (key,)
+            )
+
+    def entry_key(self, context: str, source: str) -> bytes:
+        """Compute the key of an entry’s `source` text.
+
+        `context` must capture everything else the result depends on,
+        e.g. the ``@string`` macros defined before the entry.
+        """
+        return _digest(self.fingerprint, context, source)
+
+    def get_entry(self, key: bytes) -> tuple[str, str] | None:
+        """Get the BibTeX key and formatted text of an entry."""
+        cur = self.db.execute(
+            "SELECT bib_id, segment FROM entries WHERE key = ?", (key,)
+        )
+        return cur.fetchone()
+
+    def put_entries(self, entries: Iterable[tuple[bytes, str, str]]) -> None:
+        """Store ``(key, bib_id, segment)`` tuples."""
+        with self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?)", entries
+            )
+
+
+class MemoryCache:
+    """In-memory variant of `FormatCache`, e.g. for long-running processes.
+
+    At most `max_entries` entries are kept, dropping the oldest ones first.
+    """
+
+    def __init__(
+        self, options: Mapping[str, object], max_entries: int = 1 << 20
+    ) -> None:
+        """Create an empty cache."""
+        self.fingerprint = _fingerprint(options)
+        self.max_entries = max_entries
+        self.formatted_files: set[bytes] = set()
+        self.entries: dict[bytes, tuple[str, str]] = {}
+
+    def close(self) -> None:
+        """Do nothing, the cache is kept until it is garbage collected."""
+
+    def is_formatted(self, content: str) -> bool:
+        """Check if `content` is known to be formatted with these options."""
+        return _digest(self.fingerprint, content) in self.formatted_files
+
+    def mark_formatted(self, content: str) -> None:
+        """Remember that `content` is formatted with these options."""
+        self.formatted_files.add(_digest(self.fingerprint, content))
+
+    def entry_key(self, context: str, source: str) -> bytes:
+        """Compute the key of an entry’s `source` text, see `FormatCache.entry_key`."""
+        return _digest(self.fingerprint, context, source)
+
+    def get_entry(self, key: bytes) -> tuple[str, str] | None:
+        """Get the BibTeX key and formatted text of an entry."""
+        return self.entries.get(key)
+
+    def put_entries(self, entries: Iterable[tuple[bytes, str, str]]) -> None:
+        """Store ``(key, bib_id, segment)`` tuples."""
+        for key, bib_id, segment in entries:
+            self.entries.pop(key, None)
+            self.entries[key] = (bib_id, segment)
+        while len(self.entries) > self.max_entries:
+            del self.entries[next(iter(self.entries))]
@@ -1,15 +1,29 @@
 from __future__ import annotations
 
 import argparse
+import io
+import logging
+import os
+import sys
+import time
+from copy import copy
+from functools import partial
+from pathlib import Path
 from typing import TYPE_CHECKING
 
-from ..adapt_doi_urls import adapt_doi_urls
+from .. import profile
+from ..filters import FieldFilter, parse_max_size
+from ..inputs import InputFile, read_text
+from ..model import pop_pybtex
+from ..pipeline import default_pipeline
+from ..sort import sort_entries, sort_key, use_locale
 from ..tools import (
+    SHORTDOI_CACHE_TTL,
     bibtex_parser,
     dict_to_string,
-    filter_fields,
-    preserve_title_capitalization,  # noqa: TCH001
-    set_page_range_separator,
+    dump,
+    iter_segments,
+    new_parser,
     write,
 )
 from .helpers import (
@@ -21,31 +35,102 @@ from .helpers import (
 
 
 if TYPE_CHECKING:
-    from collections.abc import Sequence
+    from collections.abc import Callable, Iterator, Sequence
+    from concurrent.futures import Future
+    from typing import IO, Any, Literal, TypeVar
 
-    from pybtex.database import Entry
+    from pybtex.database import BibliographyData
+
+    from ..cache import FormatCache, MemoryCache
+    from ..model import Entry
+    from ..profile import StageStats
+    from ..sort import SortKey
+
+    T = TypeVar("T")
+
+
+logger = logging.getLogger(__name__)
 
 
 class FormatArgs(FileParserArgs, FormattingParserArgs):
     drop: list[str]
+    keep: list[str]
+    max_size: list[tuple[str, int]]
+    jobs: int
+    stream: bool
+    parser: Literal["pybtex", "fast"]
+    cache_dir: Path | None
+    check: bool
+    profile: Literal["table", "json"] | None
+    daemon: bool
+    connect: bool
+    socket: Path | None
+    watch: Path | None
+    dedupe: Literal["report", "merge"] | None
 
 
-def run(args: FormatArgs) -> None:
-    for infile in args.infiles:
-        data = bibtex_parser(infile)
+def _pipeline_options(args: FormatArgs) -> dict[str, Any]:
+    """Get the arguments for `default_pipeline` selected in `args`."""
+    return {
+        "drop": args.drop or (),
+        "keep": args.keep or (),
+        "max_size": dict(args.max_size or ()),
+        "preserve_title_capitalization": args.preserve_title_capitalization,
+        "doi_url_type": args.doi_url_type,
+        "page_range_separator": args.page_range_separator,
+    }
+
+
+def _transform(data: BibliographyData, args: FormatArgs, name: str) -> dict[str, Entry]:
+    """Apply the per-entry transforms selected in `args` to the entries of `name`.
+
+    The entries are converted to `model.Entry` and removed from `data`,
+    which keeps only its preamble, so that pybtex’s copy can be freed.
+    """
+    d = pop_pybtex(data.entries)
+    pipeline = default_pipeline(**_pipeline_options(args))
+    pipeline.run(d, file=name)
+    return d
 
-        if args.drop:
-            data = filter_fields(data, args.drop)
 
-        d: dict[str, Entry] = dict(data.entries)
-        if False:  # TODO(flying-sheep): Add option  # noqa: TD003
-            preserve_title_capitalization(d)
-        adapt_doi_urls(d, args.doi_url_type)
-        set_page_range_separator(d, args.page_range_separator)
+def _file_size(infile: IO[str]) -> int:
+    """Get the size of `infile` in bytes, or 0 if it isn’t a regular file."""
+    try:
+        if isinstance(infile, InputFile):
+            return Path(infile.name).stat().st_size
+        return os.fstat(infile.fileno()).st_size
+    except (OSError, ValueError, io.UnsupportedOperation):
+        return 0
 
-        if args.sort_by_bibkey:
-            d = dict(sorted(d.items()))
 
+def format_file(infile: IO[str], args: FormatArgs) -> str:
+    """Parse, transform and format a single BibTeX file."""
+    if args.cache_dir is not None:
+        return _format_file_cached(infile, args)
+
+    name = infile.name
+    bytes_in = _file_size(infile) if profile.is_enabled() else 0
+    if args.jobs != 1:
+        from .. import parallel
+
+        with infile:
+            text = infile.read()
+        if len(text) >= parallel.MIN_SIZE:
+            return _format_text_parallel(text, name, args)
+        infile = io.StringIO(text)
+        infile.name = name
+
+    with profile.stage("parse", name, bytes_in=bytes_in) as stats:
+        data = bibtex_parser(infile, args.parser)
+        if stats:
+            stats.entries = len(data.entries)
+    d = _transform(data, args, name)
+
+    if args.sort_by:
+        with profile.stage("sort", name, entries=len(d)):
+            d = sort_entries(d, args.sort_by)
+
+    with profile.stage("format", name, entries=len(d)) as stats:
         string = dict_to_string(
             d,
             args.delimiter_type,
@@ -53,8 +138,461 @@ def run(args: FormatArgs) -> None:
             # TODO(nschloe): use public field when it becomes possible  # noqa: TD003
             preamble=data._preamble,  # noqa: SLF001
         )
+        if stats:
+            stats.bytes_out = len(string.encode())
+    return string
+
+
+def _format_text_parallel(text: str, name: str, args: FormatArgs) -> str:
+    """Format a large bibliography by splitting it between `args.jobs` processes."""
+    from ..parallel import format_text
+
+    return format_text(
+        text,
+        name,
+        jobs=args.jobs,
+        sort_by=args.sort_by,
+        parser=args.parser,
+        pipeline_options=_pipeline_options(args),
+        delimiter_type=args.delimiter_type,
+        indent=args.indent,
+    )
+
+
+def _cache_options(args: FormatArgs) -> dict[str, object]:
+    """Get the options that affect the formatted output."""
+    options: dict[str, object] = {
+        "drop": sorted(args.drop or ()),
+        "keep": sorted(args.keep or ()),
+        "max_size": sorted(args.max_size or ()),
+        **{k: getattr(args, k) for k in FormattingParserArgs.__annotations__},
+    }
+    if args.doi_url_type == "short":
+        # Short DOIs are only cached for a while, so expire the results using them
+        ttl = SHORTDOI_CACHE_TTL.total_seconds()
+        options["shortdoi_period"] = int(time.time() // ttl)
+    return options
+
+
+def _format_file_cached(infile: IO[str], args: FormatArgs) -> str:
+    """Format a file, reusing results cached in `args.cache_dir`."""
+    from ..cache import FormatCache
+
+    with infile:
+        text = infile.read()
+    cache = FormatCache(args.cache_dir, _cache_options(args))
+    try:
+        return _format_with_cache(text, infile.name, args=args, cache=cache)
+    finally:
+        cache.close()
+
+
+def _format_with_cache(
+    text: str, name: str, *, args: FormatArgs, cache: FormatCache | MemoryCache
+) -> str:
+    """Format `text`, reusing cached results.
+
+    Texts known to be formatted are returned without parsing.
+    Otherwise, only entries whose source text changed are parsed and formatted.
+    """
+    with profile.stage("cache_lookup", name) as stats:
+        formatted = cache.is_formatted(text)
+        if stats:
+            stats.bytes_in = len(text.encode())
+    if formatted:
+        return text
+    try:
+        string = _format_text_cached(text, name, args=args, cache=cache)
+    except Exception as e:
+        getattr(e, "add_note", print)(f"There was an error when parsing {name}")
+        raise
+    cache.mark_formatted(string)
+    return string
+
+
+def _format_text_cached(
+    text: str, name: str, *, args: FormatArgs, cache: FormatCache | MemoryCache
+) -> str:
+    from pybtex.database import BibliographyData, BibliographyDataError
+    from pybtex.errors import report_error
+
+    from ..stream import command_type, iter_commands
+
+    parser = new_parser(args.parser)
+    parser.filename = name
+    delimiter_type, indent = args.delimiter_type, args.indent
+
+    # The ``@string`` commands seen so far, which later entries can depend on
+    context = ""
+    preamble_segments: list[str] = []
+    # Formatted entries, with None for those that aren’t cached
+    cached_entries: list[tuple[str, str | None]] = []
+    # Entries that aren’t cached, to be transformed and formatted at once
+    misses = BibliographyData()
+    miss_keys: list[tuple[bytes, str]] = []
+    seen_keys: set[str] = set()
+    for command in iter_commands(io.StringIO(text)):
+        kind = command_type(command)
+        if kind in {"string", "preamble", None}:
+            parser.data = BibliographyData()
+            data = parser.parse_string(command)
+            preamble = data._preamble  # noqa: SLF001
+            preamble_segments.extend(
+                iter_segments({}, delimiter_type, indent=indent, preamble=preamble)
+            )
+            if kind == "string":
+                context += command
+            continue
+
+        key = cache.entry_key(context, command)
+        if (cached := cache.get_entry(key)) is None:
+            with profile.stage("parse", name, entries=1):
+                parser.data = BibliographyData()
+                data = parser.parse_string(command)
+            [(bib_id, parsed)] = data.entries.items()
+            segment = None
+        else:
+            bib_id, segment = cached
+        if bib_id.lower() in seen_keys:
+            report_error(
+                BibliographyDataError(f"repeated bibliography entry: {bib_id}")
+            )
+            continue
+        seen_keys.add(bib_id.lower())
+        if segment is None:
+            misses.entries[bib_id] = parsed
+            miss_keys.append((key, bib_id))
+        cached_entries.append((bib_id, segment))
+
+    d, segments = _format_misses(misses, miss_keys, name, args=args, cache=cache)
+    entries = [
+        (bib_id, segments[bib_id], d[bib_id])
+        if segment is None
+        else (bib_id, segment, None)
+        for bib_id, segment in cached_entries
+    ]
+    if args.sort_by:
+        entries.sort(key=partial(_cached_sort_key, args.sort_by))
+    return "\n\n".join([*preamble_segments, *(s for _, s, _ in entries)]) + "\n"
+
+
+def _format_misses(
+    misses: BibliographyData,
+    keys: list[tuple[bytes, str]],
+    name: str,
+    *,
+    args: FormatArgs,
+    cache: FormatCache | MemoryCache,
+) -> tuple[dict[str, Entry], dict[str, str]]:
+    """Transform and format the entries that weren’t cached, and cache them.
+
+    `keys` are the cache keys and citation keys of the entries.
+    Returns the transformed entries and their formatted segments by citation key.
+    """
+    if not keys:
+        return {}, {}
+    d = _transform(misses, args, name)
+    with profile.stage("format", name, entries=len(d)):
+        segments = dict(
+            zip(d, iter_segments(d, args.delimiter_type, indent=args.indent))
+        )
+    new_entries: list[tuple[bytes, str, str]] = []
+    for key, bib_id in keys:
+        segment = segments[bib_id]
+        new_entries.append((key, bib_id, segment))
+        # Formatting is idempotent and formatted entries don’t use macros,
+        # so the next run can reuse this result after an in-place write.
+        new_entries.append((cache.entry_key("", segment), bib_id, segment))
+    cache.put_entries(new_entries)
+    return d, segments
+
+
+def _cached_sort_key(by: str, item: tuple[str, str, Entry | None]) -> SortKey:
+    """Get the sort key of a formatted entry, see `sort.sort_key`."""
+    key, segment, entry = item
+    if entry is None and by != "key":
+        # Cached entries are only stored formatted, so parse them again
+        return sort_key(by, key, new_parser("fast").parse_string(segment).entries[key])
+    return sort_key(by, key, entry)
+
+
+def format_stream(infile: IO[str], args: FormatArgs) -> Iterator[str]:
+    """Parse, transform and format a BibTeX file one entry at a time.
+
+    Yields the formatted segments in the order they appear in `infile`.
+    With `args.sort_by`, the preamble comes first, followed by the entries,
+    which are sorted with bounded memory by spilling them to temporary files.
+    """
+    chunks = _iter_formatted_chunks(infile, args)
+    if not args.sort_by:
+        for preamble, _, segments in chunks:
+            yield from preamble
+            yield from segments
+        return
+
+    from ..sort import ExternalSorter
+
+    preamble_segments: list[str] = []
+    with ExternalSorter() as sorter:
+        for preamble, d, segments in chunks:
+            preamble_segments.extend(preamble)
+            with profile.stage("sort", infile.name, entries=len(d)):
+                for (key, entry), segment in zip(d.items(), segments):
+                    sorter.add(sort_key(args.sort_by, key, entry), segment)
+        yield from preamble_segments
+        yield from sorter
+
+
+def _iter_formatted_chunks(
+    infile: IO[str], args: FormatArgs
+) -> Iterator[tuple[list[str], dict[str, Entry], list[str]]]:
+    """Yield the formatted preamble, entries and their segments of each chunk."""
+    from ..stream import iter_bibliography
+
+    name = infile.name
+    # Attribute the file size to the first chunk
+    bytes_in = _file_size(infile) if profile.is_enabled() else 0
+    with infile:
+        bibliography = iter_bibliography(infile, parser=args.parser)
+        while True:
+            with profile.stage("parse", name, bytes_in=bytes_in) as stats:
+                data = next(bibliography, None)
+                if stats and data is not None:
+                    stats.entries = len(data.entries)
+            if data is None:
+                return
+            bytes_in = 0
+            d = _transform(data, args, name)
+            with profile.stage("format", name, entries=len(d)) as stats:
+                preamble = list(
+                    iter_segments(
+                        {},
+                        args.delimiter_type,
+                        indent=args.indent,
+                        preamble=data._preamble,  # noqa: SLF001
+                    )
+                )
+                segments = list(
+                    iter_segments(d, args.delimiter_type, indent=args.indent)
+                )
+                if stats:
+                    stats.bytes_out = sum(
+                        len(segment.encode()) for segment in (*preamble, *segments)
+                    )
+            yield preamble, d, segments
+
+
+def check_file(infile: IO[str], args: FormatArgs) -> bool:
+    """Check if formatting would change `infile`."""
+    if infile is not sys.stdin:
+        return write(format_file(infile, args), infile, dry_run=True)
 
+    text = infile.read()
+    source = io.StringIO(text)
+    source.name = infile.name
+    return format_file(source, args) != text
+
+
+def _run_in_worker(
+    task: Callable[[IO[str], FormatArgs], T],
+    path: str,
+    args: FormatArgs,
+    *,
+    profiling: bool,
+) -> tuple[T, list[StageStats]]:
+    """Run `task` on the file at `path` in a worker process.
+
+    If `profiling`, the stats of all stages are returned,
+    so that they can be reported to the hooks of the main process.
+    """
+    try:
+        with InputFile(path) as infile:
+            if not profiling:
+                return task(infile, args), []
+            with profile.collect() as records:
+                return task(infile, args), records
+    except Exception as e:  # noqa: BLE001
+        # Some of pybtex’s exceptions can be pickled, but not unpickled,
+        # which would break the whole pool when they are sent back.
+        raise RuntimeError(str(e)) from None
+
+
+def _report_change(infile: IO[str]) -> None:
+    sys.stdout.write(f"would reformat {infile.name}\n")
+
+
+def _write(string: str, infile: IO[str], args: FormatArgs) -> None:
+    """Write the formatted `string` of `infile` to stdout or back to `infile`."""
+    with profile.stage("write", infile.name) as stats:
         write(string, infile if args.in_place else None)
+        if stats:
+            stats.bytes_out = len(string.encode())
+
+
+def run(args: FormatArgs) -> int:
+    if not args.profile:
+        return _run(args)
+
+    profiler = profile.Profiler()
+    profile.add_hook(profiler)
+    try:
+        return _run(args)
+    finally:
+        profile.remove_hook(profiler)
+        if args.profile == "json":
+            profiler.write_json_lines(sys.stderr)
+        else:
+            profiler.print_table()
+
+
+def _run(args: FormatArgs) -> int:
+    # A single file is split between the processes instead, if it is large enough
+    if args.jobs != 1 and len(args.infiles) > 1:
+        return _run_parallel(args)
+
+    status = 0
+    for infile in args.infiles:
+        if args.check:
+            if check_file(infile, args):
+                _report_change(infile)
+                status = 1
+        elif args.stream and args.jobs == 1:
+            from ..stream import write_stream
+
+            write_stream(format_stream(infile, args), infile if args.in_place else None)
+        else:
+            _write(format_file(infile, args), infile, args)
+    return status
+
+
+def dedupe_files(args: FormatArgs) -> int:
+    """Report or merge duplicate entries across all input files.
+
+    Returns 1 if duplicates were reported, 0 otherwise.
+    """
+    from ..dedupe import DuplicateIndex, merge_duplicates
+
+    index = DuplicateIndex()
+    entries: list[tuple[str, Entry]] = []
+    preamble: list[str] = []
+    for infile in args.infiles:
+        with infile:
+            data = bibtex_parser(infile, args.parser)
+        d = _transform(data, args, infile.name)
+        index.add_all(d, source=infile.name)
+        if args.dedupe == "merge":
+            entries.extend(d.items())
+            preamble.extend(data._preamble)  # noqa: SLF001
+    groups = index.groups()
+
+    if args.dedupe == "report":
+        for group in groups:
+            records = (index.records[id_] for id_ in group)
+            sys.stdout.write(" ".join(f"{src}:{key}" for src, key in records) + "\n")
+        return int(bool(groups))
+
+    merged = merge_duplicates(entries, groups)
+    if args.sort_by:
+        merged = sort_entries(merged, args.sort_by)
+    dump(merged, sys.stdout, args.delimiter_type, indent=args.indent, preamble=preamble)
+    return 0
+
+
+def _run_parallel(args: FormatArgs) -> int:
+    """Format or check files in a process pool.
+
+    Results are written in the order the files were given,
+    and a failing file is reported without stopping the others.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    # Input files can’t be sent to worker processes, so workers reopen them by name.
+    options = copy(args)
+    options.infiles = []
+    # Files are already formatted in parallel, so don’t split them further
+    options.jobs = 1
+    task = check_file if args.check else format_file
+    # Hooks can’t be sent to worker processes either, so stats are sent back.
+    profiling = profile.is_enabled()
+
+    status = 0
+    with ProcessPoolExecutor(max_workers=args.jobs or None) as executor:
+        # stdin can’t be reopened in a worker, so it is formatted in this process.
+        futures: list[Future[tuple[str | bool, list[StageStats]]] | None] = [
+            None
+            if infile is sys.stdin
+            else executor.submit(
+                _run_in_worker, task, infile.name, options, profiling=profiling
+            )
+            for infile in args.infiles
+        ]
+        for infile, future in zip(args.infiles, futures):
+            if future is not None:
+                infile.close()
+            try:
+                if future is None:
+                    result = task(infile, args)
+                else:
+                    result, records = future.result()
+                    for stats in records:
+                        profile.report(stats)
+            except Exception as e:  # noqa: BLE001
+                logger.error(f"Could not format {infile.name}: {e}")  # noqa: TRY400
+                status = 1
+                continue
+            if not args.check:
+                _write(result, infile, args)
+            elif result:
+                _report_change(infile)
+                status = 1
+    return status
+
+
+def validate_jobs(s: str) -> int:
+    """Validate the jobs argument."""
+    try:
+        jobs = int(s)
+    except ValueError:
+        jobs = -1
+    if jobs < 0:
+        msg = f"Invalid jobs value: {s!r} (expected a non-negative int)"
+        raise argparse.ArgumentTypeError(msg)
+    return jobs
+
+
+def validate_field_rule(s: str) -> str:
+    """Validate a field rule like ``misc:note``, see `filters.split_rule`."""
+    try:
+        FieldFilter([s])
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+    return s
+
+
+def validate_max_size(s: str) -> tuple[str, int]:
+    """Validate a size limit like ``abstract=4K``."""
+    try:
+        rule, size = parse_max_size(s)
+        FieldFilter(max_size={rule: size})
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+    return rule, size
+
+
+class _VersionAction(argparse.Action):
+    """Print the version, which is only looked up when requested."""
+
+    def __init__(self, option_strings: Sequence[str], **kwargs: object) -> None:
+        super().__init__(option_strings, nargs=0, default=argparse.SUPPRESS, **kwargs)
+
+    def __call__(self, parser: argparse.ArgumentParser, *_: object) -> None:
+        from importlib.metadata import PackageNotFoundError, version
+
+        try:
+            version_ = version("bibfmt")
+        except PackageNotFoundError:
+            version_ = "unknown"
+        parser.exit(message=f"{parser.prog} {version_}\n")
 
 
 def parser() -> argparse.ArgumentParser:
@@ -63,19 +601,255 @@ def parser() -> argparse.ArgumentParser:
         formatter_class=argparse.RawTextHelpFormatter,
     )
     parser.add_argument(
-        "--version", "-V", action="version", help="display version information"
+        "--version", "-V", action=_VersionAction, help="display version information"
     )
 
     add_file_parser_arguments(parser)
     add_formatting_parser_arguments(parser)
 
-    help_ = "drops field from bibtex entry if they exist, can be passed multiple times"
-    parser.add_argument("--drop", action="append", help=help_)
+    filter_group = parser.add_argument_group(
+        "Field filters",
+        "FIELD is a field name, a glob like 'mendeley-*', or a regular expression "
+        "like '/^x-/',\noptionally restricted to entry types like 'misc:note'. "
+        "All options can be passed multiple times.",
+    )
+    filter_group.add_argument(
+        "--drop",
+        action="append",
+        type=validate_field_rule,
+        metavar="FIELD",
+        help="drop matching fields from bibtex entries if they exist",
+    )
+    filter_group.add_argument(
+        "--keep",
+        action="append",
+        type=validate_field_rule,
+        metavar="FIELD",
+        help=(
+            "only keep matching fields, "
+            "dropping all others of the entry types it applies to"
+        ),
+    )
+    filter_group.add_argument(
+        "--max-size",
+        action="append",
+        type=validate_max_size,
+        metavar="FIELD=SIZE",
+        help="drop matching fields with values over SIZE bytes, e.g. abstract=4K",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=validate_jobs,
+        default=1,
+        metavar="N",
+        help=(
+            "format files in N parallel processes, splitting up large files, "
+            "0 for one per CPU (default: 1)"
+        ),
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help=(
+            "format entries one by one without loading whole files into memory "
+            "(ignored with --jobs and --check)"
+        ),
+    )
+    parser.add_argument(
+        "--parser",
+        choices=["fast", "pybtex"],
+        default="pybtex",
+        help=(
+            "BibTeX parser backend. `fast` falls back to `pybtex` "
+            "for input it can’t handle (default: pybtex)"
+        ),
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        metavar="DIR",
+        help=(
+            "cache formatting results in DIR to skip unchanged files and entries "
+            "(ignored with --stream)"
+        ),
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help=(
+            "don’t write anything, but list the files that would change "
+            "and exit with status 1 if there are any"
+        ),
+    )
+    parser.add_argument(
+        "--profile",
+        choices=["table", "json"],
+        help=(
+            "print the time, CPU time, entries, bytes and peak memory "
+            "of each stage per file to stderr, as a table or as JSON lines"
+        ),
+    )
+    parser.add_argument(
+        "--watch",
+        type=Path,
+        metavar="DIR",
+        help=(
+            "format the BibTeX files in DIR and its subdirectories in place, "
+            "and again whenever they change"
+        ),
+    )
+    parser.add_argument(
+        "--dedupe",
+        choices=["report", "merge"],
+        help=(
+            "find duplicate entries across all files (same DOI, same title and "
+            "year, or same key), and list them, exiting with status 1 if there "
+            "are any (report), or write all entries to stdout with duplicates "
+            "merged into the first one (merge)"
+        ),
+    )
+
+    daemon_group = parser.add_argument_group("Daemon")
+    daemon_group.add_argument(
+        "--daemon",
+        action="store_true",
+        help="keep running and format files for clients using --connect",
+    )
+    daemon_group.add_argument(
+        "--connect",
+        action="store_true",
+        help=(
+            "let a running daemon do the formatting, "
+            "which avoids startup costs (falls back to formatting locally)"
+        ),
+    )
+    daemon_group.add_argument(
+        "--socket",
+        type=Path,
+        metavar="PATH",
+        help="Unix socket of the daemon (default: in the user’s runtime directory)",
+    )
 
     return parser
 
 
-def main(argv: Sequence[str] | None = None) -> None:
-    args = parser().parse_args(argv, namespace=FormatArgs())
+def watch_directory(directory: Path, args: FormatArgs) -> None:
+    """Format the BibTeX files in `directory` now and whenever they change.
+
+    Formatted entries are kept in memory, so only changed entries are parsed
+    and formatted again. Runs until interrupted.
+    """
+    from .. import watch
+    from ..cache import MemoryCache
+    from ..tools import replace_file
+
+    cache = MemoryCache(_cache_options(args))
+    # The content of each file as last seen or written, to skip our own writes
+    known: dict[Path, str] = {}
 
+    def format_path(path: Path) -> None:
+        try:
+            text = read_text(path)
+            if known.get(path) == text:
+                return
+            string = _format_with_cache(text, str(path), args=args, cache=cache)
+            if string != text:
+                replace_file(path, lambda f: f.write(string))
+                sys.stderr.write(f"formatted {path}\n")
+        except Exception as e:  # noqa: BLE001
+            logger.error(f"Could not format {path}: {e}")  # noqa: TRY400
+            return
+        known[path] = string
+
+    # Start watching first, so that no changes get lost during the initial run
+    watcher = watch.watcher(directory)
+    try:
+        for path in sorted(watch.iter_bib_files(directory)):
+            format_path(path)
+        for paths in watcher:
+            for path in sorted(paths):
+                format_path(path)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+
+def _connect(args: FormatArgs, argv: Sequence[str] | None) -> int | None:
+    """Let a running daemon handle this invocation.
+
+    Returns the exit status, or None if no daemon is running.
+    """
+    from .. import daemon
+
+    sock = daemon.connect(args.socket or daemon.default_socket_path())
+    if sock is None:
+        return None
+    stdin = ""
+    for infile in args.infiles:
+        if infile is sys.stdin:
+            stdin = infile.read()
+        else:
+            infile.close()
+    return daemon.request(sock, sys.argv[1:] if argv is None else argv, stdin)
+
+
+def _parse_args(argv: Sequence[str] | None) -> FormatArgs:
+    """Parse the command line, rejecting combinations of options that can’t work."""
+    parser_ = parser()
+    args = parser_.parse_args(argv, namespace=FormatArgs())
+    if (
+        args.in_place
+        and not (args.watch or args.daemon)
+        and any(infile is sys.stdin for infile in args.infiles)
+    ):
+        parser_.error("stdin can’t be modified in place, pass file names with -i")
+    if args.in_place and args.dedupe:
+        # Merged entries from several files have no single file to go back to
+        parser_.error("--dedupe writes to stdout, and can’t be used with -i")
+    return args
+
+
+def _serve(argv: list[str]) -> int:
+    """Handle a request in the daemon."""
+    args = _parse_args(argv)
+    # The daemon stays in the locale of the previous request otherwise
+    use_locale(enable=args.collate)
+    if args.daemon:
+        msg = "The daemon can’t start another daemon"
+        raise SystemExit(msg)
+    if args.watch:
+        msg = "The daemon can’t watch directories"
+        raise SystemExit(msg)
+    return _dispatch(args)
+
+
+def _dispatch(args: FormatArgs) -> int:
+    """Format, check or deduplicate the files in `args`, locally or in the daemon."""
+    if args.dedupe:
+        return dedupe_files(args)
     return run(args)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = _parse_args(argv)
+    if args.collate:
+        use_locale()
+    if args.daemon:
+        from .. import daemon
+
+        for infile in args.infiles:
+            if infile is not sys.stdin:
+                infile.close()
+        daemon.serve(args.socket or daemon.default_socket_path(), _serve)
+        return 0
+    if args.watch:
+        for infile in args.infiles:
+            if infile is not sys.stdin:
+                infile.close()
+        watch_directory(args.watch, args)
+        return 0
+    if args.connect and (status := _connect(args, argv)) is not None:
+        return status
+    return _dispatch(args)
@@ -3,9 +3,15 @@
 from __future__ import annotations
 
 import argparse
+import errno
+import os
+import stat
 import sys
+from pathlib import Path
 from typing import TYPE_CHECKING
 
+from ..inputs import InputFile
+
 
 if TYPE_CHECKING:
     from collections.abc import Sequence
@@ -19,6 +25,26 @@ class FileParserArgs(argparse.Namespace):
     in_place: bool
 
 
+def input_file(path: str) -> IO[str]:
+    """Validate an input file argument without opening the file.
+
+    Like `argparse.FileType`, ``-`` stands for stdin.
+    Files are only opened when they are read (see `InputFile`),
+    so there is no limit on the number of input files.
+    """
+    if path == "-":
+        return sys.stdin
+    try:
+        if stat.S_ISDIR(Path(path).stat().st_mode):
+            raise IsADirectoryError(errno.EISDIR, os.strerror(errno.EISDIR), path)
+        if not os.access(path, os.R_OK):
+            raise PermissionError(errno.EACCES, os.strerror(errno.EACCES), path)
+    except OSError as e:
+        msg = f"can't open '{path}': {e}"
+        raise argparse.ArgumentTypeError(msg) from None
+    return InputFile(path)  # type: ignore[return-value]
+
+
 def add_file_parser_arguments(parser: argparse.ArgumentParser) -> None:
     """Add the file handling arguments to an argparse parser.
 
@@ -30,9 +56,9 @@ def add_file_parser_arguments(parser: argparse.ArgumentParser) -> None:
     """
     parser.add_argument(
         "infiles",
-        nargs="+",
-        type=argparse.FileType("r"),
-        default=sys.stdin,
+        nargs="*",
+        type=input_file,
+        default=[sys.stdin],
         help="input BibTeX files (default: stdin)",
     )
     parser.add_argument(
@@ -43,12 +69,31 @@ def add_file_parser_arguments(parser: argparse.ArgumentParser) -> None:
 class FormattingParserArgs(argparse.Namespace):
     """Bibtex formatting arguments."""
 
+    sort_by: str | None
+    #: deprecated, whether `sort_by` is ``"key"``
     sort_by_bibkey: bool
+    collate: bool
     indent: int | Literal["tab"]
     align: int
     delimiter_type: Literal["braces", "quotes"]
     doi_url_type: Literal["unchanged", "new", "short"]
     page_range_separator: str
+    preserve_title_capitalization: bool
+
+
+class _SortByAction(argparse.Action):
+    """Store the sort mode, and `sort_by_bibkey` for code that still uses it."""
+
+    def __call__(  # noqa: PLR0917
+        self,
+        parser: argparse.ArgumentParser,  # noqa: ARG002
+        namespace: argparse.Namespace,
+        values: str | Sequence[object] | None,
+        option_string: str | None = None,  # noqa: ARG002
+    ) -> None:
+        sort_by = values if isinstance(values, str) else self.const
+        namespace.sort_by = sort_by
+        namespace.sort_by_bibkey = sort_by == "key"
 
 
 def validate_indent(s: str) -> int | Literal["tab"]:
@@ -75,8 +120,32 @@ def add_formatting_parser_arguments(parser: argparse.ArgumentParser) -> None:
     formatting_group.add_argument(
         "-b",
         "--sort-by-bibkey",
+        action=_SortByAction,
+        nargs=0,
+        const="key",
+        dest="sort_by",
+        help="sort entries by BibTeX key, same as `--sort-by key`",
+    )
+    formatting_group.add_argument(
+        "--sort-by",
+        action=_SortByAction,
+        type=str.lower,
+        metavar="FIELD",
+        help=(
+            "sort entries by `key`, `year`, `author` (last name of the first author) "
+            "or any other field. "
+            "Entries without FIELD come last (default: keep the order)"
+        ),
+    )
+    parser.set_defaults(sort_by_bibkey=False)
+    formatting_group.add_argument(
+        "--collate",
         action="store_true",
-        help="sort entries by BibTeX key (default: false)",
+        help=(
+            "sort field values in the collation order of the user’s locale "
+            "instead of case-insensitively after transliterating them to ASCII. "
+            "Keys are always sorted by code point (default: false)"
+        ),
     )
     formatting_group.add_argument(
         "--indent",
@@ -117,3 +186,11 @@ def add_formatting_parser_arguments(parser: argparse.ArgumentParser) -> None:
         metavar="SEP",
         help="page range separator (default: --)",
     )
+    formatting_group.add_argument(
+        "--preserve-title-capitalization",
+        action="store_true",
+        help=(
+            "protect capitalized names and abbreviations in titles with {...}, "
+            "so that styles don’t lowercase them (default: false)"
+        ),
+    )
@@ -0,0 +1,148 @@
+"""Long-running formatter process, serving requests over a Unix socket.
+
+A request consists of the command line arguments, working directory and stdin
+of a client. The daemon runs them like a normal invocation and replies with
+the exit status, stdout and stderr. As the process stays alive,
+imports and caches (e.g. the dictionary or the shortDOI cache) are reused.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import socket
+import socketserver
+import sys
+import traceback
+from contextlib import redirect_stderr, redirect_stdout, suppress
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+
+
+_BUFFER_SIZE = 1 << 16
+
+
+def default_socket_path() -> Path:
+    """Get the per-user default socket path."""
+    from platformdirs import user_runtime_dir
+
+    return Path(user_runtime_dir("bibfmt")) / "bibfmt.sock"
+
+
+def connect(path: Path) -> socket.socket | None:
+    """Connect to the daemon listening on `path`.
+
+    Returns None if no daemon is running (or Unix sockets are not supported).
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(path))
+    except (FileNotFoundError, ConnectionRefusedError):
+        sock.close()
+        return None
+    return sock
+
+
+def request(sock: socket.socket, argv: Sequence[str], stdin: str = "") -> int:
+    """Let the daemon connected to via `sock` run `argv`.
+
+    The daemon’s output is written to stdout and stderr,
+    and its exit status is returned.
+    """
+    with sock:
+        message = {"argv": list(argv), "cwd": str(Path.cwd()), "stdin": stdin}
+        sock.sendall(json.dumps(message).encode())
+        sock.shutdown(socket.SHUT_WR)
+        response = json.loads(_read_all(sock))
+    sys.stdout.write(response["stdout"])
+    sys.stderr.write(response["stderr"])
+    return response["status"]
+
+
+def _read_all(sock: socket.socket) -> bytes:
+    return b"".join(iter(lambda: sock.recv(_BUFFER_SIZE), b""))
+
+
+class _RequestHandler(socketserver.BaseRequestHandler):
+    server: Server
+
+    def handle(self) -> None:
+        data = _read_all(self.request)
+        if not data:  # e.g. a check if the daemon is running
+            return
+        message = json.loads(data)
+        response = self.server.process(**message)
+        self.request.sendall(json.dumps(response).encode())
+
+
+class Server(socketserver.UnixStreamServer):
+    """Server running `main` for each request, one at a time.
+
+    Requests are handled sequentially, as each of them changes the working
+    directory and the standard streams of the whole process.
+    """
+
+    def __init__(self, path: Path, main: Callable[[list[str]], int]) -> None:
+        """Listen on `path`, replacing a stale socket file."""
+        if path.exists():
+            if (sock := connect(path)) is not None:
+                sock.close()
+                msg = f"A daemon is already listening on {path}"
+                raise RuntimeError(msg)
+            path.unlink()
+        path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        self.path = path
+        self.main = main
+        super().__init__(str(path), _RequestHandler)
+
+    def server_close(self) -> None:
+        """Close the socket and remove its file."""
+        super().server_close()
+        self.path.unlink(missing_ok=True)
+
+    def process(self, argv: list[str], cwd: str, stdin: str) -> dict[str, object]:
+        """Run `main` with the given arguments, working directory and stdin."""
+        stdout, stderr = io.StringIO(), io.StringIO()
+        stdin_file = io.StringIO(stdin)
+        stdin_file.name = "<stdin>"
+        old_cwd, old_stdin = Path.cwd(), sys.stdin
+        try:
+            os.chdir(cwd)
+            sys.stdin = stdin_file
+            with redirect_stdout(stdout), redirect_stderr(stderr):
+                status = self._run(argv)
+        finally:
+            sys.stdin = old_stdin
+            os.chdir(old_cwd)
+        return {
+            "status": status,
+            "stdout": stdout.getvalue(),
+            "stderr": stderr.getvalue(),
+        }
+
+    def _run(self, argv: list[str]) -> int:
+        try:
+            return self.main(argv)
+        except SystemExit as e:
+            if e.code is None or isinstance(e.code, int):
+                return e.code or 0
+            sys.stderr.write(f"{e.code}\n")
+            return 1
+        except Exception:  # noqa: BLE001
+            traceback.print_exc()
+            return 1
+
+
+def serve(path: Path, main: Callable[[list[str]], int]) -> None:
+    """Serve requests on `path` until interrupted."""
+    with Server(path, main) as server:
+        sys.stderr.write(f"bibfmt daemon listening on {path}\n")
+        with suppress(KeyboardInterrupt):
+            server.serve_forever()
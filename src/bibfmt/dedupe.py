@@ -0,0 +1,212 @@
+"""Find duplicate entries within and across bibliographies.
+
+Each entry is added to hash indexes on some normalized properties (criteria),
+and entries sharing a value in any index are duplicates of each other.
+Groups of duplicates are tracked with a union-find structure,
+so finding them takes near-linear time in the number of entries.
+
+>>> from bibfmt.dedupe import DuplicateIndex
+>>> index = DuplicateIndex()
+>>> for name, entries in bibliographies.items():
+...     index.add_all(entries, source=name)
+>>> for group in index.groups():
+...     print([index.records[i] for i in group])
+"""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+from typing import TYPE_CHECKING
+
+from .tools import doi_from_url, merge
+
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Hashable, Iterable, Mapping, Sequence
+
+    from pybtex.database import Entry
+
+    Criterion = Callable[[str, Entry], Hashable | None]
+
+
+_DOI_PREFIX_RE = re.compile(r"^(?:doi:\s*|https?://(?:dx\.)?doi\.org/)", re.IGNORECASE)
+_LATEX_COMMAND_RE = re.compile(r"\\(?:[a-zA-Z]+|.)")
+_NON_ALNUM_RE = re.compile(r"[\W_]+")
+
+
+def normalize_doi(value: str) -> str | None:
+    """Normalize a DOI or DOI URL, e.g. ``doi:10.1/ABC`` to ``10.1/abc``.
+
+    DOIs are case-insensitive. Returns None if `value` is not a DOI.
+    """
+    value = value.strip()
+    if (doi := doi_from_url(value)) is not None:
+        value = doi
+    value = _DOI_PREFIX_RE.sub("", value)
+    return value.lower() if value.startswith("10.") else None
+
+
+def fingerprint(text: str) -> str:
+    r"""Reduce `text` to its lowercase letters and digits.
+
+    LaTeX commands, braces, accents, punctuation and whitespace are removed,
+    so e.g. ``{M}{\"u}ller--Smith`` and ``Müller-Smith`` have the same fingerprint.
+    """
+    if "\\" in text:
+        text = _LATEX_COMMAND_RE.sub("", text)
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(c for c in text if not unicodedata.combining(c))
+    return _NON_ALNUM_RE.sub("", text.casefold())
+
+
+def _first_author(entry: Entry) -> str | None:
+    persons = entry.persons.get("author") or entry.persons.get("editor")
+    if not persons:
+        return None
+    return fingerprint(" ".join(persons[0].last_names)) or None
+
+
+def by_doi(_key: str, entry: Entry) -> str | None:
+    """Index entries by normalized DOI, from the doi or url field."""
+    for field in ("doi", "url"):
+        if (value := entry.fields.get(field)) and (doi := normalize_doi(value)):
+            return doi
+    return None
+
+
+def by_title(_key: str, entry: Entry) -> tuple[str, str] | None:
+    """Index entries by title fingerprint and year.
+
+    The year prevents e.g. editorials with the same title from matching.
+    """
+    if not (title := fingerprint(entry.fields.get("title", ""))):
+        return None
+    return title, entry.fields.get("year", "").strip()
+
+
+def by_author_year(_key: str, entry: Entry) -> tuple[str, str] | None:
+    """Index entries by the last name of the first author (or editor) and year.
+
+    This is very coarse, as authors often publish several works a year.
+    """
+    if (author := _first_author(entry)) is None:
+        return None
+    if not (year := entry.fields.get("year", "").strip()):
+        return None
+    return author, year
+
+
+def by_key(key: str, _entry: Entry) -> str:
+    """Index entries by their (case-insensitive) citation key."""
+    return key.lower()
+
+
+CRITERIA: dict[str, Criterion] = {
+    "doi": by_doi,
+    "title": by_title,
+    "author-year": by_author_year,
+    "key": by_key,
+}
+DEFAULT_CRITERIA = ("doi", "title", "key")
+
+
+class DuplicateIndex:
+    """Hash indexes of entries, grouping entries that match on any criterion.
+
+    Parameters
+    ----------
+    criteria
+        names of `CRITERIA` or functions mapping a key and entry to an index key
+        (or None if the entry can’t be indexed by it)
+
+    """
+
+    def __init__(self, criteria: Iterable[str | Criterion] = DEFAULT_CRITERIA) -> None:
+        """Create empty indexes."""
+        self.criteria = [CRITERIA[c] if isinstance(c, str) else c for c in criteria]
+        self.indexes: list[dict[Hashable, int]] = [{} for _ in self.criteria]
+        #: ``(source, key)`` of each added entry, by ID
+        self.records: list[tuple[str, str]] = []
+        self._parents: list[int] = []
+
+    def __len__(self) -> int:
+        """Get the number of added entries."""
+        return len(self.records)
+
+    def add(self, key: str, entry: Entry, source: str = "") -> int:
+        """Add `entry`, returning its ID (the index in `records`)."""
+        id_ = len(self.records)
+        self.records.append((source, key))
+        self._parents.append(id_)
+        for criterion, index in zip(self.criteria, self.indexes):
+            if (value := criterion(key, entry)) is None:
+                continue
+            if (other := index.setdefault(value, id_)) != id_:
+                self._union(other, id_)
+        return id_
+
+    def add_all(self, entries: Mapping[str, Entry], source: str = "") -> list[int]:
+        """Add all `entries` by key, returning their IDs."""
+        return [self.add(key, entry, source) for key, entry in entries.items()]
+
+    def find(self, id_: int) -> int:
+        """Get the ID of the first entry in the group of entry `id_`."""
+        parents = self._parents
+        root = id_
+        while parents[root] != root:
+            root = parents[root]
+        # Compress the path, so that later lookups are fast
+        while parents[id_] != root:
+            parents[id_], id_ = root, parents[id_]
+        return root
+
+    def _union(self, id1: int, id2: int) -> None:
+        root1, root2 = self.find(id1), self.find(id2)
+        if root1 != root2:
+            # Keep the earlier entry as root, so groups are ordered by addition
+            self._parents[max(root1, root2)] = min(root1, root2)
+
+    def groups(self) -> list[list[int]]:
+        """Get the IDs of duplicate entries, in groups of at least two."""
+        groups: dict[int, list[int]] = {}
+        for id_ in range(len(self._parents)):
+            groups.setdefault(self.find(id_), []).append(id_)
+        return [group for group in groups.values() if len(group) > 1]
+
+
+def merge_duplicates(
+    entries: Sequence[tuple[str, Entry]], groups: Iterable[Sequence[int]]
+) -> dict[str, Entry]:
+    """Merge duplicate entries.
+
+    Parameters
+    ----------
+    entries
+        ``(key, entry)`` pairs by ID, as added to a `DuplicateIndex`
+    groups
+        IDs of duplicates, as returned by `DuplicateIndex.groups`
+
+    Returns
+    -------
+    entries by key, with each group merged into its first entry
+    (whose key, type and non-empty fields take precedence)
+
+    """
+    merged_ids: dict[int, Sequence[int]] = {}
+    for group in groups:
+        for id_ in group:
+            merged_ids[id_] = group
+
+    out: dict[str, Entry] = {}
+    for id_, (key, entry) in enumerate(entries):
+        if (group := merged_ids.get(id_)) is None:
+            out.setdefault(key, entry)
+        elif group[0] == id_:
+            result = entries[group[-1]][1]
+            result = type(result)(result.type, result.fields, result.persons)
+            for other in reversed(group[:-1]):
+                result = merge(result, entries[other][1])
+            out[key] = result
+    return out
@@ -0,0 +1,261 @@
+"""Fast BibTeX parser producing pybtex data structures.
+
+This parser only handles well-formed input.
+Whenever it encounters something unexpected (syntax errors, undefined macros,
+duplicate fields, …), it hands the whole text over to pybtex’s parser,
+which then either handles it or reports the error.
+"""
+
+from __future__ import annotations
+
+import gc
+import re
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from pybtex.bibtex.utils import split_name_list
+from pybtex.database import BibliographyData, Entry, Person
+from pybtex.database.input import bibtex
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from typing import IO
+
+
+_NAME = f"[{re.escape(bibtex.NAME_CHARS)}][{re.escape(bibtex.NAME_CHARS)}0-9]*"
+_HEAD_RE = re.compile(rf"@\s*({_NAME})\s*([{{(])")
+_NAME_RE = re.compile(_NAME)
+_FIELD_RE = re.compile(rf"\s*({_NAME})\s*=")
+# A single, unconcatenated value without nested braces, followed by a separator
+_SIMPLE_VALUE_RE = re.compile(r'\s*(?:\{([^{}]*)\}|"([^{}"]*)"|([0-9]+))\s*(?=[,})])')
+_NUMBER_RE = re.compile(r"[0-9]+")
+_KEY_BRACE_RE = re.compile(r"[^\s,}]+")
+_KEY_PAREN_RE = re.compile(r"[^\s,]+")
+_WHITESPACE_RE = re.compile(r"\s*")
+_BRACES_RE = re.compile(r"[{}]")
+_QUOTED_RE = re.compile(r'[{}"]')
+
+_PERSON_FIELDS = frozenset(role.lower() for role in Person.valid_roles)
+
+
+class _FallbackError(Exception):
+    """Input that the fast parser does not handle."""
+
+
+@lru_cache(maxsize=4096)
+def _split_names(value: str) -> tuple[str, ...]:
+    return tuple(split_name_list(value))
+
+
+@lru_cache(maxsize=65536)
+def _name_parts(name: str) -> tuple[tuple[str, ...], ...]:
+    p = Person(name)
+    return (
+        tuple(p.first_names),
+        tuple(p.middle_names),
+        tuple(p.prelast_names),
+        tuple(p.last_names),
+        tuple(p.lineage_names),
+    )
+
+
+def _make_person(name: str) -> Person:
+    """Create a Person without re-parsing names that were seen before."""
+    first, middle, prelast, last, lineage = _name_parts(name)
+    person = Person.__new__(Person)
+    person.first_names = list(first)
+    person.middle_names = list(middle)
+    person.prelast_names = list(prelast)
+    person.last_names = list(last)
+    person.lineage_names = list(lineage)
+    return person
+
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    """Pause the cyclic garbage collector.
+
+    Parsing creates many long-lived objects without reference cycles,
+    which makes the collector run often and for nothing.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+class Parser:
+    """Drop-in replacement for :class:`pybtex.database.input.bibtex.Parser`.
+
+    Like pybtex’s parser, it accumulates entries in `data`
+    and remembers ``@string`` macros across calls of `parse_string`.
+    """
+
+    filename = "<INPUT>"
+
+    def __init__(self) -> None:
+        """Create a parser that knows the default month macros."""
+        self.macros = {k.lower(): v for k, v in bibtex.month_names.items()}
+        self.data = BibliographyData()
+
+    def parse_string(self, text: str) -> BibliographyData:
+        """Parse a BibTeX string, falling back to pybtex for unexpected input."""
+        scanner = _Scanner(text, dict(self.macros))
+        try:
+            with _gc_paused():
+                scanner.parse()
+        except _FallbackError:
+            parser = bibtex.Parser(macros=self.macros)
+            parser.filename = self.filename
+            parser.data = self.data
+            parser.parse_string(text)
+            self.macros = {k.lower(): v for k, v in parser.macros.items()}
+            return self.data
+
+        self.macros = scanner.macros
+        self.data.add_to_preamble(*scanner.preamble)
+        for key, entry in scanner.entries:
+            self.data.add_entry(key, entry)
+        return self.data
+
+    def parse_file(self, infile: IO[str]) -> BibliographyData:
+        """Parse a BibTeX file, see `parse_string`."""
+        self.filename = infile.name
+        with infile:
+            text = infile.read()
+        return self.parse_string(text)
+
+
+class _Scanner:
+    """Scanner-based parser for well-formed BibTeX."""
+
+    def __init__(self, text: str, macros: dict[str, str]) -> None:
+        self.text = text
+        self.macros = macros
+        self.entries: list[tuple[str, Entry]] = []
+        self.preamble: list[str] = []
+
+    def skip_whitespace(self, pos: int) -> int:
+        return _WHITESPACE_RE.match(self.text, pos).end()
+
+    def expect(self, char: str, pos: int) -> int:
+        pos = self.skip_whitespace(pos)
+        if not self.text.startswith(char, pos):
+            raise _FallbackError
+        return pos + 1
+
+    def parse(self) -> None:
+        text = self.text
+        pos = 0
+        while (start := text.find("@", pos)) >= 0:
+            m = _HEAD_RE.match(text, start)
+            if m is None:
+                raise _FallbackError
+            command, pos = m[1], m.end()
+            closing = "}" if m[2] == "{" else ")"
+            command_lower = command.lower()
+            if command_lower == "comment":
+                continue
+            if command_lower == "string":
+                m = _NAME_RE.match(text, self.skip_whitespace(pos))
+                if m is None:
+                    raise _FallbackError
+                value, pos = self.parse_value(self.expect("=", m.end()))
+                self.macros[m[0].lower()] = value
+            elif command_lower == "preamble":
+                value, pos = self.parse_value(pos)
+                self.preamble.append(" ".join(value.split()))
+            else:
+                pos = self.parse_entry(command, pos, closing)
+                continue
+            pos = self.expect(closing, pos)
+
+    def parse_entry(self, command: str, pos: int, closing: str) -> int:
+        text = self.text
+        key_re = _KEY_BRACE_RE if closing == "}" else _KEY_PAREN_RE
+        m = key_re.match(text, self.skip_whitespace(pos))
+        if m is None:
+            raise _FallbackError
+        key, pos = m[0], m.end()
+
+        entry = Entry(command)
+        # Names are only parsed once the entry is known to be well-formed,
+        # so that pybtex reports syntax errors before name errors, like it does
+        names: list[tuple[str, str]] = []
+        seen_fields: set[str] = set()
+        while True:
+            if m := _FIELD_RE.match(text, pos):
+                field_name = m[1]
+                field_lower = field_name.lower()
+                if field_lower in seen_fields:
+                    raise _FallbackError
+                seen_fields.add(field_lower)
+                if v := _SIMPLE_VALUE_RE.match(text, m.end()):
+                    value, pos = v[v.lastindex], v.end()
+                else:
+                    value, pos = self.parse_value(m.end())
+                value = " ".join(value.split())
+                if field_lower in _PERSON_FIELDS:
+                    names.extend((name, field_name) for name in _split_names(value))
+                else:
+                    entry.fields[field_name] = value
+            pos = self.skip_whitespace(pos)
+            if not text.startswith(",", pos):
+                break
+            pos += 1
+
+        pos = self.expect(closing, pos)
+        for name, role in names:
+            entry.add_person(_make_person(name), role)
+        self.entries.append((key, entry))
+        return pos
+
+    def parse_value(self, pos: int) -> tuple[str, int]:
+        """Parse a (possibly concatenated) value. Returns it and the end position."""
+        text = self.text
+        parts = []
+        while True:
+            pos = self.skip_whitespace(pos)
+            char = text[pos : pos + 1]
+            if char in {"{", '"'}:
+                end = self.find_string_end(pos + 1, char)
+                parts.append(text[pos + 1 : end])
+                pos = end + 1
+            elif m := _NUMBER_RE.match(text, pos):
+                parts.append(m[0])
+                pos = m.end()
+            elif m := _NAME_RE.match(text, pos):
+                try:
+                    parts.append(self.macros[m[0].lower()])
+                except KeyError:
+                    raise _FallbackError from None
+                pos = m.end()
+            else:
+                raise _FallbackError
+            pos = self.skip_whitespace(pos)
+            if not text.startswith("#", pos):
+                return "".join(parts), pos
+            pos += 1
+
+    def find_string_end(self, pos: int, opening: str) -> int:
+        """Find the closing delimiter of a string whose content starts at `pos`."""
+        pattern = _BRACES_RE if opening == "{" else _QUOTED_RE
+        depth = 0
+        for m in pattern.finditer(self.text, pos):
+            char = m[0]
+            if char == "{":
+                depth += 1
+            elif depth > 0:
+                if char == "}":
+                    depth -= 1
+            elif (char == "}" and opening == "{") or char == '"':
+                return m.start()
+            else:
+                # unbalanced closing brace in quoted string
+                raise _FallbackError
+        raise _FallbackError
@@ -0,0 +1,224 @@
+r"""Remove fields by name patterns, entry type and value size.
+
+Patterns are field names (``abstract``), globs (``mendeley-*``)
+or regular expressions between slashes (``/^x-/``), all case-insensitive.
+A pattern can be restricted to entry types by prefixing it with a type pattern,
+e.g. ``misc:note`` or ``*thesis:school``.
+
+A `FieldFilter` compiles all patterns applying to an entry type into a `Matcher`
+(a set of exact names and one combined regular expression),
+and decides once per entry type and field name whether to remove the field:
+
+>>> from bibfmt.filters import FieldFilter
+>>> field_filter = FieldFilter(
+...     drop=["file", "mendeley-*", "misc:note"], max_size={"abstract": 4096}
+... )
+>>> for entry in entries.values():
+...     field_filter(entry)
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import re
+from typing import TYPE_CHECKING
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+
+    from pybtex.database import Entry
+
+    from .model import Entry as ModelEntry
+
+    Rule = tuple["Matcher | None", str]
+
+
+_GLOB_CHARS = frozenset("*?[")
+_SIZE_RE = re.compile(r"(\d+)\s*([kmg]?)(?:i?b)?", re.IGNORECASE)
+_SIZE_UNITS = {"": 1, "k": 1 << 10, "m": 1 << 20, "g": 1 << 30}
+
+
+class Matcher:
+    """Match names against patterns, case-insensitively.
+
+    Exact names are looked up in a set, and all globs and regular expressions
+    are combined into a single regular expression.
+
+    Parameters
+    ----------
+    patterns
+        names, globs, or regular expressions between slashes
+
+    Raises
+    ------
+    ValueError
+        if a regular expression is invalid
+
+    """
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        """Compile `patterns`."""
+        names: set[str] = set()
+        regexes: list[str] = []
+        for pattern in patterns:
+            if len(pattern) > 1 and pattern[0] == pattern[-1] == "/":
+                regex = pattern[1:-1]
+                try:
+                    re.compile(regex)
+                except re.error as e:
+                    msg = f"Invalid regular expression {pattern!r}: {e}"
+                    raise ValueError(msg) from None
+                regexes.append(f"(?:{regex})")
+            elif _GLOB_CHARS.isdisjoint(pattern):
+                names.add(pattern.lower())
+            else:
+                # Globs match whole names, regular expressions anywhere
+                regexes.append(rf"\A{fnmatch.translate(pattern.lower())}")
+        self.names = frozenset(names)
+        self.regex = re.compile("|".join(regexes), re.IGNORECASE) if regexes else None
+
+    def __call__(self, name: str) -> bool:
+        """Check if the lowercase `name` matches any pattern."""
+        return name in self.names or (
+            self.regex is not None and self.regex.search(name) is not None
+        )
+
+
+def split_rule(rule: str) -> tuple[str | None, str]:
+    """Split a rule like ``misc:note`` into its type pattern and field pattern."""
+    if rule[:1] != "/" and ":" in rule:
+        type_, _, pattern = rule.partition(":")
+        return type_ or None, pattern
+    return None, rule
+
+
+def parse_size(size: str) -> int:
+    """Parse a size in bytes, with an optional unit, e.g. ``4K`` or ``1MiB``."""
+    if (match := _SIZE_RE.fullmatch(size.strip())) is None:
+        msg = f"Invalid size {size!r} (expected a number of bytes, e.g. 4096 or 4K)"
+        raise ValueError(msg)
+    return int(match[1]) * _SIZE_UNITS[match[2].lower()]
+
+
+def parse_max_size(spec: str) -> tuple[str, int]:
+    """Parse a size limit like ``abstract=4K`` into a rule and a size in bytes."""
+    rule, sep, size = spec.rpartition("=")
+    if not sep or not rule:
+        msg = f"Invalid size limit {spec!r} (expected FIELD=SIZE, e.g. abstract=4K)"
+        raise ValueError(msg)
+    return rule, parse_size(size)
+
+
+class _TypeFilter:
+    """Decisions of a `FieldFilter` for a single entry type."""
+
+    def __init__(
+        self, drop: Matcher, keep: Matcher | None, limits: list[tuple[Matcher, int]]
+    ) -> None:
+        self.drop = drop
+        self.keep = keep
+        self.limits = limits
+        self.decisions: dict[str, tuple[bool, int | None]] = {}
+
+    def decide(self, field: str) -> tuple[bool, int | None]:
+        """Get whether to drop `field`, and the size limit of its values."""
+        name = field.lower()
+        dropped = (self.keep is not None and not self.keep(name)) or self.drop(name)
+        limit = min((size for m, size in self.limits if m(name)), default=None)
+        decision = self.decisions[field] = (dropped, limit)
+        return decision
+
+
+class FieldFilter:
+    """Remove fields from entries.
+
+    Fields are removed if keep rules apply to the entry and the field matches none
+    of them, if it matches any drop rule, or if its value exceeds a size limit.
+    Persons (e.g. authors) are not fields, and are never removed.
+
+    Parameters
+    ----------
+    drop
+        rules for fields to remove, see `split_rule`
+    keep
+        rules for fields to keep, removing all others of the entry types they apply to
+    max_size
+        maximum size of the UTF-8 encoded values of fields, by rule
+
+    Raises
+    ------
+    ValueError
+        if a rule contains an invalid regular expression
+
+    """
+
+    def __init__(
+        self,
+        drop: Iterable[str] = (),
+        keep: Iterable[str] = (),
+        max_size: Mapping[str, int] | None = None,
+    ) -> None:
+        """Compile the rules."""
+        self._drop = [_compile_rule(rule) for rule in drop]
+        self._keep = [_compile_rule(rule) for rule in keep]
+        self._max_size = [
+            (_compile_rule(rule), size) for rule, size in (max_size or {}).items()
+        ]
+        patterns = [
+            *(pattern for _, pattern in self._drop),
+            *(pattern for (_, pattern), _ in self._max_size),
+        ]
+        # Validate all field patterns up front
+        all_fields = Matcher([*patterns, *(pattern for _, pattern in self._keep)])
+        #: lowercase names of the fields that can be removed (None: any field)
+        self.fields = None if self._keep or all_fields.regex else all_fields.names
+        self._types: dict[str, _TypeFilter] = {}
+
+    def _type_filter(self, type_: str) -> _TypeFilter:
+        """Compile the rules that apply to entries of type `type_`."""
+        name = type_.lower()
+
+        def applies(type_matcher: Matcher | None) -> bool:
+            return type_matcher is None or type_matcher(name)
+
+        keep = [pattern for t, pattern in self._keep if applies(t)]
+        type_filter = self._types[type_] = _TypeFilter(
+            Matcher(pattern for t, pattern in self._drop if applies(t)),
+            Matcher(keep) if keep else None,
+            [(Matcher([p]), size) for (t, p), size in self._max_size if applies(t)],
+        )
+        return type_filter
+
+    def __call__(self, entry: Entry | ModelEntry) -> None:
+        """Remove fields from `entry` in place."""
+        fields = entry.fields
+        if not fields:
+            return
+        type_filter = self._types.get(entry.type) or self._type_filter(entry.type)
+        decisions = type_filter.decisions
+        remove = []
+        for key in fields:
+            dropped, limit = decisions.get(key) or type_filter.decide(key)
+            # Only look up values that can be too large
+            if dropped or (limit is not None and _size(fields[key]) > limit):
+                remove.append(key)
+        for key in remove:
+            del fields[key]
+
+    def filter(self, d: Mapping[str, Entry | ModelEntry]) -> None:
+        """Remove fields from all entries in place."""
+        for entry in d.values():
+            self(entry)
+
+
+def _compile_rule(rule: str) -> Rule:
+    type_pattern, pattern = split_rule(rule)
+    return (None if type_pattern is None else Matcher([type_pattern])), pattern
+
+
+def _size(value: object) -> int:
+    """Get the size of `value` in UTF-8, without encoding ASCII strings."""
+    if not isinstance(value, str):
+        return 0
+    return len(value) if value.isascii() else len(value.encode())
@@ -0,0 +1,115 @@
+"""Lazy, memory-mapped reading of input files.
+
+Opening all input files up front holds a file descriptor per file,
+which fails for thousands of files (e.g. when run by pre-commit).
+An `InputFile` is only opened when it is read, and closed again right after.
+
+Files are usually read as a whole, so they are decoded in bulk:
+Large files are memory-mapped and decoded straight from the mapping,
+without copying them into a `bytes` object first.
+"""
+
+from __future__ import annotations
+
+import locale
+import mmap
+import os
+from typing import TYPE_CHECKING
+
+
+if TYPE_CHECKING:
+    from typing import IO
+
+    from _typeshed import StrPath
+    from typing_extensions import Self
+
+
+#: Files with fewer bytes are read instead of memory-mapped
+MMAP_MIN_SIZE = 1 << 20
+
+
+def default_encoding() -> str:
+    """Get the encoding that `open` uses by default."""
+    return locale.getpreferredencoding(False)  # noqa: FBT003
+
+
+def read_text(path: StrPath, encoding: str | None = None) -> str:
+    r"""Read and decode a whole file, like `Path.read_text`.
+
+    Parameters
+    ----------
+    path
+        file to read
+    encoding
+        text encoding (default: the same as for `open`)
+
+    Returns
+    -------
+    the file’s content, with universal newlines translated to ``\n``
+
+    """
+    encoding = encoding or default_encoding()
+    with open(path, "rb") as f:  # noqa: PTH123
+        size = os.fstat(f.fileno()).st_size
+        if size and size >= MMAP_MIN_SIZE:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                text = str(mapped, encoding)
+        else:
+            text = f.read().decode(encoding)
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+class InputFile:
+    """Text file that is only open while it is being read.
+
+    Supports the parts of the text file interface the formatter uses:
+    `name`, `encoding`, `read`, `close` and use as a context manager.
+    Reading the whole file (the usual case) goes through `read_text`
+    and doesn’t keep the file open at all.
+
+    Parameters
+    ----------
+    path
+        file to read
+    encoding
+        text encoding (default: the same as for `open`)
+
+    """
+
+    def __init__(self, path: StrPath, encoding: str | None = None) -> None:
+        """Remember `path` without opening it."""
+        self.name = os.fspath(path)
+        self.encoding = encoding or default_encoding()
+        self._file: IO[str] | None = None
+        self._exhausted = False
+
+    def read(self, size: int | None = -1) -> str:
+        """Read at most `size` characters, or the rest of the file."""
+        if self._exhausted:
+            return ""
+        if self._file is None and (size is None or size < 0):
+            self._exhausted = True
+            return read_text(self.name, self.encoding)
+        if self._file is None:
+            self._file = open(self.name, encoding=self.encoding)  # noqa: PTH123, SIM115
+        return self._file.read(size)
+
+    def close(self) -> None:
+        """Close the file if it is open."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> Self:
+        """Return the file itself."""
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        """Close the file."""
+        self.close()
+
+    def __repr__(self) -> str:
+        """Represent the file by its name."""
+        return f"{type(self).__name__}({self.name!r})"
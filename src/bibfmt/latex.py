@@ -0,0 +1,71 @@
+"""Memoized conversion between LaTeX and Unicode.
+
+Author names and journal titles repeat heavily across a bibliography,
+so conversions are cached, and the pylatexenc translators are reused.
+Strings that pylatexenc would return unchanged (plain ASCII without special
+characters or ligatures) skip both the cache and the translator.
+"""
+
+from __future__ import annotations
+
+import re
+from functools import cache, lru_cache
+from typing import TYPE_CHECKING
+
+
+if TYPE_CHECKING:
+    from pylatexenc.latex2text import LatexNodes2Text
+    from pylatexenc.latexencode import UnicodeToLatexEncoder
+
+
+#: Maximum number of cached conversions in each direction
+CACHE_SIZE = 1 << 16
+
+# Characters and ligatures (e.g. -- for an en dash) that LaTeX-to-text converts
+_LATEX_RE = re.compile(r"[$%&\\{}~]|--|''|[`!?]`")
+# ASCII characters that text-to-LaTeX escapes
+_ESCAPE_RE = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f"#$%&<>\\^_{}~]')
+
+
+@cache
+def _latex_nodes_to_text() -> LatexNodes2Text:
+    from pylatexenc.latex2text import LatexNodes2Text
+
+    return LatexNodes2Text()
+
+
+@cache
+def _unicode_to_latex_encoder() -> UnicodeToLatexEncoder:
+    from pylatexenc.latexencode import UnicodeToLatexEncoder
+
+    return UnicodeToLatexEncoder()
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _latex_to_text(value: str) -> str:
+    return _latex_nodes_to_text().latex_to_text(value)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _text_to_latex(value: str) -> str:
+    return _unicode_to_latex_encoder().unicode_to_latex(value)
+
+
+def latex_to_text(value: str) -> str:
+    """Convert a LaTeX string to Unicode text."""
+    if value.isascii() and not _LATEX_RE.search(value):
+        return value
+    return _latex_to_text(value)
+
+
+def text_to_latex(value: str) -> str:
+    """Convert Unicode text to a LaTeX string."""
+    if value.isascii() and not _ESCAPE_RE.search(value):
+        return value
+    return _text_to_latex(value)
+
+
+def cache_clear() -> None:
+    """Clear the caches of both conversions."""
+    _latex_to_text.cache_clear()
+    _text_to_latex.cache_clear()
@@ -0,0 +1,192 @@
+"""Compact representation of BibTeX entries.
+
+pybtex’s `Entry` and `Person` classes are convenient, but heavy:
+Each person carries several lists, and each entry two case-insensitive dicts
+that keep track of the key order separately.
+For large bibliographies, memory is dominated by this per-object overhead.
+
+The classes here use ``__slots__``, tuples and plain dicts instead.
+Field and role names are lowercased and interned, as are name parts,
+which tend to repeat across a bibliography.
+The formatting functions and transforms work on both representations,
+so conversion to and from pybtex only happens when parsing (and on request).
+"""
+
+from __future__ import annotations
+
+import sys
+from typing import TYPE_CHECKING
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping, MutableMapping
+
+    import pybtex.database
+
+
+_intern = sys.intern
+
+
+class Person:
+    """Name of a person, split into parts like pybtex’s `Person`."""
+
+    __slots__ = (
+        "first_names",
+        "last_names",
+        "lineage_names",
+        "middle_names",
+        "prelast_names",
+    )
+
+    def __init__(
+        self,
+        first_names: Iterable[str] = (),
+        last_names: Iterable[str] = (),
+        *,
+        middle_names: Iterable[str] = (),
+        prelast_names: Iterable[str] = (),
+        lineage_names: Iterable[str] = (),
+    ) -> None:
+        """Create a person from the parts of their name."""
+        self.first_names = tuple(map(_intern, first_names))
+        self.middle_names = tuple(map(_intern, middle_names))
+        self.prelast_names = tuple(map(_intern, prelast_names))
+        self.last_names = tuple(map(_intern, last_names))
+        self.lineage_names = tuple(map(_intern, lineage_names))
+
+    @classmethod
+    def from_pybtex(cls, person: pybtex.database.Person) -> Person:
+        """Convert a pybtex `Person`."""
+        return cls(
+            person.first_names,
+            person.last_names,
+            middle_names=person.middle_names,
+            prelast_names=person.prelast_names,
+            lineage_names=person.lineage_names,
+        )
+
+    def to_pybtex(self) -> pybtex.database.Person:
+        """Convert to a pybtex `Person`."""
+        from pybtex.database import Person as PybtexPerson
+
+        person = PybtexPerson()
+        person.first_names = list(self.first_names)
+        person.middle_names = list(self.middle_names)
+        person.prelast_names = list(self.prelast_names)
+        person.last_names = list(self.last_names)
+        person.lineage_names = list(self.lineage_names)
+        return person
+
+    def __eq__(self, other: object) -> bool:
+        """Compare all name parts."""
+        if not isinstance(other, Person):
+            return NotImplemented
+        return all(getattr(self, a) == getattr(other, a) for a in self.__slots__)
+
+    def __hash__(self) -> int:
+        """Hash all name parts."""
+        return hash(tuple(getattr(self, a) for a in self.__slots__))
+
+    def __repr__(self) -> str:
+        """Represent the person with all name parts."""
+        args = ", ".join(f"{a}={getattr(self, a)!r}" for a in self.__slots__)
+        return f"{type(self).__name__}({args})"
+
+
+class Entry:
+    """BibTeX entry with lowercase field and role names.
+
+    Parameters
+    ----------
+    type_
+        entry type, e.g. ``"article"``
+    fields
+        field values by name
+    persons
+        persons by role, e.g. ``"author"``
+
+    """
+
+    __slots__ = ("fields", "persons", "type")
+
+    def __init__(
+        self,
+        type_: str,
+        fields: Mapping[str, str] | Iterable[tuple[str, str]] = (),
+        persons: Mapping[str, Iterable[Person]] | None = None,
+    ) -> None:
+        """Create an entry, copying `fields` and `persons`."""
+        self.type = _intern(type_.lower())
+        self.fields: dict[str, str] = {
+            _intern(k.lower()): v for k, v in dict(fields).items()
+        }
+        self.persons: dict[str, tuple[Person, ...]] = {
+            _intern(role.lower()): tuple(ps) for role, ps in (persons or {}).items()
+        }
+
+    @classmethod
+    def from_pybtex(cls, entry: pybtex.database.Entry) -> Entry:
+        """Convert a pybtex `Entry`."""
+        return cls(
+            entry.type,
+            entry.fields.items(),
+            {
+                role: (Person.from_pybtex(p) for p in persons)
+                for role, persons in entry.persons.items()
+            },
+        )
+
+    def to_pybtex(self) -> pybtex.database.Entry:
+        """Convert to a pybtex `Entry`."""
+        from pybtex.database import Entry as PybtexEntry
+
+        return PybtexEntry(
+            self.type,
+            fields=self.fields,
+            persons={
+                role: [p.to_pybtex() for p in persons]
+                for role, persons in self.persons.items()
+            },
+        )
+
+    def __eq__(self, other: object) -> bool:
+        """Compare type, fields and persons."""
+        if not isinstance(other, Entry):
+            return NotImplemented
+        return (self.type, self.fields, self.persons) == (
+            other.type,
+            other.fields,
+            other.persons,
+        )
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        """Represent the entry with its type, fields and persons."""
+        return (
+            f"{type(self).__name__}({self.type!r}, "
+            f"fields={self.fields!r}, persons={self.persons!r})"
+        )
+
+
+def from_pybtex(entries: Mapping[str, pybtex.database.Entry]) -> dict[str, Entry]:
+    """Convert pybtex entries by key."""
+    return {key: Entry.from_pybtex(entry) for key, entry in entries.items()}
+
+
+def pop_pybtex(
+    entries: MutableMapping[str, pybtex.database.Entry],
+) -> dict[str, Entry]:
+    """Convert pybtex entries by key, removing each from `entries` once converted.
+
+    This keeps the peak memory close to that of a single copy of the entries,
+    unlike `from_pybtex`, after which both copies are alive until `entries` is freed.
+    """
+    return {key: Entry.from_pybtex(entries.pop(key)) for key in list(entries)}
+
+
+def to_pybtex(entries: Mapping[str, Entry]) -> pybtex.database.BibliographyData:
+    """Convert entries by key to pybtex `BibliographyData`."""
+    from pybtex.database import BibliographyData
+
+    return BibliographyData({key: entry.to_pybtex() for key, entry in entries.items()})
@@ -0,0 +1,266 @@
+r"""Normalization of field values with precompiled, fused rules.
+
+A `Normalizer` combines rules into one pass over each field value:
+The rules applying to a field are looked up once per field name,
+and consecutive `TranslateRule` instances are merged into a single translation table.
+
+Rules registered with `register` are applied by the CLI after the built-in ones:
+
+>>> from bibfmt import normalize
+>>> normalize.register(normalize.TranslateRule({"\N{NO-BREAK SPACE}": " "}))
+"""
+
+from __future__ import annotations
+
+import re
+from abc import ABC, abstractmethod
+from functools import cached_property, lru_cache
+from typing import TYPE_CHECKING
+
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Mapping
+
+    from pybtex.database import Entry
+
+    Steps = tuple[Callable[[str], str], ...]
+
+
+class Rule(ABC):
+    """Normalization of the values of some fields.
+
+    Subclasses implement `__call__`.
+
+    Parameters
+    ----------
+    fields
+        names of the fields to apply the rule to (default: all fields)
+    exclude
+        names of fields not to apply the rule to
+
+    """
+
+    def __init__(
+        self, *, fields: Iterable[str] | None = None, exclude: Iterable[str] = ()
+    ) -> None:
+        """Create a rule that applies to `fields` except `exclude`."""
+        self.fields = None if fields is None else {f.lower() for f in fields}
+        self.exclude = {f.lower() for f in exclude}
+
+    def applies_to(self, field: str) -> bool:
+        """Check if the rule applies to the lowercase `field` name."""
+        return field not in self.exclude and (
+            self.fields is None or field in self.fields
+        )
+
+    @abstractmethod
+    def __call__(self, value: str) -> str:
+        """Normalize `value`."""
+
+
+class TranslateRule(Rule):
+    """Replace single characters, see :meth:`str.translate`."""
+
+    def __init__(
+        self,
+        table: Mapping[str | int, str | int | None],
+        *,
+        fields: Iterable[str] | None = None,
+        exclude: Iterable[str] = (),
+    ) -> None:
+        """Create a rule replacing the keys of `table` with its values."""
+        super().__init__(fields=fields, exclude=exclude)
+        self.table = {
+            ord(k) if isinstance(k, str) else k: chr(v) if isinstance(v, int) else v
+            for k, v in table.items()
+        }
+
+    def __call__(self, value: str) -> str:
+        """Translate the characters of `value`."""
+        return value.translate(self.table)
+
+    def then(self, other: TranslateRule) -> dict[int, str | None]:
+        """Get a table that has the same effect as this table followed by `other`'s."""
+        return {
+            **other.table,
+            **{k: v and v.translate(other.table) for k, v in self.table.items()},
+        }
+
+
+class RegexRule(Rule):
+    """Replace matches of a regular expression, see :meth:`re.Pattern.sub`."""
+
+    def __init__(
+        self,
+        pattern: str | re.Pattern[str],
+        repl: str | Callable[[re.Match[str]], str],
+        *,
+        fields: Iterable[str] | None = None,
+        exclude: Iterable[str] = (),
+    ) -> None:
+        """Create a rule replacing matches of `pattern` with `repl`."""
+        super().__init__(fields=fields, exclude=exclude)
+        self.pattern = re.compile(pattern)
+        self.repl = repl
+
+    def __call__(self, value: str) -> str:
+        """Replace all matches in `value`."""
+        return self.pattern.sub(self.repl, value)
+
+
+class FunctionRule(Rule):
+    """Normalize values with an arbitrary function."""
+
+    def __init__(
+        self,
+        func: Callable[[str], str],
+        *,
+        fields: Iterable[str] | None = None,
+        exclude: Iterable[str] = (),
+    ) -> None:
+        """Create a rule applying `func` to values."""
+        super().__init__(fields=fields, exclude=exclude)
+        self.func = func
+
+    def __call__(self, value: str) -> str:
+        """Apply the function to `value`."""
+        return self.func(value)
+
+
+class Normalizer:
+    """Apply rules to the fields of entries, in one pass over each value."""
+
+    def __init__(self, rules: Iterable[Rule] = ()) -> None:
+        """Create a normalizer applying `rules` in order."""
+        self.rules = list(rules)
+        self._steps: dict[str, Steps] = {}
+
+    def register(self, rule: Rule) -> None:
+        """Apply `rule` after the existing rules."""
+        self.rules.append(rule)
+        self._steps.clear()
+        self.__dict__.pop("_plan", None)
+
+    def steps(self, field: str) -> Steps:
+        """Get the functions to apply to values of `field`, in order."""
+        field = field.lower()
+        if (steps := self._steps.get(field)) is not None:
+            return steps
+
+        rules: list[Rule] = []
+        for rule in self.rules:
+            if not rule.applies_to(field):
+                continue
+            if (
+                isinstance(rule, TranslateRule)
+                and rules
+                and isinstance(prev := rules[-1], TranslateRule)
+            ):
+                rules[-1] = TranslateRule(prev.then(rule))
+                continue
+            rules.append(rule)
+        steps = self._steps[field] = tuple(rules)
+        return steps
+
+    def normalize_value(self, field: str, value: str) -> str:
+        """Normalize a single `value` of `field`."""
+        return _apply(self.steps(field), value)
+
+    @property
+    def fields(self) -> frozenset[str] | None:
+        """Get the names of all fields any rule applies to (None if unrestricted)."""
+        if any(rule.fields is None for rule in self.rules):
+            return None
+        return frozenset().union(*(rule.fields or () for rule in self.rules))
+
+    def normalize(self, d: Mapping[str, Entry]) -> None:
+        """Normalize the fields of all entries in place."""
+        for entry in d.values():
+            self.normalize_entry(entry)
+
+    def normalize_entry(self, entry: Entry) -> None:
+        """Normalize the fields of `entry` in place."""
+        fields = entry.fields
+        if (plan := self._plan) is not None:
+            # Only look up the fields that rules apply to
+            for name, steps in plan:
+                value = fields.get(name)
+                if not isinstance(value, str):
+                    continue
+                if (new_value := _apply(steps, value)) != value:
+                    fields[name] = new_value
+            return
+
+        updates = {}
+        for key, value in fields.items():
+            if not isinstance(value, str) or not (steps := self.steps(key)):
+                continue
+            if (new_value := _apply(steps, value)) != value:
+                updates[key] = new_value
+        fields.update(updates)
+
+    @cached_property
+    def _plan(self) -> list[tuple[str, Steps]] | None:
+        """Get the steps per field if the rules only apply to some fields."""
+        if (names := self.fields) is None:
+            return None
+        return [(name, steps) for name in sorted(names) if (steps := self.steps(name))]
+
+
+def _apply(steps: Steps, value: str) -> str:
+    for step in steps:
+        value = step(value)
+    return value
+
+
+DASHES = (
+    "-"
+    "\N{HYPHEN}"
+    "\N{NON-BREAKING HYPHEN}"
+    "\N{FIGURE DASH}"
+    "\N{EN DASH}"
+    "\N{EM DASH}"
+    "\N{HORIZONTAL BAR}"
+)
+_DASHES_RE = re.compile(f"[{DASHES}]+")
+_SPACES_RE = re.compile(" {2,}")
+
+
+def page_range_rule(separator: str) -> RegexRule:
+    """Replace any number of dashes (hyphen, en, em, etc.) in page ranges."""
+    # Escape backslashes and group references
+    return RegexRule(_DASHES_RE, separator.replace("\\", "\\\\"), fields=["pages"])
+
+
+#: Collapse sequences of spaces and remove trailing whitespace
+SPACES_RULE = FunctionRule(
+    lambda value: _SPACES_RE.sub(" ", value).rstrip(), exclude=["url", "doi"]
+)
+
+_registered: list[Rule] = []
+
+
+def register(rule: Rule) -> None:
+    """Register a rule that `normalize` applies after the built-in ones."""
+    _registered.append(rule)
+    normalizer.cache_clear()
+
+
+@lru_cache(maxsize=8)
+def normalizer(page_range_separator: str = "--") -> Normalizer:
+    """Get a normalizer applying the built-in and registered rules."""
+    return Normalizer([page_range_rule(page_range_separator), *_registered])
+
+
+def normalize(d: Mapping[str, Entry], *, page_range_separator: str = "--") -> None:
+    """Apply the built-in and registered rules to all entries in place.
+
+    Parameters
+    ----------
+    d
+        dictionary of bibtex entries
+    page_range_separator
+        separator for page ranges
+
+    """
+    normalizer(page_range_separator).normalize(d)
@@ -0,0 +1,226 @@
+"""Format a single large bibliography in parallel processes.
+
+Sending parsed entries to worker processes costs more than transforming and
+formatting them, so the source text is split instead: Each worker parses,
+transforms and formats a chunk of commands, and only strings are sent
+back and forth. The ``@string`` macros defined before a chunk are sent along.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import re
+from operator import itemgetter
+from typing import TYPE_CHECKING
+
+from . import profile
+from .model import pop_pybtex
+from .pipeline import default_pipeline
+from .tools import iter_segments, new_parser
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Mapping
+    from typing import Literal
+
+    from .profile import StageStats
+    from .sort import SortKey
+
+    ChunkEntry = tuple[str, str, SortKey | None]
+    ChunkResult = tuple[list[str], list[ChunkEntry], list[StageStats]]
+
+
+#: Texts with fewer characters are formatted in a single process
+MIN_SIZE = 1 << 20
+#: Minimum number of characters per chunk
+MIN_CHUNK_SIZE = 1 << 16
+#: Number of chunks per process, to balance the load
+CHUNKS_PER_JOB = 4
+
+_LINE_RE = re.compile(r"(\bline )(\d+)")
+
+
+def split(text: str, chunk_size: int) -> Iterator[tuple[str, str, int]]:
+    """Split `text` into chunks of whole commands.
+
+    Yields the ``@string`` commands preceding each chunk, the chunk,
+    which has at least `chunk_size` characters (except for the last one),
+    and the line number of its start in `text`.
+    Chunks are slices of `text`, so their lines can be mapped back to it.
+    """
+    from .stream import command_type, iter_commands
+
+    context = ""
+    start = end = 0
+    size = 0
+    line = 1
+    strings: list[str] = []
+    for command in iter_commands(io.StringIO(text)):
+        # Commands are copied verbatim, only the text between them is skipped
+        pos = text.find(command, end)
+        if not size:
+            line += text.count("\n", start, pos)
+            start = pos
+        end = pos + len(command)
+        size += len(command)
+        if command_type(command) == "string":
+            strings.append(command)
+        if size >= chunk_size:
+            yield context, text[start:end], line
+            context += "".join(strings)
+            strings, size = [], 0
+    if size:
+        yield context, text[start:end], line
+
+
+def format_chunk(
+    context: str,
+    chunk: str,
+    name: str,
+    *,
+    parser: Literal["pybtex", "fast"] = "pybtex",
+    pipeline_options: Mapping[str, object] | None = None,
+    delimiter_type: Literal["braces", "quotes"] = "braces",
+    indent: int | Literal["tab"] = 2,
+    sort_by: str | None = None,
+) -> tuple[list[str], list[ChunkEntry]]:
+    """Parse, transform and format a chunk yielded by `split`.
+
+    Returns the formatted preamble commands and ``(key, entry, sort_key)``
+    tuples, where the sort key is None unless `sort_by` is given.
+    """
+    with profile.stage("parse", name, bytes_in=len(chunk.encode())) as stats:
+        bib_parser = new_parser(parser)
+        bib_parser.filename = name
+        data = bib_parser.parse_string(context + chunk)
+        if stats:
+            stats.entries = len(data.entries)
+    d = pop_pybtex(data.entries)
+    default_pipeline(**(pipeline_options or {})).run(d, file=name)
+    with profile.stage("format", name, entries=len(d)) as stats:
+        segments = list(iter_segments(d, delimiter_type, indent=indent))
+        preamble = list(
+            iter_segments(
+                {},
+                delimiter_type,
+                indent=indent,
+                preamble=data._preamble,  # noqa: SLF001
+            )
+        )
+        if stats:
+            stats.bytes_out = sum(len(s.encode()) for s in (*preamble, *segments))
+    if sort_by is None:
+        return preamble, [(key, segment, None) for key, segment in zip(d, segments)]
+    from .sort import sort_key
+
+    return preamble, [
+        (key, segment, sort_key(sort_by, key, entry))
+        for (key, entry), segment in zip(d.items(), segments)
+    ]
+
+
+def _format_chunk_in_worker(
+    context: str,
+    chunk: str,
+    name: str,
+    *,
+    line: int,
+    profiling: bool,
+    **kwargs: object,
+) -> ChunkResult:
+    try:
+        if not profiling:
+            return (*format_chunk(context, chunk, name, **kwargs), [])
+        with profile.collect() as records:
+            preamble, entries = format_chunk(context, chunk, name, **kwargs)
+    except Exception as e:  # noqa: BLE001
+        # Line numbers count from the start of the parsed text (context and chunk)
+        offset = line - 1 - context.count("\n")
+        msg = _LINE_RE.sub(lambda m: f"{m[1]}{int(m[2]) + offset}", str(e))
+        # Some of pybtex’s exceptions can be pickled, but not unpickled,
+        # which would break the whole pool when they are sent back.
+        msg = f"There was an error when parsing {name}: {msg}"
+        raise RuntimeError(msg) from None
+    return preamble, entries, records
+
+
+def format_text(
+    text: str,
+    name: str = "<string>",
+    *,
+    jobs: int = 0,
+    sort_by: str | None = None,
+    chunk_size: int | None = None,
+    **kwargs: object,
+) -> str:
+    """Format a bibliography in `jobs` processes (0 for one per CPU).
+
+    Parameters
+    ----------
+    text
+        BibTeX source
+    name
+        file name for error messages and profiling
+    jobs
+        number of processes, 0 for one per CPU
+    sort_by
+        how to sort the entries, see `sort.sort_key` (default: keep the order)
+    chunk_size
+        minimum number of characters per chunk
+        (default: enough for `CHUNKS_PER_JOB` chunks per process)
+    kwargs
+        passed to `format_chunk`
+
+    Returns
+    -------
+    the formatted bibliography, the same as when formatted in one process
+
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    from pybtex.database import BibliographyDataError
+    from pybtex.errors import report_error
+
+    jobs = jobs or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(MIN_CHUNK_SIZE, len(text) // (jobs * CHUNKS_PER_JOB))
+    profiling = profile.is_enabled()
+
+    preamble: list[str] = []
+    entries: list[ChunkEntry] = []
+    seen_keys: set[str] = set()
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [
+            executor.submit(
+                _format_chunk_in_worker,
+                context,
+                chunk,
+                name,
+                line=line,
+                profiling=profiling,
+                sort_by=sort_by,
+                **kwargs,
+            )
+            for context, chunk, line in split(text, chunk_size)
+        ]
+        for future in futures:
+            chunk_preamble, chunk_entries, records = future.result()
+            for stats in records:
+                profile.report(stats)
+            preamble.extend(chunk_preamble)
+            for item in chunk_entries:
+                key = item[0]
+                # Repeated keys within a chunk are reported by the parser
+                if key.lower() in seen_keys:
+                    report_error(
+                        BibliographyDataError(f"repeated bibliography entry: {key}")
+                    )
+                    continue
+                seen_keys.add(key.lower())
+                entries.append(item)
+
+    if sort_by is not None:
+        # The sort is stable, so entries that compare equal keep their order
+        entries.sort(key=itemgetter(2))
+    return "\n\n".join([*preamble, *(segment for _, segment, _ in entries)]) + "\n"
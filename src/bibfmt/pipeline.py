@@ -0,0 +1,396 @@
+"""Apply several per-entry transforms in a single pass over the entries.
+
+Each `Transform` declares the fields it touches, so a `Pipeline` only calls it
+for entries that have (some of) these fields. Custom stages can be added with
+`register`, and are applied by the CLI after the built-in ones:
+
+>>> from bibfmt import pipeline
+>>> def drop_empty(entry):
+...     for key in [k for k, v in entry.fields.items() if not v]:
+...         del entry.fields[key]
+>>> pipeline.register(pipeline.FunctionTransform(drop_empty, "drop_empty"))
+"""
+
+from __future__ import annotations
+
+import time
+from abc import ABC, abstractmethod
+from contextlib import nullcontext
+from typing import TYPE_CHECKING
+
+from . import normalize, profile, tools
+from .adapt_doi_urls import (
+    iter_dois,
+    new_doi_url,
+    resolve_short_dois,
+    short_doi_url_factory,
+    update_doi_url,
+)
+from .filters import FieldFilter
+
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Collection, Iterable, Mapping, Sequence
+    from concurrent.futures import ThreadPoolExecutor
+    from contextlib import AbstractContextManager
+    from typing import Literal
+
+    import requests
+    from pybtex.database import Entry
+
+
+class Transform(ABC):
+    """Transformation of single entries, applied by a `Pipeline`.
+
+    Subclasses implement `__call__`.
+    """
+
+    #: name of the transform
+    name = "transform"
+    #: lowercase names of the fields the transform touches (None: any field)
+    fields: frozenset[str] | None = None
+    #: whether `prepare` needs to see all entries, as transformed by the
+    #: preceding transforms, which then requires an extra pass
+    bulk = False
+
+    def prepare(self, entries: Collection[Entry]) -> None:  # noqa: B027
+        """Prepare transforming `entries`, e.g. by looking things up in bulk."""
+
+    async def prepare_async(
+        self, entries: Collection[Entry], executor: ThreadPoolExecutor | None = None
+    ) -> None:
+        """Like `prepare`, but without blocking the event loop.
+
+        By default, `prepare` runs in `executor` (or the event loop’s executor).
+        The executor has to run in this process, as `prepare` can change state.
+        """
+        if type(self).prepare is Transform.prepare:
+            return
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(executor, self.prepare, entries)
+
+    @abstractmethod
+    def __call__(self, entry: Entry) -> None:
+        """Transform `entry` in place."""
+
+
+class FunctionTransform(Transform):
+    """Transform entries with an arbitrary function.
+
+    Parameters
+    ----------
+    func
+        function transforming an entry in place
+    name
+        name of the transform
+    fields
+        names of the fields `func` touches (default: any field)
+
+    """
+
+    def __init__(
+        self,
+        func: Callable[[Entry], object],
+        name: str | None = None,
+        fields: Iterable[str] | None = None,
+    ) -> None:
+        """Create a transform calling `func`."""
+        self.func = func
+        self.name = name or getattr(func, "__name__", Transform.name)
+        self.fields = None if fields is None else frozenset(f.lower() for f in fields)
+
+    def __call__(self, entry: Entry) -> None:
+        """Call the function on `entry`."""
+        self.func(entry)
+
+
+class FilterFields(Transform):
+    """Remove fields, see `filters.FieldFilter`."""
+
+    name = "filter_fields"
+
+    def __init__(self, field_filter: FieldFilter) -> None:
+        """Create a transform removing the fields `field_filter` selects."""
+        self.field_filter = field_filter
+        self.fields = field_filter.fields
+
+    def __call__(self, entry: Entry) -> None:
+        """Remove the fields from `entry`."""
+        self.field_filter(entry)
+
+
+class DropFields(FilterFields):
+    """Remove fields by name or pattern, see `tools.filter_fields`."""
+
+    def __init__(self, excludes: Iterable[str]) -> None:
+        """Create a transform removing the fields in `excludes`."""
+        super().__init__(FieldFilter(excludes))
+
+
+class PreserveTitleCapitalization(Transform):
+    """Protect capitalized words, see `tools.preserve_title_capitalization`."""
+
+    name = "preserve_title_capitalization"
+    # Entries without title are warned about, so this needs to see all of them
+    fields = None
+
+    def __call__(self, entry: Entry) -> None:
+        """Protect the capitalized words in the title of `entry`."""
+        tools.preserve_entry_title_capitalization(entry)
+
+
+class AdaptDoiUrls(Transform):
+    """Rewrite DOI URLs, see `bibfmt.adapt_doi_urls`."""
+
+    name = "adapt_doi_urls"
+    fields = frozenset({"url"})
+
+    def __init__(
+        self,
+        doi_url_type: Literal["new", "short"],
+        *,
+        max_workers: int = 8,
+        session: requests.Session | None = None,
+    ) -> None:
+        """Create a transform rewriting DOI URLs to `doi_url_type`."""
+        if doi_url_type not in {"new", "short"}:
+            msg = f"Unknown doi_url_type {doi_url_type}"
+            raise AssertionError(msg)
+        self.doi_url_type = doi_url_type
+        self.max_workers = max_workers
+        self.session = session
+        # Short DOIs are looked up concurrently before the pass
+        self.bulk = doi_url_type == "short"
+        self.url_from_doi: Callable[[str], str | None] = new_doi_url
+
+    def prepare(self, entries: Collection[Entry]) -> None:
+        """Look up the short DOIs of `entries`."""
+        if self.doi_url_type != "short":
+            return
+        short_dois = resolve_short_dois(
+            iter_dois(entries),
+            max_workers=self.max_workers,
+            session=self.session,
+        )
+        self.url_from_doi = short_doi_url_factory(short_dois)
+
+    async def prepare_async(
+        self, entries: Collection[Entry], executor: ThreadPoolExecutor | None = None
+    ) -> None:
+        """Look up the short DOIs of `entries` without blocking the event loop."""
+        if self.doi_url_type != "short":
+            return
+        from .aio import resolve_short_dois_async
+
+        short_dois = await resolve_short_dois_async(
+            iter_dois(entries),
+            max_workers=self.max_workers,
+            session=self.session,
+            executor=executor,
+        )
+        self.url_from_doi = short_doi_url_factory(short_dois)
+
+    def __call__(self, entry: Entry) -> None:
+        """Rewrite the DOI URL of `entry`."""
+        update_doi_url(entry, self.url_from_doi)
+
+
+class Normalize(Transform):
+    """Apply the rules of a `normalize.Normalizer`."""
+
+    name = "normalize"
+
+    def __init__(self, normalizer: normalize.Normalizer) -> None:
+        """Create a transform applying `normalizer`’s rules."""
+        self.normalizer = normalizer
+        self.fields = normalizer.fields
+
+    def __call__(self, entry: Entry) -> None:
+        """Normalize the fields of `entry`."""
+        self.normalizer.normalize_entry(entry)
+
+
+class Pipeline:
+    """Apply transforms to entries, visiting each entry once."""
+
+    def __init__(self, transforms: Iterable[Transform] = ()) -> None:
+        """Create a pipeline applying `transforms` in order."""
+        self.transforms = list(transforms)
+
+    def add(self, transform: Transform) -> None:
+        """Apply `transform` after the existing transforms."""
+        self.transforms.append(transform)
+
+    def passes(self) -> list[list[Transform]]:
+        """Split the transforms into passes, starting a new one at bulk transforms."""
+        passes: list[list[Transform]] = [[]]
+        for transform in self.transforms:
+            if transform.bulk and passes[-1]:
+                passes.append([])
+            passes[-1].append(transform)
+        return [transforms for transforms in passes if transforms]
+
+    def run(self, d: Mapping[str, Entry], *, file: str = "<string>") -> None:
+        """Transform all entries in place.
+
+        When profiling, the time spent in each transform, and in the `prepare`
+        step of bulk transforms, is reported as a stage of `file`, see `profile`.
+        """
+        entries = d.values()
+        for transforms in self.passes():
+            for transform in transforms:
+                with _prepare_stage(transform, file, len(entries)):
+                    transform.prepare(entries)
+            _run_pass(transforms, entries, file)
+
+    async def run_async(
+        self,
+        d: Mapping[str, Entry],
+        *,
+        executor: ThreadPoolExecutor | None = None,
+        file: str = "<string>",
+    ) -> None:
+        """Transform all entries in place, without blocking the event loop.
+
+        The passes run in `executor` (default: the event loop’s executor),
+        after awaiting `Transform.prepare_async` of their transforms.
+        Entries are transformed in place, so this has to be a thread pool.
+        Profiling works as for `run`.
+        """
+        import asyncio
+
+        check_executor(executor)
+
+        loop = asyncio.get_running_loop()
+        entries = d.values()
+        for transforms in self.passes():
+            for transform in transforms:
+                with _prepare_stage(transform, file, len(entries)):
+                    await transform.prepare_async(entries, executor)
+            await loop.run_in_executor(executor, _run_pass, transforms, entries, file)
+
+
+def _prepare_stage(
+    transform: Transform, file: str, entries: int
+) -> AbstractContextManager[object]:
+    """Measure the `prepare` step of bulk transforms, e.g. network lookups."""
+    if not transform.bulk:
+        return nullcontext()
+    return profile.stage(f"{transform.name}.prepare", file, entries=entries)
+
+
+def check_executor(executor: object) -> None:
+    """Raise a TypeError if `executor` runs functions in other processes.
+
+    Transforms change entries in place, and changes made in another process
+    (to a copy of the entries) would be lost.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    if isinstance(executor, ProcessPoolExecutor):
+        msg = "Entries are transformed in place, which needs a thread pool executor"
+        raise TypeError(msg)
+
+
+def _run_pass(
+    transforms: Sequence[Transform], entries: Collection[Entry], file: str
+) -> None:
+    if profile.is_enabled():
+        timed = [_TimedTransform(transform) for transform in transforms]
+        _apply_all(timed, entries)
+        for transform in timed:
+            transform.report(file, len(entries))
+    else:
+        _apply_all(transforms, entries)
+
+
+def _apply_all(transforms: Sequence[Transform], entries: Iterable[Entry]) -> None:
+    plan = [(transform, transform.fields) for transform in transforms]
+    for entry in entries:
+        fields = entry.fields
+        # `model.Entry` field names are lowercase, pybtex’s are case-insensitive
+        lowercase = type(fields) is dict
+        for transform, names in plan:
+            if (
+                names is None
+                or (lowercase and not names.isdisjoint(fields))
+                or (not lowercase and any(name in fields for name in names))
+            ):
+                transform(entry)
+
+
+class _TimedTransform(Transform):
+    """Sum up the time spent in a transform that is applied within a pass."""
+
+    def __init__(self, transform: Transform) -> None:
+        self.transform = transform
+        self.name = transform.name
+        self.fields = transform.fields
+        self.wall_time = self.cpu_time = 0.0
+
+    def __call__(self, entry: Entry) -> None:
+        """Apply the transform to `entry`, measuring it."""
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        self.transform(entry)
+        self.wall_time += time.perf_counter() - wall_start
+        self.cpu_time += time.process_time() - cpu_start
+
+    def report(self, file: str, entries: int) -> None:
+        """Report the total time as a stage of `file`."""
+        profile.report_time(
+            self.name,
+            file,
+            wall_time=self.wall_time,
+            cpu_time=self.cpu_time,
+            entries=entries,
+        )
+
+
+_registered: list[Transform] = []
+
+
+def register(transform: Transform) -> None:
+    """Register a transform that `default_pipeline` applies after the built-in ones."""
+    _registered.append(transform)
+
+
+def default_pipeline(
+    *,
+    drop: Iterable[str] = (),
+    keep: Iterable[str] = (),
+    max_size: Mapping[str, int] | None = None,
+    preserve_title_capitalization: bool = False,
+    doi_url_type: Literal["new", "short", "unchanged"] = "new",
+    page_range_separator: str = "--",
+) -> Pipeline:
+    """Get a pipeline with the built-in and registered transforms.
+
+    Parameters
+    ----------
+    drop
+        names or patterns of fields to remove, see `filters.FieldFilter`
+    keep
+        patterns of fields to keep, removing all others
+    max_size
+        maximum sizes of field values in bytes, by field pattern
+    preserve_title_capitalization
+        whether to protect capitalized words in titles
+    doi_url_type
+        how to rewrite DOI URLs
+    page_range_separator
+        separator for page ranges
+
+    """
+    pipeline = Pipeline()
+    if drop or keep or max_size:
+        pipeline.add(FilterFields(FieldFilter(drop, keep, max_size)))
+    if preserve_title_capitalization:
+        pipeline.add(PreserveTitleCapitalization())
+    if doi_url_type != "unchanged":
+        pipeline.add(AdaptDoiUrls(doi_url_type))
+    pipeline.add(Normalize(normalize.normalizer(page_range_separator)))
+    for transform in _registered:
+        pipeline.add(transform)
+    return pipeline
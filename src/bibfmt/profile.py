@@ -0,0 +1,216 @@
+"""Instrumentation of the formatting pipeline.
+
+Each pipeline stage runs in a `stage` block, which measures it
+and passes the resulting `StageStats` to all hooks added with `add_hook`.
+As long as no hook is registered, stages are not measured at all.
+
+>>> from bibfmt import profile
+>>> profiler = profile.Profiler()
+>>> profile.add_hook(profiler)
+>>> # … format some files …
+>>> profile.remove_hook(profiler)
+>>> profiler.print_table()
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
+
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+    from typing import IO
+
+    Hook = Callable[["StageStats"], object]
+
+
+_hooks: list[Hook] = []
+
+
+class StageStats:
+    """Measurements of one run of a pipeline stage on (a part of) a file."""
+
+    __slots__ = (
+        "bytes_in",
+        "bytes_out",
+        "cpu_time",
+        "entries",
+        "file",
+        "max_rss",
+        "stage",
+        "wall_time",
+    )
+
+    def __init__(self, file: str, stage: str) -> None:
+        """Create empty stats for `stage` running on `file`."""
+        self.file = file
+        self.stage = stage
+        #: wall clock time in seconds
+        self.wall_time = 0.0
+        #: CPU time of this process in seconds
+        self.cpu_time = 0.0
+        #: number of entries processed
+        self.entries = 0
+        #: size of the input in bytes
+        self.bytes_in = 0
+        #: size of the output in bytes
+        self.bytes_out = 0
+        #: peak resident set size of the process in bytes (None if unknown)
+        self.max_rss: int | None = None
+
+    def as_dict(self) -> dict[str, object]:
+        """Get the stats as a JSON-serializable dict."""
+        return {attr: getattr(self, attr) for attr in self.__slots__}
+
+    def __repr__(self) -> str:
+        """Represent the stats with all their values."""
+        args = ", ".join(f"{k}={v!r}" for k, v in self.as_dict().items())
+        return f"{type(self).__name__}({args})"
+
+
+def add_hook(hook: Hook) -> None:
+    """Call `hook` with the `StageStats` of every following stage."""
+    _hooks.append(hook)
+
+
+def remove_hook(hook: Hook) -> None:
+    """Remove a hook added with `add_hook`."""
+    _hooks.remove(hook)
+
+
+def is_enabled() -> bool:
+    """Check if any hooks are registered, i.e. if stages are measured."""
+    return bool(_hooks)
+
+
+def report(stats: StageStats) -> None:
+    """Pass `stats` to all hooks, e.g. to replay stats from worker processes."""
+    for hook in _hooks:
+        hook(stats)
+
+
+def report_time(
+    name: str,
+    file: str,
+    *,
+    wall_time: float,
+    cpu_time: float,
+    entries: int = 0,
+) -> None:
+    """Report stage `name` on `file` that the caller timed itself.
+
+    This is for stages that don’t run in a single block,
+    like transforms that are applied alternately in one pass over the entries.
+    """
+    if not _hooks:
+        return
+    stats = StageStats(file, name)
+    stats.wall_time = wall_time
+    stats.cpu_time = cpu_time
+    stats.entries = entries
+    stats.max_rss = _max_rss()
+    report(stats)
+
+
+@contextmanager
+def collect() -> Iterator[list[StageStats]]:
+    """Collect stats in a list instead of passing them to the registered hooks.
+
+    This is used in worker processes, which send the stats back to the main process.
+    """
+    hooks = _hooks.copy()
+    records: list[StageStats] = []
+    _hooks[:] = [records.append]
+    try:
+        yield records
+    finally:
+        _hooks[:] = hooks
+
+
+def _max_rss() -> int | None:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+@contextmanager
+def stage(
+    name: str, file: str, *, entries: int = 0, bytes_in: int = 0
+) -> Iterator[StageStats | None]:
+    """Measure the pipeline stage `name` running on `file`.
+
+    Yields the `StageStats` to fill in entry and byte counts that are only known
+    after the stage ran, or None if no hooks are registered.
+    Timings and memory are filled in automatically.
+    """
+    if not _hooks:
+        yield None
+        return
+
+    stats = StageStats(file, name)
+    stats.entries = entries
+    stats.bytes_in = bytes_in
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    yield stats
+    stats.wall_time = time.perf_counter() - wall_start
+    stats.cpu_time = time.process_time() - cpu_start
+    stats.max_rss = _max_rss()
+    report(stats)
+
+
+class Profiler:
+    """Hook that sums up `StageStats` per file and stage."""
+
+    def __init__(self) -> None:
+        """Create a profiler without any stats."""
+        self.stats: dict[tuple[str, str], StageStats] = {}
+
+    def __call__(self, stats: StageStats) -> None:
+        """Add `stats` to the totals of its file and stage."""
+        key = (stats.file, stats.stage)
+        if (total := self.stats.get(key)) is None:
+            total = self.stats[key] = StageStats(stats.file, stats.stage)
+        total.wall_time += stats.wall_time
+        total.cpu_time += stats.cpu_time
+        total.entries += stats.entries
+        total.bytes_in += stats.bytes_in
+        total.bytes_out += stats.bytes_out
+        if stats.max_rss is not None:
+            total.max_rss = max(total.max_rss or 0, stats.max_rss)
+
+    def write_json_lines(self, outfile: IO[str]) -> None:
+        """Write one JSON object per file and stage to `outfile`."""
+        import json
+
+        for stats in self.stats.values():
+            outfile.write(json.dumps(stats.as_dict()) + "\n")
+
+    def print_table(self, outfile: IO[str] | None = None) -> None:
+        """Print the stats as a table to `outfile` (default: stderr)."""
+        from rich.console import Console
+        from rich.table import Table
+
+        table = Table("File", "Stage", "Wall [s]", "CPU [s]", "Entries")
+        for column in ("In [B]", "Out [B]", "Peak RSS [MiB]"):
+            table.add_column(column)
+        for column in table.columns[2:]:
+            column.justify = "right"
+        for s in self.stats.values():
+            table.add_row(
+                s.file,
+                s.stage,
+                f"{s.wall_time:.3f}",
+                f"{s.cpu_time:.3f}",
+                str(s.entries),
+                str(s.bytes_in),
+                str(s.bytes_out),
+                "" if s.max_rss is None else f"{s.max_rss / 2**20:.1f}",
+            )
+        Console(file=outfile or sys.stderr).print(table)
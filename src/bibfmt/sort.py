@@ -0,0 +1,218 @@
+"""Sort entries by key or field, in memory or with bounded memory.
+
+Citation keys are compared by code point, like `sorted` does.
+Field values are compared case-insensitively, after converting LaTeX to Unicode,
+transliterated to ASCII in the C locale, or using the collation
+of the user’s ``LC_COLLATE`` locale if it was opted into with `use_locale`.
+Sorting is stable: Entries that compare equal keep their order,
+and entries without the sort field come last.
+
+For huge bibliographies, an `ExternalSorter` keeps sorted runs of formatted
+entries in temporary files once they exceed a size limit, and merges them:
+
+>>> from bibfmt import sort
+>>> with sort.ExternalSorter() as sorter:
+...     for key, entry, segment in formatted_entries:
+...         sorter.add(sort.sort_key("year", key, entry), segment)
+...     for segment in sorter:
+...         outfile.write(segment)
+"""
+
+from __future__ import annotations
+
+import heapq
+import locale
+import pickle
+import re
+import sys
+import tempfile
+from contextlib import suppress
+from typing import TYPE_CHECKING
+
+from unidecode import unidecode
+
+from . import latex
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Mapping
+    from typing import IO, TypeVar
+
+    from pybtex.database import Entry
+    from typing_extensions import Self
+
+    from .model import Entry as ModelEntry
+
+    E = TypeVar("E", Entry, ModelEntry)
+    SortKey = tuple[object, ...]
+
+
+#: Sort modes besides field names
+MODES = ("key", "year", "author")
+#: Number of characters of formatted entries kept in memory before spilling a run
+RUN_SIZE = 64 << 20
+#: Maximum number of runs that are merged at once
+MAX_RUNS = 64
+
+_NUMBER_RE = re.compile(r"\d+")
+_MISSING: SortKey = (1,)
+
+
+def use_locale(*, enable: bool = True) -> None:
+    """Collate like the user’s locale (from the environment), if it is available.
+
+    With `enable` false, collate like the C locale again.
+    """
+    with suppress(locale.Error):
+        locale.setlocale(locale.LC_COLLATE, "" if enable else "C")
+
+
+def collation_key(text: str) -> tuple[str, str]:
+    """Get a key to sort `text` case-insensitively in the current locale."""
+    text = latex.latex_to_text(text).casefold()
+    if locale.setlocale(locale.LC_COLLATE).partition(".")[0] in {"C", "POSIX"}:
+        # The C locale orders by code point, so sort letters like “ü” next to “u”
+        return unidecode(text), text
+    return locale.strxfrm(text), text
+
+
+def _author(entry: Entry | ModelEntry) -> SortKey:
+    persons = entry.persons.get("author") or entry.persons.get("editor")
+    if not persons:
+        return _MISSING
+    person = persons[0]
+    last = " ".join((*person.prelast_names, *person.last_names))
+    first = " ".join((*person.first_names, *person.middle_names))
+    return (0, collation_key(last), collation_key(first))
+
+
+def _year(value: str) -> SortKey:
+    # Years like “2020a” sort by their number, others (“in press”) after them
+    number = int(match[0]) if (match := _NUMBER_RE.search(value)) else sys.maxsize
+    return (0, number, collation_key(value))
+
+
+def sort_key(by: str, key: str, entry: Entry | ModelEntry | None = None) -> SortKey:
+    """Get the sort key of an entry.
+
+    Parameters
+    ----------
+    by
+        ``"key"`` (the citation key, compared by code point), ``"year"``,
+        ``"author"`` (the first author or editor’s last and first names),
+        or the name of any other field
+    key
+        citation key of the entry
+    entry
+        the entry (not needed for sorting by key)
+
+    Returns
+    -------
+    a sort key that can be compared to those of other entries
+
+    """
+    if by == "key":
+        return (0, key)
+    assert entry is not None  # noqa: S101
+    if by == "author":
+        return _author(entry)
+    if not (value := entry.fields.get(by, "").strip()):
+        return _MISSING
+    if by == "year":
+        return _year(value)
+    return (0, collation_key(value))
+
+
+def sort_entries(d: Mapping[str, E], by: str) -> dict[str, E]:
+    """Sort entries in memory, see `sort_key` for `by`."""
+    return dict(sorted(d.items(), key=lambda item: sort_key(by, *item)))
+
+
+class ExternalSorter:
+    """Sort strings by key with bounded memory.
+
+    Strings are buffered until they exceed `run_size` characters.
+    The buffer is then sorted and written to a temporary file (a “run”),
+    and iterating merges all runs. The sort is stable.
+
+    Parameters
+    ----------
+    run_size
+        maximum number of characters kept in memory (default: `RUN_SIZE`)
+    tmpdir
+        directory for the runs (default: the system’s temporary directory)
+
+    """
+
+    def __init__(self, run_size: int | None = None, tmpdir: str | None = None) -> None:
+        """Create an empty sorter."""
+        self.run_size = RUN_SIZE if run_size is None else run_size
+        self.tmpdir = tmpdir
+        self._buffer: list[tuple[SortKey, int, str]] = []
+        self._size = 0
+        self._count = 0
+        self._runs: list[IO[bytes]] = []
+
+    def add(self, key: SortKey, string: str) -> None:
+        """Add `string` with sort key `key`."""
+        # The count keeps the sort stable and keeps strings from being compared
+        self._buffer.append((key, self._count, string))
+        self._count += 1
+        self._size += len(string)
+        if self._size >= self.run_size:
+            self._spill()
+
+    @property
+    def runs(self) -> int:
+        """Get the number of runs written to temporary files."""
+        return len(self._runs)
+
+    def _spill(self) -> None:
+        self._buffer.sort()
+        self._runs.append(self._write_run(self._buffer))
+        self._buffer, self._size = [], 0
+        if len(self._runs) >= MAX_RUNS:
+            runs, self._runs = self._runs, []
+            self._runs.append(self._write_run(heapq.merge(*map(_read_run, runs))))
+            for run in runs:
+                run.close()
+
+    def _write_run(self, records: Iterable[tuple[SortKey, int, str]]) -> IO[bytes]:
+        run = tempfile.TemporaryFile(dir=self.tmpdir)  # noqa: SIM115
+        for record in records:
+            pickle.dump(record, run, pickle.HIGHEST_PROTOCOL)
+        run.seek(0)
+        return run
+
+    def __iter__(self) -> Iterator[str]:
+        """Yield all strings in order, which can only be done once."""
+        self._buffer.sort()
+        records = heapq.merge(*map(_read_run, self._runs), self._buffer)
+        try:
+            for _, _, string in records:
+                yield string
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Delete all runs."""
+        for run in self._runs:
+            run.close()
+        self._runs = []
+        self._buffer, self._size = [], 0
+
+    def __enter__(self) -> Self:
+        """Return the sorter itself."""
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        """Delete all runs."""
+        self.close()
+
+
+def _read_run(run: IO[bytes]) -> Iterator[tuple[SortKey, int, str]]:
+    while True:
+        try:
+            yield pickle.load(run)  # noqa: S301
+        except EOFError:  # noqa: PERF203
+            return
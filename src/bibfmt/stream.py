@@ -0,0 +1,204 @@
+"""Process BibTeX files one entry at a time."""
+
+from __future__ import annotations
+
+import re
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from pybtex.database import BibliographyData, BibliographyDataError
+from pybtex.database.input import bibtex
+from pybtex.errors import report_error
+
+from .tools import iter_output, new_parser, replace_file
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+    from typing import IO, Literal
+
+
+CHUNK_SIZE = 1 << 16
+
+_NAME = f"[{re.escape(bibtex.NAME_CHARS)}][{re.escape(bibtex.NAME_CHARS)}0-9]*"
+_HEAD_RE = re.compile(rf"@\s*({_NAME})\s*([{{(])")
+_PARTIAL_HEAD_RE = re.compile(rf"@\s*(?:{_NAME}\s*)?")
+_BRACE_BODY_RE = re.compile(r"[{}]")
+_PAREN_BODY_RE = re.compile(r'[{}()"]')
+
+
+class _Scanner:
+    """Split a text stream into ``@command`` source strings."""
+
+    def __init__(self, infile: IO[str], chunk_size: int) -> None:
+        self.infile = infile
+        self.chunk_size = chunk_size
+        self.buf = ""
+        # Start of the text in the buffer that hasn’t been consumed yet
+        self.pos = 0
+        self.eof = False
+
+    def read_more(self) -> bool:
+        """Append a chunk to the buffer. Returns False at the end of the file.
+
+        The consumed text is dropped from the buffer at the same time,
+        so positions in the buffer are no longer valid afterwards.
+        """
+        if self.eof:
+            return False
+        chunk = self.infile.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def pop(self, end: int) -> str:
+        """Consume and return the buffer’s text up to position `end`."""
+        text = self.buf[self.pos : end]
+        self.pos = end
+        return text
+
+    def __iter__(self) -> Iterator[str]:
+        while True:
+            start = self.buf.find("@", self.pos)
+            if start < 0:
+                self.pos = len(self.buf)
+                if not self.read_more():
+                    return
+                continue
+            self.pos = start
+
+            while (m := _HEAD_RE.match(self.buf, self.pos)) is None:
+                if (
+                    _PARTIAL_HEAD_RE.fullmatch(self.buf, self.pos) is None
+                    or not self.read_more()
+                ):
+                    break
+            if m is None:
+                # Not a valid command. Let the parser report the error.
+                end = self.buf.find("@", self.pos + 1)
+                yield self.pop(len(self.buf) if end < 0 else end)
+                continue
+
+            if m[1].lower() == "comment":
+                self.pos = m.end()
+                continue
+
+            yield self.pop(self.find_body_end(m.end(), m[2]))
+
+    def find_body_end(self, pos: int, opening: str) -> int:
+        """Find the end of a command body starting at `pos`, reading as needed.
+
+        Returns the end of the buffer if the body is not terminated.
+        """
+        pattern = _BRACE_BODY_RE if opening == "{" else _PAREN_BODY_RE
+        depth = 0
+        quoted = False
+        while True:
+            for m in pattern.finditer(self.buf, pos):
+                char = m[0]
+                if char == "{":
+                    depth += 1
+                elif char == "}":
+                    if depth == 0:
+                        return m.end()
+                    depth -= 1
+                elif depth > 0:
+                    continue
+                elif char == '"':
+                    quoted = not quoted
+                elif char == ")" and not quoted:
+                    return m.end()
+            scanned = len(self.buf) - self.pos
+            if not self.read_more():
+                return len(self.buf)
+            pos = self.pos + scanned
+
+
+def iter_commands(infile: IO[str], chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Yield the source text of each ``@command`` in `infile`.
+
+    The file is read in chunks of `chunk_size` characters,
+    so only the command currently being scanned is held in memory.
+    Like pybtex, text outside of commands is skipped,
+    and so is the ``@comment`` header (but not its body).
+    """
+    return iter(_Scanner(infile, chunk_size))
+
+
+def command_type(command: str) -> str | None:
+    """Get the lowercased type of a command yielded by `iter_commands`.
+
+    Returns None if `command` is not a valid command.
+    """
+    m = _HEAD_RE.match(command)
+    return m[1].lower() if m else None
+
+
+def iter_bibliography(
+    infile: IO[str],
+    chunk_size: int = CHUNK_SIZE,
+    parser: Literal["pybtex", "fast"] = "pybtex",
+) -> Iterator[BibliographyData]:
+    """Parse `infile` incrementally.
+
+    Yields one :class:`~pybtex.database.BibliographyData` per entry or preamble.
+    ``@string`` macros are remembered for the following entries.
+    """
+    bib_parser = new_parser(parser)
+    seen_keys: set[str] = set()
+    try:
+        for command in iter_commands(infile, chunk_size):
+            bib_parser.data = BibliographyData()
+            data = bib_parser.parse_string(command)
+            if any(key.lower() in seen_keys for key in data.entries):
+                # Like pybtex, report and skip repeated entries
+                key = next(iter(data.entries))
+                report_error(
+                    BibliographyDataError(f"repeated bibliography entry: {key}")
+                )
+                continue
+            seen_keys.update(key.lower() for key in data.entries)
+            if data.entries or data._preamble:  # noqa: SLF001
+                yield data
+    except Exception as e:
+        getattr(e, "add_note", print)(f"There was an error when parsing {infile.name}")
+        raise
+
+
+def write_segments(segments: Iterable[str], outfile: IO[str]) -> None:
+    """Write segments to `outfile` in the same layout as `dict_to_string`."""
+    outfile.writelines(iter_output(segments))
+
+
+def write_stream(segments: Iterable[str], outfile: IO[str] | None = None) -> bool:
+    """Stream segments to a BibTeX file or stdout.
+
+    The file is only replaced once all segments have been written,
+    so it is left untouched if formatting fails half way through,
+    or if the content did not change.
+
+    Parameters
+    ----------
+    segments
+        strings to write, as yielded by `iter_segments`
+    outfile
+        file to write to (default: None)
+
+    Returns
+    -------
+    whether `outfile` changed (always true for stdout)
+
+    """
+    if not outfile:
+        write_segments(segments, sys.stdout)
+        return True
+
+    return replace_file(
+        Path(outfile.name),
+        lambda f: write_segments(segments, f),
+        outfile.encoding,
+    )
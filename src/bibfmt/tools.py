@@ -3,61 +3,83 @@
 from __future__ import annotations
 
 import contextlib
+import io
 import logging
+import os
 import re
+import shutil
 import sys
-from collections.abc import Iterable
-from copy import deepcopy
-from functools import cache
+import tempfile
+from datetime import timedelta
+from functools import cache, lru_cache
+from itertools import chain
 from pathlib import Path
 from typing import TYPE_CHECKING, cast
 from warnings import warn
 
-import requests
-from pybtex.database import Person
-from pybtex.database.input import bibtex
-from pylatexenc.latex2text import LatexNodes2Text
-from pylatexenc.latexencode import unicode_to_latex
+from . import latex, normalize
+from .filters import FieldFilter
 
 
+# Heavy dependencies are imported where they are used,
+# so that the CLI starts fast and only pays for what it needs.
 if TYPE_CHECKING:
-    from collections.abc import Mapping, MutableMapping, Sequence
+    from collections.abc import Callable, Iterable, Iterator, Mapping
     from collections.abc import Set as AbstractSet
+    from functools import _CacheInfo
     from typing import IO, Literal
 
-    from pybtex.database import BibliographyData, Entry
+    import requests
+    from pybtex.database import BibliographyData, Entry, Person
+    from pybtex.database.input import bibtex
+
+    from . import fast_parser
+
+    PersonKey = tuple[tuple[str, ...], ...]
+
+
+logger = logging.getLogger(__name__)
 
 
 @cache
 def get_dict() -> AbstractSet[str]:
-    """Get set of words from the web2 dictionary."""
-    from english_words import get_english_words_set
+    """Get set of words from the web2 dictionary.
+
+    The words are memory-mapped from an index that is built on first use,
+    see `wordindex.load_word_index`.
+    """
+    from .wordindex import load_word_index
 
-    return get_english_words_set(["web2"])
+    return load_word_index("web2")
 
 
 def decode(entry: Entry) -> Entry:
     """Decode a dictionary with LaTeX strings into a dictionary with unicode strings."""
-    translator = LatexNodes2Text()
-    # Perform a deepcopy, otherwise the input entry will get altered
-    out = deepcopy(entry)
+    # Copy the fields and person lists, otherwise the input entry will get altered
+    persons = {role: list(ps) for role, ps in entry.persons.items()}
+    out = type(entry)(entry.type, fields=entry.fields, persons=persons)
     assert out.fields is not None  # noqa: S101
     for key, value in out.fields.items():
         if key == "url":
             # The url can contain special LaTeX characters (like %) and that's fine
             continue
-        out.fields[key] = translator.latex_to_text(value)
+        out.fields[key] = latex.latex_to_text(value)
     return out
 
 
+def decode_all(entries: Mapping[str, Entry]) -> dict[str, Entry]:
+    """Decode the LaTeX strings of all entries, see `decode`."""
+    return {key: decode(entry) for key, entry in entries.items()}
+
+
 def pybtex_to_dict(entry: Entry) -> dict[str, str]:
     """Represent BibTeX entry as dict."""
     d = {}
     d["genre"] = entry.type
-    transform = unicode_to_latex
+    transform = latex.text_to_latex
     assert entry.persons is not None  # noqa: S101
     assert entry.fields is not None  # noqa: S101
-    for key, persons in cast(dict[str, Iterable[Person]], entry.persons).items():
+    for key, persons in cast("dict[str, Iterable[Person]]", entry.persons).items():
         d[key.lower()] = [
             {
                 "first": [transform(string) for string in p.first_names or ()],
@@ -73,6 +95,29 @@ def pybtex_to_dict(entry: Entry) -> dict[str, str]:
     return d
 
 
+def pybtex_to_dicts(entries: Mapping[str, Entry]) -> dict[str, dict[str, str]]:
+    """Represent all BibTeX entries as dicts, see `pybtex_to_dict`."""
+    return {key: pybtex_to_dict(entry) for key, entry in entries.items()}
+
+
+MONTHS = (
+    *("jan", "feb", "mar", "apr", "may", "jun"),
+    *("jul", "aug", "sep", "oct", "nov", "dec"),
+)
+_MONTH_SET = frozenset(MONTHS)
+
+#: Maximum number of cached results of each formatting step, see `format_cache_info`
+FORMAT_CACHE_SIZE = 1 << 16
+# Fields whose values tend to repeat across a bibliography, so their lines are cached
+_REPEATED_FIELDS = frozenset(
+    {
+        *("address", "booktitle", "edition", "howpublished", "institution"),
+        *("journal", "language", "month", "organization", "publisher"),
+        *("school", "series", "type", "volume", "year"),
+    }
+)
+
+
 def translate_month(key: str) -> str | None:
     """Unify month formats.
 
@@ -80,14 +125,16 @@ def translate_month(key: str) -> str | None:
     as a string representing an int, and sometimes the name of the month is spelled out.
     Try to handle most of this here.
     """
-    months = [
-        *("jan", "feb", "mar", "apr", "may", "jun"),
-        *("jul", "aug", "sep", "oct", "nov", "dec"),
-    ]
+    if (month := _translate_month(key)) is None:
+        logger.warning("Unknown month value %r. Skipping.", key)
+    return month
+
 
+@lru_cache(maxsize=FORMAT_CACHE_SIZE)
+def _translate_month(key: str) -> str | None:
     # Sometimes, the key is just a month
     try:
-        return months[int(key) - 1]
+        return MONTHS[int(key) - 1]
     except (TypeError, ValueError):
         # TypeError: unsupported operand type(s) for -: 'str' and 'int'
         pass
@@ -98,15 +145,14 @@ def translate_month(key: str) -> str | None:
         month = k[:3].lower()
 
         # Month values like '????' appear -- skip them
-        if month in months:
-            strings.append(month)
-        else:
-            logging.warning(f"Unknown month value {key!r}. Skipping.")
+        if month not in _MONTH_SET:
             return None
+        strings.append(month)
 
     return ' # "-" # '.join(strings)
 
 
+@lru_cache(maxsize=1 << 16)
 def _translate_word(word: str) -> str:
     """Check if the word needs to be protected by `{}` to prevent recapitalization."""
     if (
@@ -131,6 +177,7 @@ def _translate_word(word: str) -> str:
     return word
 
 
+@lru_cache(maxsize=1 << 14)
 def _translate_title(val: str) -> str:
     """{}-protect parts whose capitalization should not change.
 
@@ -156,18 +203,27 @@ def _translate_title(val: str) -> str:
     return " ".join(words)
 
 
-def preserve_title_capitalization(d: dict[str, Entry]) -> None:
-    """Preserve title capitalization."""
+def preserve_title_capitalization(d: Mapping[str, Entry]) -> None:
+    """Preserve title capitalization.
+
+    Each distinct title is translated once, and each distinct word is classified
+    once. Both are memoized across calls, so repeated titles and words
+    (e.g. in subsequent entries or files) are nearly free.
+    """
     for entry in d.values():
-        assert entry.fields is not None  # noqa: S101
-        try:
-            title = entry.fields["title"]
-            entry.fields["title"] = _translate_title(title)
-        except KeyError:
-            warn(f"'entry' {entry} has no title", stacklevel=1)
+        preserve_entry_title_capitalization(entry)
+
 
+def preserve_entry_title_capitalization(entry: Entry) -> None:
+    """Preserve the capitalization of the title of `entry`."""
+    assert entry.fields is not None  # noqa: S101
+    if (title := entry.fields.get("title")) is None:
+        warn(f"'entry' {entry} has no title", stacklevel=1)
+        return
+    entry.fields["title"] = _translate_title(title)
 
-def set_page_range_separator(d: MutableMapping[str, Entry], string: str) -> None:
+
+def set_page_range_separator(d: Mapping[str, Entry], string: str) -> None:
     """Replace any number of dashes (hyphen, en, em, etc.) by page_range_separator.
 
     See Also
@@ -176,38 +232,20 @@ def set_page_range_separator(d: MutableMapping[str, Entry], string: str) -> None
     - <https://jkorpela.fi/dashes.html>
 
     """
-    chars = (
-        "-"
-        "\N{HYPHEN}"
-        "\N{NON-BREAKING HYPHEN}"
-        "\N{FIGURE DASH}"
-        "\N{EN DASH}"
-        "\N{EM DASH}"
-        "\N{HORIZONTAL BAR}"
-    )
-    for entry in d.values():
-        assert entry.fields is not None  # noqa: S101
-        if "pages" not in entry.fields:
-            continue
-        entry.fields["pages"] = re.sub(f"[{chars}]+", string, entry.fields["pages"])
+    _page_range_normalizer(string).normalize(d)
 
 
-def remove_multiple_spaces(d: dict[str, Entry]) -> None:
-    """Collapse sequences of spaces."""
-    for entry in d.values():
-        assert entry.fields is not None  # noqa: S101
-        for key, value in entry.fields.items():
-            if key in ["url", "doi"]:
-                continue
-            try:
-                new_value = re.sub(" +", " ", value)
-                # Remove trailing spaces
-                new_value = new_value.rstrip()
-            except TypeError:
-                # expected unicode for encode input, but got int instead
-                pass
-            else:
-                entry.fields[key] = new_value
+@lru_cache(maxsize=8)
+def _page_range_normalizer(string: str) -> normalize.Normalizer:
+    return normalize.Normalizer([normalize.page_range_rule(string)])
+
+
+_SPACES_NORMALIZER = normalize.Normalizer([normalize.SPACES_RULE])
+
+
+def remove_multiple_spaces(d: Mapping[str, Entry]) -> None:
+    """Collapse sequences of spaces and remove trailing whitespace."""
+    _SPACES_NORMALIZER.normalize(d)
 
 
 def pybtex_to_bibtex_string(
@@ -219,66 +257,153 @@ def pybtex_to_bibtex_string(
     align: int = 14,
     sort: bool = False,
 ) -> str:
-    """Represent BibTeX entry as str."""
-    out = f"@{entry.type}{{{bibtex_key},\n{indent}"
-    content = []
+    """Represent BibTeX entry as str.
 
+    Bibliographies repeat author lists, journals, months and so on a lot,
+    so the rendered lines are cached, see `format_cache_info`.
+    """
     left, right = delimiters
 
-    assert entry.persons is not None  # noqa: S101
-    assert entry.fields is not None  # noqa: S101
+    persons = entry.persons
+    fields = entry.fields
+    assert persons is not None  # noqa: S101
+    assert fields is not None  # noqa: S101
+
+    width = min(align, max(map(len, chain(persons, fields)), default=0))
+    key_fmt = _key_formatter(width)
+    lines = [
+        _field_line(
+            role.lower(),
+            _persons_str(tuple(map(_person_key, ps))),
+            width=width,
+            left=left,
+            right=right,
+        )
+        for role, ps in persons.items()
+    ]
 
-    n_col = max(
-        (len(k) for k in (*entry.persons.keys(), *entry.fields.keys())), default=0
-    )
-    key_fmt = f"{{:<{min(align, n_col)}}}".format
+    items = sorted(fields.items()) if sort else fields.items()
+    for key, value in items:
+        if value is None:
+            continue
 
-    def add_content(key: str, value: str) -> None:
-        content.append(f"{key_fmt(key)} = {left}{value}{right}")
+        # Always make keys lowercase
+        key = key.lower()  # noqa: PLW2901
 
-    for key, persons in entry.persons.items():
-        persons_str = " and ".join([_get_person_str(p) for p in persons])
-        add_content(key.lower(), persons_str)
+        if key == "month":
+            if not (value := translate_month(value)):
+                continue
+        elif isinstance(value, str) and "\N{REPLACEMENT CHARACTER}" in value:
+            value = value.replace("\N{REPLACEMENT CHARACTER}", "?")  # noqa: PLW2901
 
-    keys = entry.fields.keys()
-    if sort:
-        keys = sorted(keys)
+        if key in _REPEATED_FIELDS:
+            lines.append(_field_line(key, value, width=width, left=left, right=right))
+        else:
+            lines.append(f"{key_fmt(key)} = {left}{value}{right},\n")
 
-    for key in keys:
-        value: str = entry.fields[key]
+    # Make sure that every line ends with a comma
+    return f"@{entry.type}{{{bibtex_key},\n{indent}" + indent.join(lines) + "}"
 
-        # Always make keys lowercase
-        key = key.lower()  # noqa: PLW2901
 
-        if key == "month":
-            if month_string := translate_month(value):
-                add_content(key, month_string)
-            continue
+@lru_cache(maxsize=FORMAT_CACHE_SIZE)
+def _field_line(key: str, value: str, *, width: int, left: str, right: str) -> str:
+    return f"{_key_formatter(width)(key)} = {left}{value}{right},\n"
+
 
-        with contextlib.suppress(AttributeError):
-            value = value.replace("\N{REPLACEMENT CHARACTER}", "?")
+@cache
+def _key_formatter(width: int) -> Callable[[str], str]:
+    """Get a function padding field names to `width` characters."""
+    return f"{{:<{width}}}".format
 
-        if value is not None:
-            add_content(key, value)
 
-    # Make sure that every line ends with a comma
-    out += indent.join([line + ",\n" for line in content])
-    out += "}"
-    return out
+def format_cache_info() -> dict[str, _CacheInfo]:
+    """Get the statistics of the caches used by `pybtex_to_bibtex_string`.
+
+    Returns
+    -------
+    hits, misses and sizes of the caches of person lists, months and field lines
+
+    """
+    return {
+        "persons": _persons_str.cache_info(),
+        "month": _translate_month.cache_info(),
+        "field_line": _field_line.cache_info(),
+    }
+
+
+def format_cache_clear() -> None:
+    """Clear the caches used by `pybtex_to_bibtex_string`."""
+    _persons_str.cache_clear()
+    _translate_month.cache_clear()
+    _field_line.cache_clear()
+
+
+_DOI_URL_RE = re.compile(r"https?://(?:dx\.)?doi\.org/(.*)")
 
 
 def doi_from_url(url: str) -> str | None:
     """See if this is a DOI URL and return the DOI."""
-    m = re.match("https?://(?:dx\\.)?doi\\.org/(.*)", url)
-    if m:
+    if m := _DOI_URL_RE.match(url):
         return m.group(1)
     return None
 
 
-def get_short_doi(doi: str) -> str | None:
-    """Possibly shorten doi."""
-    url = f"http://shortdoi.org/{doi}"
-    r = requests.get(url, params={"format": "json"}, timeout=5)
+SHORTDOI_URL = "http://shortdoi.org"
+#: How long looked up (or missing) short DOIs are cached on disk
+SHORTDOI_CACHE_TTL = timedelta(days=30)
+
+
+@cache
+def shortdoi_session(
+    pool_size: int = 8, cache_name: str | Path = "bibfmt-shortdoi"
+) -> requests.Session:
+    """Get a keep-alive HTTP session with a persistent cache for shortDOI lookups.
+
+    Both found and missing short DOIs are cached on disk
+    for `SHORTDOI_CACHE_TTL`, so repeated runs make no network calls.
+
+    Parameters
+    ----------
+    pool_size
+        number of connections kept alive, should match the number of workers
+    cache_name
+        cache database, relative to the user cache directory
+
+    """
+    import requests.adapters
+    from requests_cache import CachedSession
+
+    session = CachedSession(
+        cache_name,
+        backend="sqlite",
+        use_cache_dir=True,
+        expire_after=SHORTDOI_CACHE_TTL,
+        # Cache negative results as well
+        allowable_codes=(200, 400, 404),
+    )
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_short_doi(doi: str, session: requests.Session | None = None) -> str | None:
+    """Possibly shorten doi.
+
+    Parameters
+    ----------
+    doi
+        DOI to look up
+    session
+        HTTP session to use (default: `shortdoi_session()`)
+
+    """
+    if session is None:
+        session = shortdoi_session()
+    url = f"{SHORTDOI_URL}/{doi}"
+    r = session.get(url, params={"format": "json"}, timeout=5)
     if not r.ok:
         return None
 
@@ -290,9 +415,30 @@ def get_short_doi(doi: str) -> str | None:
 
 
 def _get_person_str(p: Person) -> str:
+    return _person_str(_person_key(p))
+
+
+def _person_key(p: Person) -> PersonKey:
+    """Get the name parts of `p` in a hashable form."""
+    return (
+        tuple(p.prelast_names or ()),
+        tuple(p.last_names or ()),
+        tuple(p.lineage_names or ()),
+        tuple(p.first_names or ()),
+        tuple(p.middle_names or ()),
+    )
+
+
+@lru_cache(maxsize=FORMAT_CACHE_SIZE)
+def _persons_str(persons: tuple[PersonKey, ...]) -> str:
+    return " and ".join([_person_str(parts) for parts in persons])
+
+
+def _person_str(parts: PersonKey) -> str:
+    prelast_names, last_names, lineage_names, first_names, middle_names = parts
     name_parts = [
-        " ".join((*(p.prelast_names or ()), *(p.last_names or ()))),
-        " ".join(p.lineage_names or ()),
+        " ".join((*prelast_names, *last_names)),
+        " ".join(lineage_names),
         # In plain English, you wouldn't put a full space between abbreviated
         # initials, see, e.g.,
         # <https://english.stackexchange.com/a/105529/23644>. In bib files,
@@ -301,7 +447,7 @@ def _get_person_str(p: Person) -> str:
         # <https://clauswilke.com/blog/2015/10/02/bibtex/>.
         # See <https://tex.stackexchange.com/a/11083/13262> on how to configure
         # biber/biblatex to use thin spaces.
-        " ".join((*(p.first_names or ()), *(p.middle_names or ()))),
+        " ".join((*first_names, *middle_names)),
     ]
     out = ", ".join(filter(None, name_parts))
     # If the name is completely capitalized, it's probably by mistake.
@@ -310,6 +456,34 @@ def _get_person_str(p: Person) -> str:
     return out
 
 
+def iter_segments(
+    od: Mapping[str, Entry],
+    delimiter_type: Literal["braces", "quotes"],
+    *,
+    indent: int | Literal["tab"] = 2,
+    preamble: list | None = None,
+) -> Iterator[str]:
+    """Yield strings representing the preamble commands and bib entries.
+
+    See `dict_to_string` for the parameters.
+    """
+    delimiters = {"braces": ("{", "}"), "quotes": ('"', '"')}[delimiter_type]
+
+    if preamble:
+        # Add segments for each preamble entry
+        for preamble_string in preamble:
+            yield f'@preamble{{"{preamble_string}"}}'
+
+    # Add segments for each bibtex entry in order
+    for bib_id, d in od.items():
+        yield pybtex_to_bibtex_string(
+            d,
+            bib_id,
+            delimiters=delimiters,
+            indent="\t" if indent == "tab" else (" " * indent),
+        )
+
+
 # This used to be a write() function, but beware of exceptions! Files would get
 # unintentionally overridden, see <https://github.com/nschloe/betterbib/issues/184>
 def dict_to_string(
@@ -333,29 +507,97 @@ def dict_to_string(
         list of preamble commands
 
     """
-    # Write header to the output file.
-    segments = []
+    segments = iter_segments(od, delimiter_type, indent=indent, preamble=preamble)
+    # Join the chunks, instead of all segments and then again to append a newline
+    return "".join(iter_output(segments))
 
-    delimiters = {"braces": ("{", "}"), "quotes": ('"', '"')}[delimiter_type]
 
-    if preamble:
-        # Add segments for each preamble entry
-        segments.extend(
-            [f'@preamble{{"{preamble_string}"}}' for preamble_string in preamble]
-        )
+#: Number of characters `iter_output` collects into a chunk
+OUTPUT_CHUNK_SIZE = 1 << 16
 
-    # Add segments for each bibtex entry in order
-    segments += [
-        pybtex_to_bibtex_string(
-            d,
-            bib_id,
-            delimiters=delimiters,
-            indent="\t" if indent == "tab" else (" " * indent),
-        )
-        for bib_id, d in od.items()
-    ]
 
-    return "\n\n".join(segments) + "\n"
+def iter_output(segments: Iterable[str]) -> Iterator[str]:
+    """Join `segments` with the separators `dict_to_string` puts between them.
+
+    The output is yielded in chunks of about `OUTPUT_CHUNK_SIZE` characters,
+    so it can be written without building all of it in memory.
+    """
+    batch: list[str] = []
+    size = 0
+    sep = ""
+    for segment in segments:
+        batch.append(segment)
+        size += len(segment)
+        if size >= OUTPUT_CHUNK_SIZE:
+            yield sep + "\n\n".join(batch)
+            batch, size, sep = [], 0, "\n\n"
+    if batch:
+        yield sep + "\n\n".join(batch)
+    yield "\n"
+
+
+def _is_text_file(fp: IO[str] | IO[bytes]) -> bool:
+    """Check if `fp` is opened in text mode."""
+    if isinstance(fp, io.TextIOBase):
+        return True
+    if isinstance(fp, (io.BufferedIOBase, io.RawIOBase)):
+        return False
+    # Wrappers like `tempfile.NamedTemporaryFile` only reveal their mode
+    if isinstance(mode := getattr(fp, "mode", None), str):
+        return "b" not in mode
+    try:
+        cast("IO[str]", fp).write("")
+    except TypeError:
+        return False
+    return True
+
+
+def dump(
+    od: Mapping[str, Entry],
+    fp: IO[str] | IO[bytes],
+    delimiter_type: Literal["braces", "quotes"] = "braces",
+    *,
+    indent: int | Literal["tab"] = 2,
+    preamble: list | None = None,
+    encoding: str = "utf-8",
+) -> None:
+    """Write the bib entries to a file, formatting and encoding them in chunks.
+
+    The output is the same as `dict_to_string`’s,
+    but never held in memory as a whole, which matters for huge bibliographies.
+
+    Parameters
+    ----------
+    od
+        dictionary of bibtex entries
+    fp
+        text file, or binary file to write the encoded output to
+    delimiter_type
+        delimiter to use to mark strings
+    indent
+        how to indent the entries
+    preamble
+        list of preamble commands
+    encoding
+        encoding for binary files
+
+    """
+    segments = iter_segments(od, delimiter_type, indent=indent, preamble=preamble)
+    chunks = iter_output(segments)
+    if _is_text_file(fp):
+        cast("IO[str]", fp).writelines(chunks)
+        return
+    if not isinstance(fp, io.RawIOBase):
+        cast("IO[bytes]", fp).writelines(chunk.encode(encoding) for chunk in chunks)
+        return
+    # Unbuffered files may only write part of each chunk
+    buffered = io.BufferedWriter(fp)
+    try:
+        buffered.writelines(chunk.encode(encoding) for chunk in chunks)
+        buffered.flush()
+    finally:
+        # Leave `fp` open
+        buffered.detach()
 
 
 def merge(entry1: Entry, entry2: Entry | None) -> Entry:
@@ -382,23 +624,81 @@ def merge(entry1: Entry, entry2: Entry | None) -> Entry:
 
 
 def filter_fields(
-    data: BibliographyData, excludes: Sequence[str] = ()
+    data: BibliographyData,
+    excludes: Iterable[str] = (),
+    *,
+    keep: Iterable[str] = (),
+    max_size: Mapping[str, int] | None = None,
 ) -> BibliographyData:
-    """Remove fields from bibtex entries."""
-    entry: Entry
-    for entry in data.entries.values():
-        if entry.fields:
-            entry.fields = {k: v for k, v in entry.fields.items() if k not in excludes}
+    """Remove fields from bibtex entries.
+
+    Parameters
+    ----------
+    data
+        bibliography to filter in place
+    excludes
+        names, globs or regular expressions of fields to remove,
+        see `filters.FieldFilter`
+    keep
+        patterns of the fields to keep, removing all others
+    max_size
+        maximum sizes of field values in bytes, by field pattern
+
+    Returns
+    -------
+    `data`, with the fields removed
+
+    """
+    FieldFilter(excludes, keep, max_size).filter(data.entries)
     return data
 
 
-def bibtex_parser(infile: IO[str]) -> BibliographyData:
+def drop_fields(entry: Entry, excludes: Iterable[str]) -> None:
+    """Remove the fields named in `excludes` (in any case) from `entry` in place."""
+    excludes = {k.lower() for k in excludes}
+    if entry.fields:
+        for key in [k for k in entry.fields if k.lower() in excludes]:
+            del entry.fields[key]
+
+
+def new_parser(
+    parser: Literal["pybtex", "fast"] = "pybtex",
+) -> bibtex.Parser | fast_parser.Parser:
+    """Create a BibTeX parser.
+
+    Parameters
+    ----------
+    parser
+        which parser backend to use
+
+    Returns
+    -------
+    parser with ``parse_string``, ``parse_file`` and ``data``
+
+    """
+    if parser == "fast":
+        from . import fast_parser
+
+        return fast_parser.Parser()
+    if parser == "pybtex":
+        from pybtex.database.input import bibtex
+
+        return bibtex.Parser()
+    msg = f"Unknown parser {parser}"
+    raise AssertionError(msg)
+
+
+def bibtex_parser(
+    infile: IO[str], parser: Literal["pybtex", "fast"] = "pybtex"
+) -> BibliographyData:
     """Return the parsed bibtex data and adds context to the exception.
 
     Parameters
     ----------
     infile
         file to be parsed
+    parser
+        which parser backend to use
 
     Returns
     -------
@@ -406,7 +706,7 @@ def bibtex_parser(infile: IO[str]) -> BibliographyData:
 
     """
     try:
-        data = bibtex.Parser().parse_file(infile)
+        data = new_parser(parser).parse_file(infile)
 
     except Exception as e:
         getattr(e, "add_note", print)(f"There was an error when parsing {infile.name}")
@@ -415,19 +715,113 @@ def bibtex_parser(infile: IO[str]) -> BibliographyData:
         return data
 
 
-def write(string: str, outfile: IO[str] | None = None) -> None:
+def _has_content(path: Path, data: bytes) -> bool:
+    """Check if the file at `path` contains exactly `data`."""
+    try:
+        return path.stat().st_size == len(data) and path.read_bytes() == data
+    except OSError:
+        return False
+
+
+def _same_content(path1: Path, path2: Path, chunk_size: int = 1 << 16) -> bool:
+    """Check if two files have the same content, reading them in chunks."""
+    try:
+        if path1.stat().st_size != path2.stat().st_size:
+            return False
+        with path1.open("rb") as f1, path2.open("rb") as f2:
+            while (chunk := f1.read(chunk_size)) == f2.read(chunk_size):
+                if not chunk:
+                    return True
+            return False
+    except OSError:
+        return False
+
+
+def replace_file(
+    path: Path, write_content: Callable[[IO[str]], object], encoding: str | None = None
+) -> bool:
+    """Atomically replace a file with the content written by `write_content`.
+
+    The content is written to a temporary file in the same directory,
+    which is synced to disk and then renamed to `path`.
+    So `path` is left untouched if `write_content` fails,
+    or if the new content is identical to the old one.
+    If `path` is a symbolic link, the file it points to is replaced.
+
+    Parameters
+    ----------
+    path
+        file to replace
+    write_content
+        function writing the new content to the file object it is passed
+    encoding
+        text encoding (default: the locale’s encoding)
+
+    Returns
+    -------
+    whether the file changed
+
+    """
+    # Replace the target of symbolic links, not the links themselves
+    path = Path(os.path.realpath(path))
+    with tempfile.NamedTemporaryFile(
+        "w",
+        encoding=encoding,
+        dir=path.parent,
+        prefix=f".{path.name}.",
+        suffix=".tmp",
+        delete=False,
+    ) as f:
+        tmp_path = Path(f.name)
+        try:
+            write_content(f)
+            f.flush()
+            changed = not _same_content(path, tmp_path)
+            if changed:
+                os.fsync(f.fileno())
+        except BaseException:
+            f.close()
+            tmp_path.unlink()
+            raise
+    if not changed:
+        tmp_path.unlink()
+        return False
+    with contextlib.suppress(FileNotFoundError):
+        shutil.copymode(path, tmp_path)
+    tmp_path.replace(path)
+    return True
+
+
+def write(
+    string: str, outfile: IO[str] | None = None, *, dry_run: bool = False
+) -> bool:
     """Write a string to a BibTeX file.
 
+    Files are only replaced (atomically) if their content changes,
+    so unchanged files keep their modification time.
+
     Parameters
     ----------
     string
         string to write
     outfile
-        file to write to (default: None)
+        file to write to (default: None, i.e. stdout)
+    dry_run
+        only check if the file would change (default: False)
+
+    Returns
+    -------
+    whether `outfile` changed or would change (always true for stdout)
 
     """
-    if outfile:
-        with Path(outfile.name).open("w") as f:
-            f.write(string)
-    else:
-        sys.stdout.write(string)
+    if not outfile:
+        if not dry_run:
+            sys.stdout.write(string)
+        return True
+
+    path = Path(outfile.name)
+    if _has_content(path, string.encode(outfile.encoding)):
+        return False
+    if dry_run:
+        return True
+    return replace_file(path, lambda f: f.write(string), outfile.encoding)
@@ -0,0 +1,182 @@
+"""Watch directories for changed BibTeX files.
+
+On Linux, changes are reported by inotify.
+Elsewhere, the directory is polled for changed modification times and sizes.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from typing import TYPE_CHECKING
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+
+SUFFIX = ".bib"
+DEBOUNCE = 0.1
+POLL_INTERVAL = 0.5
+
+
+def iter_bib_files(directory: Path) -> Iterator[Path]:
+    """Yield the BibTeX files in `directory` and its subdirectories."""
+    return (path for path in directory.rglob(f"*{SUFFIX}") if path.is_file())
+
+
+class PollingWatcher:
+    """Detect changes by comparing modification times and sizes."""
+
+    def __init__(
+        self,
+        directory: Path,
+        interval: float = POLL_INTERVAL,
+        debounce: float = DEBOUNCE,
+    ) -> None:
+        """Take an initial snapshot of `directory`."""
+        self.directory = directory
+        self.interval = interval
+        self.debounce = debounce
+        self.snapshot = self.scan()
+
+    def close(self) -> None:
+        """Do nothing, polling needs no resources."""
+
+    def scan(self) -> dict[Path, tuple[int, int]]:
+        """Get the modification time and size of each BibTeX file."""
+        snapshot = {}
+        for path in iter_bib_files(self.directory):
+            try:
+                stat = path.stat()
+            except OSError:  # deleted in the meantime
+                continue
+            snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def changes(self) -> set[Path]:
+        """Get the files that were created or modified since the last call."""
+        snapshot = self.scan()
+        changed = {p for p, sig in snapshot.items() if self.snapshot.get(p) != sig}
+        self.snapshot = snapshot
+        return changed
+
+    def __iter__(self) -> Iterator[set[Path]]:
+        """Yield sets of changed files, once they stopped changing."""
+        changed: set[Path] = set()
+        while True:
+            time.sleep(self.debounce if changed else self.interval)
+            if more := self.changes():
+                changed |= more
+            elif changed:
+                yield changed
+                changed = set()
+
+
+class InotifyWatcher:
+    """Detect changes using Linux’ inotify API."""
+
+    # Constants from <sys/inotify.h>
+    IN_CLOSE_WRITE = 0x8
+    IN_MOVED_TO = 0x80
+    IN_CREATE = 0x100
+    IN_Q_OVERFLOW = 0x4000
+    IN_ISDIR = 0x40000000
+    MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self, directory: Path, debounce: float = DEBOUNCE) -> None:
+        """Watch `directory` and its subdirectories.
+
+        Raises OSError if inotify is unavailable.
+        """
+        libc_name = ctypes.util.find_library("c")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            msg = "inotify is not available"
+            raise OSError(msg)
+        self.fd = self._check(self._libc.inotify_init1(os.O_CLOEXEC))
+        self.directory = directory
+        self.debounce = debounce
+        self.dirs: dict[int, Path] = {}
+        self.add_tree(directory)
+
+    def _check(self, result: int) -> int:
+        if result < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        return result
+
+    def close(self) -> None:
+        """Stop watching."""
+        os.close(self.fd)
+
+    def add_tree(self, directory: Path) -> None:
+        """Watch `directory` and all its subdirectories."""
+        for path in [directory, *(p for p in directory.rglob("*") if p.is_dir())]:
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), self.MASK)
+            try:
+                self.dirs[self._check(wd)] = path
+            except FileNotFoundError:  # deleted in the meantime
+                continue
+
+    def read_events(self) -> Iterator[tuple[int, int, str]]:
+        """Yield the ``(wd, mask, name)`` of pending events."""
+        data = os.read(self.fd, 1 << 16)
+        pos = 0
+        while pos < len(data):
+            wd, mask, _cookie, length = self._EVENT.unpack_from(data, pos)
+            pos += self._EVENT.size
+            name = os.fsdecode(data[pos : pos + length].rstrip(b"\0"))
+            pos += length
+            yield wd, mask, name
+
+    def changes(self) -> set[Path]:
+        """Get the files that were written, moved here or created."""
+        changed = set()
+        for wd, mask, name in self.read_events():
+            if mask & self.IN_Q_OVERFLOW:
+                # Events were lost, so consider everything changed
+                changed.update(iter_bib_files(self.directory))
+            elif wd not in self.dirs:
+                continue
+            elif mask & self.IN_ISDIR:
+                self.add_tree(self.dirs[wd] / name)
+                changed.update(iter_bib_files(self.dirs[wd] / name))
+            elif name.endswith(SUFFIX) and mask & (
+                self.IN_CLOSE_WRITE | self.IN_MOVED_TO
+            ):
+                changed.add(self.dirs[wd] / name)
+        return changed
+
+    def wait(self, timeout: float | None) -> bool:
+        """Wait for events. Returns False if there were none within `timeout`."""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        return bool(readable)
+
+    def __iter__(self) -> Iterator[set[Path]]:
+        """Yield sets of changed files, once they stopped changing."""
+        while True:
+            self.wait(None)
+            changed = self.changes()
+            while self.wait(self.debounce):
+                changed |= self.changes()
+            if changed:
+                yield changed
+
+
+def watcher(directory: Path) -> InotifyWatcher | PollingWatcher:
+    """Watch `directory` with inotify if possible, polling otherwise."""
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(directory)
+        except OSError:
+            pass
+    return PollingWatcher(directory)
@@ -0,0 +1,137 @@
+"""Memory-mapped word index for dictionary lookups.
+
+The index file consists of a header, a table of word offsets,
+an open-addressing hash table of word numbers and the UTF-8 encoded words.
+A lookup hashes the word and compares it to one or two candidates,
+and loading an index is nearly free.
+As the file is mapped read-only, its pages are shared by all processes using it.
+"""
+
+from __future__ import annotations
+
+import mmap
+import struct
+import sys
+import tempfile
+from array import array
+from collections.abc import Set as AbstractSet
+from importlib.metadata import version
+from pathlib import Path
+from typing import TYPE_CHECKING
+from zlib import crc32
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+
+_MAGIC = f"bibfmt-words-2-{sys.byteorder}\n".encode()
+_HEADER = struct.Struct("=II")
+
+
+class WordIndex(AbstractSet[str]):
+    """Read-only set of words, backed by a memory-mapped index file.
+
+    Create index files with `build_word_index`.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Map the index at `path` into memory."""
+        with path.open("rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        offsets_start = len(_MAGIC) + _HEADER.size
+        if mm[: len(_MAGIC)] != _MAGIC or len(mm) < offsets_start:
+            msg = "Not a word index"
+            raise ValueError(msg)
+        n, n_slots = _HEADER.unpack_from(mm, len(_MAGIC))
+        slots_start = offsets_start + 4 * (n + 1)
+        self._blob_start = slots_start + 4 * n_slots
+        # Check the size, as lookups in a truncated index would fail at random
+        if len(mm) < self._blob_start:
+            msg = "Truncated word index"
+            raise ValueError(msg)
+        self._offsets = memoryview(mm)[offsets_start:slots_start].cast("I")
+        if len(mm) != self._blob_start + self._offsets[n]:
+            msg = "Truncated or corrupt word index"
+            raise ValueError(msg)
+        self._slots = memoryview(mm)[slots_start : self._blob_start].cast("I")
+        self._mask = n_slots - 1
+        self._len = n
+        self._mm = mm
+
+    def _word(self, i: int) -> bytes:
+        start = self._blob_start
+        return self._mm[start + self._offsets[i] : start + self._offsets[i + 1]]
+
+    def __contains__(self, word: object) -> bool:
+        """Check if `word` is in the index, using one hash and few comparisons."""
+        if not isinstance(word, str):
+            return False
+        key = word.encode()
+        i = crc32(key) & self._mask
+        while slot := self._slots[i]:
+            if self._word(slot - 1) == key:
+                return True
+            i = (i + 1) & self._mask
+        return False
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the words in sorted (UTF-8) order."""
+        return (self._word(i).decode() for i in range(self._len))
+
+    def __len__(self) -> int:
+        """Get the number of words."""
+        return self._len
+
+
+def build_word_index(words: Iterable[str], path: Path) -> None:
+    """Write an index of `words` to `path`, replacing it atomically."""
+    encoded = sorted({word.encode() for word in words})
+    offsets = array("I", [0])
+    for word in encoded:
+        offsets.append(offsets[-1] + len(word))
+
+    # Keep the load factor at or below 1/2, so that probe sequences stay short
+    n_slots = 1 << max(len(encoded) * 2 - 1, 1).bit_length()
+    mask = n_slots - 1
+    slots = array("I", bytes(4 * n_slots))
+    for number, word in enumerate(encoded, 1):
+        i = crc32(word) & mask
+        while slots[i]:
+            i = (i + 1) & mask
+        slots[i] = number
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(
+        "wb", dir=path.parent, prefix=f".{path.name}.", delete=False
+    ) as f:
+        f.write(_MAGIC)
+        f.write(_HEADER.pack(len(encoded), n_slots))
+        f.write(offsets.tobytes())
+        f.write(slots.tobytes())
+        f.writelines(encoded)
+    Path(f.name).replace(path)
+
+
+def load_word_index(source: str = "web2") -> AbstractSet[str]:
+    """Load a word list from `english_words` as a memory-mapped `WordIndex`.
+
+    The index is built in the user cache directory on first use.
+    If that is not possible, the plain set of words is returned.
+    """
+    from platformdirs import user_cache_dir
+
+    path = Path(user_cache_dir("bibfmt")) / f"{source}-{version('english-words')}.words"
+    try:
+        return WordIndex(path)
+    except (OSError, ValueError):
+        pass
+
+    from english_words import get_english_words_set
+
+    words = get_english_words_set([source])
+    try:
+        build_word_index(words, path)
+        return WordIndex(path)
+    except OSError:
+        return words
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import socket
+import threading
+from typing import TYPE_CHECKING
+
+import pytest
+
+import bibfmt
+from bibfmt import daemon
+from bibfmt.cli import _main
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(socket, "AF_UNIX"), reason="needs Unix sockets"
+)
+
+
+@pytest.fixture
+def socket_path(tmp_path: Path) -> Iterator[Path]:
+    path = tmp_path / "bibfmt.sock"
+    with daemon.Server(path, _main._serve) as server:
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        try:
+            yield path
+        finally:
+            server.shutdown()
+            thread.join()
+    assert not path.exists()
+
+
+def test_connect(
+    socket_path: Path,
+    tmp_path: Path,
+    *,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "test.bib").write_text("@misc{k, note = {x}}")
+    args = ["--connect", "--socket", str(socket_path)]
+
+    assert bibfmt.cli.main([*args, "test.bib"]) == 0
+    assert capsys.readouterr().out == "@misc{k,\n  note = {x},\n}\n"
+
+    assert bibfmt.cli.main([*args, "--check", "test.bib"]) == 1
+    assert capsys.readouterr().out == "would reformat test.bib\n"
+
+    monkeypatch.setattr("sys.stdin.read", lambda: "@misc{k, note = {y}}")
+    assert bibfmt.cli.main([*args, "-"]) == 0
+    assert capsys.readouterr().out == "@misc{k,\n  note = {y},\n}\n"
+
+
+def test_connect_dedupe(
+    socket_path: Path, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    paths = [tmp_path / "a.bib", tmp_path / "b.bib"]
+    paths[0].write_text("@misc{k1, doi = {10.1/x}}")
+    paths[1].write_text("@misc{k2, doi = {10.1/X}}")
+    args = ["--connect", "--socket", str(socket_path), "--dedupe=report"]
+
+    assert bibfmt.cli.main([*args, *map(str, paths)]) == 1
+    assert capsys.readouterr().out == f"{paths[0]}:k1 {paths[1]}:k2\n"
+
+
+def test_connect_errors(
+    socket_path: Path, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    infile = tmp_path / "test.bib"
+    infile.write_text("@misc{k, note = {x}")
+    args = ["--connect", "--socket", str(socket_path)]
+
+    assert bibfmt.cli.main([*args, str(infile)]) == 1
+    assert "There was an error when parsing" in capsys.readouterr().err
+
+
+def test_connect_without_daemon(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    infile = tmp_path / "test.bib"
+    infile.write_text("@misc{k, note = {x}}")
+
+    args = ["--connect", "--socket", str(tmp_path / "missing.sock"), str(infile)]
+    assert bibfmt.cli.main(args) == 0
+    assert capsys.readouterr().out == "@misc{k,\n  note = {x},\n}\n"
+
+
+def test_daemon_running(socket_path: Path) -> None:
+    with pytest.raises(RuntimeError, match="already listening"):
+        daemon.Server(socket_path, _main._serve)
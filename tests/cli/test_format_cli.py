@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import json
+import os
 import tempfile
 from pathlib import Path
 
@@ -60,6 +62,30 @@ TEST_BIBTEXT_PREAMBLE_FORMATTED_KEEP = f"""\
             ["--indent=tab"],
             id="fmt_tab",
         ),
+        pytest.param(
+            TEST_BIBTEXT_PREAMBLE_UNFORMATTED,
+            TEST_BIBTEXT_PREAMBLE_FORMATTED_KEEP,
+            ["--stream"],
+            id="stream",
+        ),
+        pytest.param(
+            TEST_BIBTEXT_PREAMBLE_UNFORMATTED,
+            TEST_BIBTEXT_PREAMBLE_FORMATTED_KEEP,
+            ["--parser=fast"],
+            id="fast_parser",
+        ),
+        pytest.param(
+            TEST_BIBTEXT_PREAMBLE_UNFORMATTED,
+            TEST_BIBTEXT_PREAMBLE_FORMATTED_KEEP,
+            ["--parser=fast", "--stream"],
+            id="fast_parser_stream",
+        ),
+        pytest.param(
+            "@book{k, title={The Magnus expansion}}",
+            "@book{k,\n  title = {The {Magnus} expansion},\n}\n",
+            ["--preserve-title-capitalization"],
+            id="preserve_title_capitalization",
+        ),
     ],
 )
 def test_cli_format(
@@ -78,3 +104,341 @@ def test_cli_format(
         bibfmt.cli.main(["--in-place", *args, str(infile)])
         with infile.open() as f:
             assert f.read() == ref_out
+
+
+def test_cli_jobs(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    infiles = [tmp_path / f"test{i}.bib" for i in range(3)]
+    for i, infile in enumerate(infiles):
+        infile.write_text(TEST_BIBTEXT_PREAMBLE_UNFORMATTED.replace("foobar", f"k{i}"))
+    # A broken file must not stop the others
+    infiles[1].write_text("@article{broken,\n")
+
+    status = bibfmt.cli.main(["--jobs=2", *map(str, infiles)])
+    captured = capsys.readouterr()
+    assert status == 1
+    assert captured.out == (
+        TEST_BIBTEXT_PREAMBLE_FORMATTED_KEEP.replace("foobar", "k0")
+        + TEST_BIBTEXT_PREAMBLE_FORMATTED_KEEP.replace("foobar", "k2")
+    )
+
+
+def test_cli_many_files(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    import resource
+
+    infiles = [tmp_path / f"test{i}.bib" for i in range(64)]
+    for i, infile in enumerate(infiles):
+        infile.write_text(f"@misc{{k{i}, note = {{x}}}}")
+    # Fail if the input files are opened all at once
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (32, hard))
+    try:
+        assert bibfmt.cli.main(list(map(str, infiles))) == 0
+    finally:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (soft, hard))
+    assert capsys.readouterr().out.count("@misc") == len(infiles)
+
+
+def test_cli_missing_file(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    with pytest.raises(SystemExit):
+        bibfmt.cli.main([str(tmp_path / "missing.bib")])
+    assert "can't open" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("args", [[], ["--stream"], ["--cache-dir={cache}"]])
+def test_cli_field_filters(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str], args: list[str]
+) -> None:
+    infile = tmp_path / "test.bib"
+    infile.write_text(
+        "@misc{a, note = {n}, abstract = {long}, mendeley-tags = {x}, year = {2001}}\n"
+        "@book{b, note = {n}, abstract = {ok}, isbn = {1}}\n"
+    )
+    args = [a.format(cache=tmp_path / "cache") for a in args]
+    options = ["--drop=mendeley-*", "--keep=book:/^(note|abstract)$/"]
+    options += ["--max-size=abstract=3"]
+    assert bibfmt.cli.main([*args, *options, str(infile)]) == 0
+    assert capsys.readouterr().out == (
+        "@misc{a,\n  note = {n},\n  year = {2001},\n}\n\n"
+        "@book{b,\n  note     = {n},\n  abstract = {ok},\n}\n"
+    )
+
+
+def test_cli_invalid_field_rule(capsys: pytest.CaptureFixture[str]) -> None:
+    with pytest.raises(SystemExit):
+        bibfmt.cli.main(["--drop=/(/", "-"])
+    assert "Invalid regular expression '/(/'" in capsys.readouterr().err
+
+
+def test_cli_jobs_single_file(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from bibfmt import parallel
+
+    monkeypatch.setattr(parallel, "MIN_SIZE", 0)
+    monkeypatch.setattr(parallel, "MIN_CHUNK_SIZE", 1)
+    infile = tmp_path / "test.bib"
+    infile.write_text(
+        TEST_BIBTEXT_PREAMBLE_UNFORMATTED
+        + TEST_BIBTEXT_PREAMBLE_UNFORMATTED.replace("foobar", "k")
+    )
+
+    assert bibfmt.cli.main([str(infile)]) == 0
+    expected = capsys.readouterr().out
+    assert expected.count("@preamble") == 4  # noqa: PLR2004
+
+    assert bibfmt.cli.main(["--jobs=2", str(infile)]) == 0
+    assert capsys.readouterr().out == expected
+
+
+def test_cli_dedupe(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    infiles = [tmp_path / "a.bib", tmp_path / "b.bib"]
+    infiles[0].write_text(
+        "@article{a, title = {A Title}, year = 2000}\n@book{b, title = {B}}"
+    )
+    infiles[1].write_text(
+        "@article{c, title = {A {T}itle}, year = 2000, pages = {1-2}}"
+    )
+
+    assert bibfmt.cli.main(["--dedupe=report", *map(str, infiles)]) == 1
+    assert capsys.readouterr().out == f"{infiles[0]}:a {infiles[1]}:c\n"
+
+    assert bibfmt.cli.main(["--dedupe=merge", *map(str, infiles)]) == 0
+    assert capsys.readouterr().out == (
+        "@article{a,\n  title = {A Title},\n  year  = {2000},\n  pages = {1--2},\n}"
+        "\n\n@book{b,\n  title = {B},\n}\n"
+    )
+
+    # Merged entries can’t be written back in place
+    contents = [infile.read_text() for infile in infiles]
+    with pytest.raises(SystemExit):
+        bibfmt.cli.main(["--dedupe=merge", "-i", *map(str, infiles)])
+    assert "can’t be used with -i" in capsys.readouterr().err
+    assert [infile.read_text() for infile in infiles] == contents
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        pytest.param([], id="default"),
+        pytest.param(["--stream"], id="stream"),
+        pytest.param(["--cache-dir={cache}"], id="cache"),
+        pytest.param(["--jobs=2"], id="jobs"),
+    ],
+)
+def test_cli_sort_by(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+    *,
+    args: list[str],
+) -> None:
+    from bibfmt import parallel, sort
+
+    monkeypatch.setattr(parallel, "MIN_SIZE", 0)
+    monkeypatch.setattr(sort, "RUN_SIZE", 1)
+    infile = tmp_path / "test.bib"
+    infile.write_text(
+        "@misc{c, year = {2001}}\n@misc{B, year = {1999}}\n"
+        '@preamble{"x"}\n@misc{a, year = {2001}}\n@misc{d}\n'
+    )
+    args = [a.format(cache=tmp_path / "cache") for a in args]
+
+    for _ in range(2):  # with a warm cache
+        assert bibfmt.cli.main([*args, "--sort-by=year", str(infile)]) == 0
+        out = capsys.readouterr().out
+        assert [line for line in out.splitlines() if line.startswith("@")] == [
+            '@preamble{"x"}',
+            "@misc{B,",
+            "@misc{c,",
+            "@misc{a,",
+            "@misc{d,",
+        ]
+
+    assert bibfmt.cli.main([*args, "-b", str(infile)]) == 0
+    out = capsys.readouterr().out
+    # By code point, like `sorted`
+    assert out.index("@misc{B,") < out.index("@misc{a,") < out.index("@misc{c,")
+
+
+def test_cli_cache(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    from bibfmt import stream
+    from bibfmt.cli import _main
+
+    infile = tmp_path / "test.bib"
+    unformatted = TEST_BIBTEXT_PREAMBLE_UNFORMATTED + "\n@misc{other, note={x}}"
+    infile.write_text(unformatted)
+    args = ["--cache-dir", str(tmp_path / "cache"), str(infile)]
+
+    transformed: list[list[str]] = []
+    transform = _main._transform
+
+    def counting_transform(*args_: object) -> object:
+        d = transform(*args_)
+        transformed.append(list(d))
+        return d
+
+    monkeypatch.setattr(_main, "_transform", counting_transform)
+
+    # All entries that aren’t cached are transformed at once
+    bibfmt.cli.main(args)
+    formatted = capsys.readouterr().out
+    assert transformed == [["foobar", "other"]]
+    bibfmt.cli.main(["--stream", *args])
+    assert capsys.readouterr().out == formatted
+
+    # Unchanged entries are reused
+    transformed.clear()
+    infile.write_text(unformatted.replace("{x}", "{y}"))
+    bibfmt.cli.main(args)
+    assert capsys.readouterr().out == formatted.replace("{x}", "{y}")
+    assert transformed == [["other"]]
+
+    # Formatted files are not parsed at all
+    transformed.clear()
+    monkeypatch.setattr(stream, "iter_commands", None)
+    infile.write_text(formatted)
+    bibfmt.cli.main(args)
+    assert capsys.readouterr().out == formatted
+    assert transformed == []
+
+
+def test_cache_options_short_doi(monkeypatch: pytest.MonkeyPatch) -> None:
+    from bibfmt.cli import _main
+    from bibfmt.tools import SHORTDOI_CACHE_TTL
+
+    args = _main.parser().parse_args(
+        ["--doi-url-type=short", "-"], namespace=_main.FormatArgs()
+    )
+    monkeypatch.setattr(_main.time, "time", lambda: 0.0)
+    options = _main._cache_options(args)
+    # Cached results expire with the short DOIs they use
+    monkeypatch.setattr(_main.time, "time", SHORTDOI_CACHE_TTL.total_seconds)
+    assert _main._cache_options(args) != options
+
+
+@pytest.mark.parametrize("args", [[], ["-"]], ids=["default", "dash"])
+def test_cli_in_place_stdin(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, args: list[str]
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("sys.stdin.read", lambda *_: "@misc{k, note = {x}}")
+    with pytest.raises(SystemExit) as excinfo:
+        bibfmt.cli.main(["--in-place", *args])
+    assert excinfo.value.code == 2  # noqa: PLR2004
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize("args", [[], ["--stream"]], ids=["default", "stream"])
+def test_cli_in_place_unchanged(tmp_path: Path, args: list[str]) -> None:
+    infile = tmp_path / "test.bib"
+    infile.write_text(TEST_BIBTEXT_PREAMBLE_FORMATTED_KEEP)
+    os.utime(infile, ns=(0, 0))
+
+    bibfmt.cli.main(["--in-place", *args, str(infile)])
+    assert infile.stat().st_mtime_ns == 0
+    assert infile.read_text() == TEST_BIBTEXT_PREAMBLE_FORMATTED_KEEP
+    assert [p.name for p in tmp_path.iterdir()] == ["test.bib"]
+
+
+@pytest.mark.parametrize("args", [[], ["--stream"]], ids=["default", "stream"])
+def test_cli_in_place_symlink(tmp_path: Path, args: list[str]) -> None:
+    target = tmp_path / "shared" / "refs.bib"
+    target.parent.mkdir()
+    target.write_text(TEST_BIBTEXT_PREAMBLE_UNFORMATTED)
+    link = tmp_path / "link.bib"
+    link.symlink_to(target)
+
+    bibfmt.cli.main(["--in-place", *args, str(link)])
+    assert link.is_symlink()
+    assert target.read_text() == TEST_BIBTEXT_PREAMBLE_FORMATTED_KEEP
+    assert [p.name for p in target.parent.iterdir()] == ["refs.bib"]
+
+
+def test_cli_jobs_parse_error(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    from bibfmt import parallel
+
+    monkeypatch.setattr(parallel, "MIN_SIZE", 0)
+    monkeypatch.setattr(parallel, "MIN_CHUNK_SIZE", 1)
+    entries = [f"@misc{{k{i},\n  title = {{T}},\n}}\n" for i in range(20)]
+    # The invalid entry starts at line 31, in a later chunk
+    entries[10] = "@misc{bad,\n  title = {T} x\n}\n"
+    infile = tmp_path / "test.bib"
+    infile.write_text("".join(entries))
+
+    with pytest.raises(RuntimeError) as exc_info:
+        bibfmt.cli.main(["--jobs=2", str(infile)])
+    message = str(exc_info.value)
+    assert message.startswith(f"There was an error when parsing {infile}: ")
+    assert "line 32" in message
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_cli_check(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str], jobs: str
+) -> None:
+    formatted = tmp_path / "formatted.bib"
+    formatted.write_text(TEST_BIBTEXT_PREAMBLE_FORMATTED_KEEP)
+    unformatted = tmp_path / "unformatted.bib"
+    unformatted.write_text(TEST_BIBTEXT_PREAMBLE_UNFORMATTED)
+
+    status = bibfmt.cli.main(["--check", f"--jobs={jobs}", str(formatted)])
+    assert status == 0
+    assert capsys.readouterr().out == ""
+
+    status = bibfmt.cli.main(
+        ["--check", "--in-place", f"--jobs={jobs}", str(formatted), str(unformatted)]
+    )
+    assert status == 1
+    assert capsys.readouterr().out == f"would reformat {unformatted}\n"
+    assert unformatted.read_text() == TEST_BIBTEXT_PREAMBLE_UNFORMATTED
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_cli_profile(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str], jobs: str
+) -> None:
+    infile = tmp_path / "test.bib"
+    infile.write_text(TEST_BIBTEXT_PREAMBLE_UNFORMATTED)
+
+    bibfmt.cli.main(["--profile=json", f"--jobs={jobs}", str(infile)])
+    captured = capsys.readouterr()
+    assert captured.out == TEST_BIBTEXT_PREAMBLE_FORMATTED_KEEP
+    records = [json.loads(line) for line in captured.err.splitlines()]
+    assert {r["file"] for r in records} == {str(infile)}
+    stages = {r["stage"]: r for r in records}
+    assert list(stages) == [
+        "parse",
+        "adapt_doi_urls",
+        "normalize",
+        "format",
+        "write",
+    ]
+    assert stages["parse"]["entries"] == 1
+    assert stages["parse"]["bytes_in"] == len(TEST_BIBTEXT_PREAMBLE_UNFORMATTED)
+    assert stages["write"]["bytes_out"] == len(TEST_BIBTEXT_PREAMBLE_FORMATTED_KEEP)
+
+
+@pytest.mark.parametrize(
+    ("args", "sort_by", "sort_by_bibkey"),
+    [
+        pytest.param([], None, False, id="default"),
+        pytest.param(["-b"], "key", True, id="bibkey"),
+        pytest.param(["--sort-by=Key"], "key", True, id="key"),
+        pytest.param(["--sort-by=year"], "year", False, id="year"),
+    ],
+)
+def test_sort_by_bibkey_compat(
+    args: list[str], sort_by: str | None, *, sort_by_bibkey: bool
+) -> None:
+    import argparse
+
+    from bibfmt.cli.helpers import add_formatting_parser_arguments
+
+    parser = argparse.ArgumentParser()
+    add_formatting_parser_arguments(parser)
+    namespace = parser.parse_args(args)
+    assert (namespace.sort_by, namespace.sort_by_bibkey) == (sort_by, sort_by_bibkey)
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import bibfmt
+
+
+# Heavy dependencies that the CLI used to import eagerly, as a reference
+EAGER_IMPORTS = (
+    "pybtex.database.input.bibtex",
+    "requests",
+    "pylatexenc.latex2text",
+    "pylatexenc.latexencode",
+)
+# Bound on the import time of the CLI, relative to that of `EAGER_IMPORTS`
+MAX_IMPORT_TIME_RATIO = 0.6
+# Modules that are not needed for `--version` or the default formatting options
+HEAVY_MODULES = {"requests", "requests_cache", "pylatexenc", "english_words"}
+
+
+def _import_times(code: str, *, top_level: bool = False) -> dict[str, int]:
+    """Run `code` with ``-X importtime``, returning cumulative import times.
+
+    With `top_level`, only modules that weren’t imported by other modules
+    are included, so that their times add up to the total.
+    """
+    env = {**os.environ, "PYTHONPATH": str(Path(bibfmt.__file__).parent.parent)}
+    proc = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=False,
+    )
+    assert proc.returncode == 0, proc.stderr
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        if cumulative.strip().isdigit() and not (top_level and name[:2] == "  "):
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def _total_import_time(code: str, startup: dict[str, int]) -> int:
+    """Get the time spent importing modules in `code`, besides those at startup.
+
+    This is the best of a few runs, which is less noisy than a single one.
+    """
+    return min(
+        sum(
+            t
+            for name, t in _import_times(code, top_level=True).items()
+            if name not in startup
+        )
+        for _ in range(3)
+    )
+
+
+@pytest.mark.parametrize(
+    ("argv", "unwanted"),
+    [
+        pytest.param(["--version"], {*HEAVY_MODULES, "pybtex"}, id="version"),
+        pytest.param([], HEAVY_MODULES, id="format"),
+    ],
+)
+def test_startup(tmp_path: Path, argv: list[str], unwanted: set[str]) -> None:
+    if not argv:
+        infile = tmp_path / "test.bib"
+        infile.write_text("@article{foobar, doi = {foobar}}")
+        argv = [str(infile)]
+
+    code = f"import sys; from bibfmt.cli import main; sys.exit(main({argv!r}))"
+    times = _import_times(code)
+    assert "bibfmt.cli" in times
+    assert unwanted.isdisjoint(times)
+
+    startup = _import_times("pass", top_level=True)
+    total = _total_import_time(code, startup)
+    reference = _total_import_time(f"import {', '.join(EAGER_IMPORTS)}", startup)
+    assert total < MAX_IMPORT_TIME_RATIO * reference
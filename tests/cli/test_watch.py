@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import bibfmt
+from bibfmt import watch
+from bibfmt.cli import _main
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+    import pytest
+
+
+def test_watch(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    a, b = tmp_path / "a.bib", tmp_path / "b.bib"
+    a.write_text("@misc{a1, note={x}}\n@misc{a2, note={x}}")
+    b.write_text("@misc{b, note = {x},\n}")
+
+    transformed: list[str] = []
+    transform = _main._transform
+
+    def counting_transform(*args_: object) -> object:
+        d = transform(*args_)
+        transformed.extend(d)
+        return d
+
+    monkeypatch.setattr(_main, "_transform", counting_transform)
+
+    class FakeWatcher:
+        def __iter__(self) -> Iterator[set[Path]]:
+            assert transformed == ["a1", "a2", "b"]
+            assert (
+                a.read_text()
+                == "@misc{a1,\n  note = {x},\n}\n\n@misc{a2,\n  note = {x},\n}\n"
+            )
+            transformed.clear()
+            # Own writes are skipped
+            yield {a}
+            assert transformed == []
+            # Only changed entries are formatted again
+            a.write_text(a.read_text().replace("a2", "a3"))
+            yield {a}
+            assert transformed == ["a3"]
+            assert "@misc{a3," in a.read_text()
+
+        def close(self) -> None:
+            pass
+
+    monkeypatch.setattr(watch, "watcher", lambda _: FakeWatcher())
+    assert bibfmt.cli.main(["--watch", str(tmp_path)]) == 0
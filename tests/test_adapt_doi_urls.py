@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+from typing import TYPE_CHECKING
+from urllib.parse import urlsplit
+
+import pytest
+from pybtex.database import Entry
+
+import bibfmt
+from bibfmt import tools
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+
+SHORT_DOIS = {"10.1000/a": "10/aa", "10.1000/b": "10/bb"}
+
+
+@pytest.fixture
+def shortdoi_requests(monkeypatch: pytest.MonkeyPatch) -> Iterator[list[str]]:
+    """Serve shortDOI lookups locally, returning the list of requested DOIs."""
+    requested: list[str] = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            doi = urlsplit(self.path).path.lstrip("/")
+            requested.append(doi)
+            if doi in SHORT_DOIS:
+                body = json.dumps({"DOI": doi, "ShortDOI": SHORT_DOIS[doi]})
+                self.send_response(200)
+            else:
+                body = json.dumps({"error": "not found"})
+                self.send_response(404)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(body.encode())
+
+        def log_message(self, *_: object) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(tools, "SHORTDOI_URL", f"http://127.0.0.1:{server.server_port}")
+    yield requested
+    server.shutdown()
+    server.server_close()
+
+
+def test_adapt_doi_urls_short(shortdoi_requests: list[str], tmp_path: Path) -> None:
+    session = tools.shortdoi_session(cache_name=tmp_path / "cache")
+
+    def make_entries() -> dict[str, Entry]:
+        return {
+            key: Entry("article", fields={"url": f"https://dx.doi.org/{doi}"})
+            for key, doi in [
+                ("a1", "10.1000/a"),
+                ("a2", "10.1000/a"),
+                ("b", "10.1000/b"),
+                ("missing", "10.1000/missing"),
+            ]
+        }
+
+    d = make_entries()
+    bibfmt.adapt_doi_urls(d, "short", max_workers=2, session=session)
+    assert {k: e.fields["url"] for k, e in d.items()} == {
+        "a1": "https://doi.org/10/aa",
+        "a2": "https://doi.org/10/aa",
+        "b": "https://doi.org/10/bb",
+        "missing": "https://dx.doi.org/10.1000/missing",
+    }
+    # Each DOI is looked up once
+    assert sorted(shortdoi_requests) == ["10.1000/a", "10.1000/b", "10.1000/missing"]
+
+    # Hits and misses are cached
+    shortdoi_requests.clear()
+    d = make_entries()
+    bibfmt.adapt_doi_urls(d, "short", session=session)
+    assert d["b"].fields["url"] == "https://doi.org/10/bb"
+    assert shortdoi_requests == []
+
+
+def test_adapt_doi_urls_async(shortdoi_requests: list[str], tmp_path: Path) -> None:
+    import asyncio
+
+    from bibfmt.aio import adapt_doi_urls_async
+
+    session = tools.shortdoi_session(cache_name=tmp_path / "cache")
+    d = {
+        key: Entry("article", fields={"url": f"https://dx.doi.org/{doi}"})
+        for key, doi in [("a1", "10.1000/a"), ("a2", "10.1000/a"), ("b", "10.1000/c")]
+    }
+    asyncio.run(adapt_doi_urls_async(d, "short", max_workers=2, session=session))
+    assert {k: e.fields["url"] for k, e in d.items()} == {
+        "a1": "https://doi.org/10/aa",
+        "a2": "https://doi.org/10/aa",
+        "b": "https://dx.doi.org/10.1000/c",
+    }
+    assert sorted(shortdoi_requests) == ["10.1000/a", "10.1000/c"]
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+import pytest
+
+from bibfmt import aio, tools
+from bibfmt.model import from_pybtex
+from bibfmt.pipeline import default_pipeline
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+BIBTEX = """\
+@preamble{"\\RequirePackage{biblatex}"}
+@article{b, title = {B}, pages = {1-2}, url = {https://dx.doi.org/10.1/b}}
+@book{a,  title = {A  title}, drop = {x}}
+"""
+
+
+def _format_sync(**pipeline_options: object) -> str:
+    data = tools.new_parser().parse_string(BIBTEX)
+    d = from_pybtex(data.entries)
+    default_pipeline(**pipeline_options).run(d)
+    return tools.dict_to_string(d, "braces", preamble=data._preamble)
+
+
+@pytest.mark.parametrize("parser", ["pybtex", "fast"])
+def test_format_string(parser: str) -> None:
+    options = {"drop": ["drop"]}
+    string = asyncio.run(
+        aio.format_string(BIBTEX, parser=parser, pipeline_options=options)
+    )
+    assert string == _format_sync(**options)
+    assert "{https://doi.org/10.1/b}" in string
+
+
+def test_format_string_concurrent() -> None:
+    async def format_many() -> list[str]:
+        return await asyncio.gather(*(aio.format_string(BIBTEX) for _ in range(20)))
+
+    assert set(asyncio.run(format_many())) == {_format_sync()}
+
+
+def test_format_files(tmp_path: Path) -> None:
+    paths = [tmp_path / f"test{i}.bib" for i in range(3)]
+    for path in paths:
+        path.write_text(BIBTEX)
+
+    strings = asyncio.run(aio.format_files(paths, sort_by="key", max_files=2))
+    assert strings == [strings[0]] * 3
+    assert paths[0].read_text() == BIBTEX
+    assert strings[0].index("@book{a") < strings[0].index("@article{b")
+
+    asyncio.run(aio.format_files(paths[:1], in_place=True))
+    assert paths[0].read_text() == _format_sync()
+    assert paths[1].read_text() == BIBTEX
+
+
+def test_format_string_process_pool() -> None:
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(1) as executor, pytest.raises(TypeError, match="thread"):
+        asyncio.run(aio.format_string(BIBTEX, executor=executor))  # type: ignore[arg-type]
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import pytest
+from pybtex.database import Entry
 
 import bibfmt
 
@@ -60,3 +61,21 @@ import bibfmt
 )
 def test_translate_title(string: str, ref: str) -> None:
     assert bibfmt.tools._translate_title(string) == ref
+
+
+def test_preserve_title_capitalization() -> None:
+    titles = ["Gaussian quadrature", "ODE solvers", "Gaussian quadrature"]
+    d = {str(i): Entry("article", fields={"title": t}) for i, t in enumerate(titles)}
+    bibfmt.tools._translate_title.cache_clear()
+    bibfmt.tools._translate_word.cache_clear()
+
+    bibfmt.tools.preserve_title_capitalization(d)
+
+    assert [e.fields["title"] for e in d.values()] == [
+        "{Gaussian} quadrature",
+        "{ODE} solvers",
+        "{Gaussian} quadrature",
+    ]
+    # each distinct word is only classified once
+    words = {"Gaussian", "quadrature", "ODE", "solvers"}
+    assert bibfmt.tools._translate_word.cache_info().misses == len(words)
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import pytest
+
+from bibfmt import dedupe
+from bibfmt.model import Entry, Person
+
+
+@pytest.mark.parametrize(
+    ("value", "doi"),
+    [
+        ("10.1000/ABC", "10.1000/abc"),
+        ("doi: 10.1000/abc", "10.1000/abc"),
+        ("https://dx.doi.org/10.1000/abc", "10.1000/abc"),
+        ("https://example.org/10.1000/abc", None),
+    ],
+)
+def test_normalize_doi(value: str, doi: str | None) -> None:
+    assert dedupe.normalize_doi(value) == doi
+
+
+def test_fingerprint() -> None:
+    assert dedupe.fingerprint('{M}{\\"u}ller--Smith') == "mullersmith"
+    assert dedupe.fingerprint("Müller-Smith") == "mullersmith"
+
+
+def _entry(**fields: str) -> Entry:
+    return Entry("article", fields, {"author": [Person(last_names=["Doe"])]})
+
+
+def test_groups() -> None:
+    index = dedupe.DuplicateIndex()
+    index.add_all(
+        {
+            "a": _entry(doi="10.1/X", title="One", year="2000"),
+            "b": _entry(title="Two", year="2000"),
+            "c": _entry(title="{T}wo", year="2001"),
+        },
+        source="1.bib",
+    )
+    index.add_all(
+        {
+            "d": _entry(url="https://doi.org/10.1/x"),
+            "e": _entry(title="two", year="2000"),
+            "c": _entry(title="Three"),
+        },
+        source="2.bib",
+    )
+    groups = [[index.records[i] for i in group] for group in index.groups()]
+    assert groups == [
+        [("1.bib", "a"), ("2.bib", "d")],
+        [("1.bib", "b"), ("2.bib", "e")],
+        [("1.bib", "c"), ("2.bib", "c")],
+    ]
+
+    author_year = dedupe.DuplicateIndex(["author-year"])
+    author_year.add_all({"a": _entry(year="2000"), "b": _entry(year="2000")})
+    assert author_year.groups() == [[0, 1]]
+
+
+def test_merge_duplicates() -> None:
+    entries = [
+        ("a", _entry(title="A", year="2000")),
+        ("b", _entry(title="B")),
+        ("c", _entry(title="a", year="2000", pages="1--2")),
+    ]
+    merged = dedupe.merge_duplicates(entries, [[0, 2]])
+    assert list(merged) == ["a", "b"]
+    assert merged["a"].fields == {"title": "A", "year": "2000", "pages": "1--2"}
+    assert entries[2][1].fields["title"] == "a"
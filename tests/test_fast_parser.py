@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+from pybtex.database.input import bibtex
+from pybtex.scanner import PybtexSyntaxError
+
+from bibfmt import fast_parser
+
+
+if TYPE_CHECKING:
+    from pybtex.database import BibliographyData
+
+
+CORPUS = [
+    pytest.param(
+        "@article{a, title = {Title}, year = 2000}",
+        id="basic",
+    ),
+    pytest.param(
+        "@Article{A,\n  Title = {A {Nested {Deep}} title},\n  Journal = {J},\n}",
+        id="nested_case",
+    ),
+    pytest.param(
+        '@misc{a, note = "Quoted {with "quotes"} inside"}',
+        id="quoted",
+    ),
+    pytest.param(
+        "@book(a, title = {Paren ) body})",
+        id="paren_body",
+    ),
+    pytest.param(
+        '@string{jsc = "J. Sci."}\n@STRING(x = jsc # { Comput.})\n'
+        "@article{a, journal = x # { } # 2000, month = AUG}",
+        id="macros",
+    ),
+    pytest.param(
+        '@preamble{ "\\newcommand{\\noopsort}[1]{}" # { x }}\n@misc{a,}',
+        id="preamble",
+    ),
+    pytest.param(
+        "junk text\n@comment{not an @misc{entry, title = {x}}}\n@misc{b}",
+        id="comment",
+    ),
+    pytest.param(
+        "@article{a,\n  author = {Doe, John and von Neumann, Jr, John and Jane Roe},"
+        "\n  editor = {{Barnes and Noble} and D{\\'e}j{\\`a} Vu},\n}",
+        id="persons",
+    ),
+    pytest.param(
+        "@article{a,\n  title = {Lots \t of\n\n   whitespace   },\n"
+        '  abstract = "  leading",,\n}',
+        id="whitespace",
+    ),
+    pytest.param(
+        "@article{a, url = {https://x.org/?q=a%20b#frag}, pages = {1--2}}"
+        "\n@inproceedings{b:2000-x, booktitle = {Proc.}}",
+        id="special_chars",
+    ),
+]
+
+
+def _normalize(data: BibliographyData) -> tuple:
+    return (
+        data._preamble,
+        [
+            (
+                key,
+                entry.type,
+                list(entry.fields.items()),
+                [
+                    (
+                        role,
+                        [
+                            (
+                                p.first_names,
+                                p.middle_names,
+                                p.prelast_names,
+                                p.last_names,
+                                p.lineage_names,
+                            )
+                            for p in persons
+                        ],
+                    )
+                    for role, persons in entry.persons.items()
+                ],
+            )
+            for key, entry in data.entries.items()
+        ],
+    )
+
+
+@pytest.mark.parametrize("text", CORPUS)
+def test_conformance(text: str) -> None:
+    ref = bibtex.Parser().parse_string(text)
+    data = fast_parser.Parser().parse_string(text)
+    assert _normalize(data) == _normalize(ref)
+
+
+def test_macros_persist() -> None:
+    parser = fast_parser.Parser()
+    parser.parse_string('@string{x = "X"}')
+    data = parser.parse_string("@misc{a, note = x}")
+    assert data.entries["a"].fields["note"] == "X"
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        pytest.param("@article{a, title = {x}", id="premature_eof"),
+        pytest.param("@article{a, title = undefined}", id="undefined_macro"),
+        pytest.param("@article{a, title = {x} title = {y}}", id="missing_comma"),
+        pytest.param(
+            "@article{a, author = {A, B, C, D}, title = {x}", id="eof_after_bad_name"
+        ),
+    ],
+)
+def test_fallback_errors(text: str) -> None:
+    with pytest.raises(PybtexSyntaxError) as ref:
+        bibtex.Parser().parse_string(text)
+    with pytest.raises(PybtexSyntaxError) as e:
+        fast_parser.Parser().parse_string(text)
+    assert str(e.value) == str(ref.value)
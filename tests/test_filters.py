@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import pytest
+from pybtex.database import Entry
+
+from bibfmt import filters, model, pipeline
+
+
+def test_matcher() -> None:
+    matcher = filters.Matcher(["File", "mendeley-*", "/^x-/"])
+    assert matcher.names == {"file"}
+    assert [
+        name
+        for name in ["file", "mendeley-tags", "x-custom", "prefix-x-", "title"]
+        if matcher(name)
+    ] == ["file", "mendeley-tags", "x-custom"]
+
+
+def test_matcher_invalid() -> None:
+    with pytest.raises(ValueError, match=r"Invalid regular expression '/\(/'"):
+        filters.Matcher(["/(/"])
+
+
+@pytest.mark.parametrize(
+    ("rule", "expected"),
+    [
+        ("note", (None, "note")),
+        ("misc:note", ("misc", "note")),
+        ("*thesis:/a:b/", ("*thesis", "/a:b/")),
+        ("/a:b/", (None, "/a:b/")),
+    ],
+)
+def test_split_rule(rule: str, expected: tuple[str | None, str]) -> None:
+    assert filters.split_rule(rule) == expected
+
+
+@pytest.mark.parametrize(
+    ("spec", "expected"),
+    [
+        ("abstract=100", ("abstract", 100)),
+        ("a*=4K", ("a*", 4096)),
+        ("x=1MiB", ("x", 1 << 20)),
+    ],
+)
+def test_parse_max_size(spec: str, expected: tuple[str, int]) -> None:
+    assert filters.parse_max_size(spec) == expected
+
+
+@pytest.mark.parametrize("spec", ["abstract", "=4K", "abstract=4X"])
+def test_parse_max_size_invalid(spec: str) -> None:
+    with pytest.raises(ValueError, match="Invalid size"):
+        filters.parse_max_size(spec)
+
+
+@pytest.mark.parametrize("entry_type", [Entry, model.Entry])
+def test_field_filter(entry_type: type[Entry | model.Entry]) -> None:
+    fields = {
+        "Title": "T",
+        "abstract": "ü" * 6,
+        "File": "f.pdf",
+        "mendeley-tags": "x",
+        "note": "n",
+        "school": "s",
+    }
+    d = {
+        "a": entry_type("misc", fields),
+        "b": entry_type("article", fields),
+        "c": entry_type("phdthesis", fields),
+    }
+    field_filter = filters.FieldFilter(
+        drop=["file", "mendeley-*", "misc:note"],
+        keep=["*thesis:/^(title|school)$/"],
+        max_size={"abstract": 10},
+    )
+    assert field_filter.fields is None
+    field_filter.filter(d)
+    assert {key: [k.lower() for k in entry.fields] for key, entry in d.items()} == {
+        "a": ["title", "school"],
+        "b": ["title", "note", "school"],
+        "c": ["title", "school"],
+    }
+
+
+def test_drop_fields_transform() -> None:
+    transform = pipeline.DropFields(["Note", "file"])
+    assert transform.fields == {"note", "file"}
+    entry = Entry("misc", {"NOTE": "n", "title": "t"})
+    transform(entry)
+    assert dict(entry.fields) == {"title": "t"}
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from bibfmt import inputs
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+TEXT = "@misc{k,\r\n  note = {Müller},\r}\n"
+
+
+@pytest.mark.parametrize("mmap", [False, True], ids=["read", "mmap"])
+def test_read_text(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, *, mmap: bool
+) -> None:
+    if mmap:
+        monkeypatch.setattr(inputs, "MMAP_MIN_SIZE", 1)
+    path = tmp_path / "test.bib"
+    path.write_bytes(TEXT.encode("utf-8"))
+    with path.open(encoding="utf-8") as f:
+        expected = f.read()
+    assert (
+        inputs.read_text(path, "utf-8")
+        == expected
+        == "@misc{k,\n  note = {Müller},\n}\n"
+    )
+
+
+def test_read_text_empty(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(inputs, "MMAP_MIN_SIZE", 0)
+    path = tmp_path / "test.bib"
+    path.touch()
+    assert inputs.read_text(path) == ""
+
+
+def test_input_file_lazy(tmp_path: Path) -> None:
+    path = tmp_path / "test.bib"
+    infile = inputs.InputFile(path, "utf-8")
+    # The file doesn’t need to exist until it is read
+    path.write_text("@misc{k}", encoding="utf-8")
+    with infile:
+        assert infile.read() == "@misc{k}"
+        assert infile._file is None
+        assert infile.read() == ""
+
+
+def test_input_file_chunks(tmp_path: Path) -> None:
+    path = tmp_path / "test.bib"
+    path.write_text("@misc{k}", encoding="utf-8")
+    with inputs.InputFile(path, "utf-8") as infile:
+        assert infile.read(3) == "@mi"
+        assert infile.read() == "sc{k}"
+    assert infile._file is None
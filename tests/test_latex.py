@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import string
+
+import pybtex.database
+import pytest
+from pylatexenc.latex2text import LatexNodes2Text
+from pylatexenc.latexencode import unicode_to_latex
+
+import bibfmt
+from bibfmt import latex
+
+
+SAMPLES = [
+    *string.printable.replace("\x0b", "").replace("\x0c", ""),
+    *("a--b", "``quoted''", "!`Hola!", "?`Qu\\'e?", "50\\%", "$x$", "a~b"),
+    *("Müller", "Erd{\\H{o}}s", "{LaTeX}", "plain text", "O'Neil", "1--2"),
+]
+
+
+@pytest.mark.parametrize("value", SAMPLES)
+def test_same_as_pylatexenc(value: str) -> None:
+    assert latex.latex_to_text(value) == LatexNodes2Text().latex_to_text(value)
+    assert latex.text_to_latex(value) == unicode_to_latex(value)
+
+
+def test_decode_all() -> None:
+    entries = {
+        "a": pybtex.database.Entry(
+            "article", fields={"title": 'M{\\"u}ller', "url": "a%20b"}
+        ),
+        "b": pybtex.database.Entry("article", fields={"title": "Plain"}),
+    }
+    decoded = bibfmt.decode_all(entries)
+    assert dict(decoded["a"].fields) == {"title": "Müller", "url": "a%20b"}
+    assert dict(decoded["b"].fields) == {"title": "Plain"}
+    assert entries["a"].fields["title"] == 'M{\\"u}ller'
+
+
+def test_decode_copies_persons() -> None:
+    author = pybtex.database.Person("Doe, John")
+    entry = pybtex.database.Entry("article", persons={"author": [author]})
+    decoded = bibfmt.decode(entry)
+    decoded.persons["author"].append(pybtex.database.Person("Roe, Jane"))
+    assert entry.persons["author"] == [author]
+
+
+def test_pybtex_to_dicts() -> None:
+    entries = {
+        "a": pybtex.database.Entry(
+            "article", persons={"author": [pybtex.database.Person("Müller, Jürgen")]}
+        )
+    }
+    assert bibfmt.pybtex_to_dicts(entries) == {
+        "a": {
+            "genre": "article",
+            "author": [
+                {
+                    "first": ['J\\"urgen'],
+                    "middle": [],
+                    "prelast": [],
+                    "last": ['M\\"uller'],
+                    "lineage": [],
+                }
+            ],
+        }
+    }
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import gc
+import sys
+import weakref
+
+import pybtex.database
+
+from bibfmt import model, tools
+
+
+BIBTEX = r"""
+@Article{key,
+  Author = {Doe, Jr., John and van der Berg, Jane},
+  Title  = {A {T}itle},
+  Pages  = {1--2},
+}
+"""
+
+
+def test_roundtrip() -> None:
+    data = pybtex.database.parse_string(BIBTEX, "bibtex")
+    entries = model.from_pybtex(data.entries)
+    entry = entries["key"]
+    assert entry.type == "article"
+    assert entry.fields == {"title": "A {T}itle", "pages": "1--2"}
+    [john, jane] = entry.persons["author"]
+    assert john.lineage_names == ("Jr.",)
+    assert jane.prelast_names == ("van", "der")
+    assert model.from_pybtex(model.to_pybtex(entries).entries) == entries
+
+
+def test_interned() -> None:
+    name = "TITLE".lower()  # not the interned constant
+    entry = model.Entry("article", {name: "x"})
+    [key] = entry.fields
+    assert key is sys.intern("title")
+
+
+def test_format_same_as_pybtex() -> None:
+    data = pybtex.database.parse_string(BIBTEX, "bibtex")
+    entries = model.from_pybtex(data.entries)
+    assert tools.dict_to_string(entries, "braces") == tools.dict_to_string(
+        data.entries, "braces"
+    )
+    assert tools.pybtex_to_dict(entries["key"]) == tools.pybtex_to_dict(
+        data.entries["key"]
+    )
+
+
+def test_decode_copies() -> None:
+    entry = model.Entry("misc", {"note": r"\"o"})
+    out = tools.decode(entry)
+    assert out.fields == {"note": "ö"}
+    assert entry.fields == {"note": r"\"o"}
+
+
+def test_pop_pybtex() -> None:
+    data = pybtex.database.parse_string(BIBTEX + "@misc{other}", "bibtex")
+    expected = model.from_pybtex(data.entries)
+    pybtex_entry = weakref.ref(data.entries["key"])
+    entries = model.pop_pybtex(data.entries)
+    assert list(entries.items()) == list(expected.items())
+    # pybtex’s copy can be freed while the converted entries are in use
+    assert not data.entries
+    gc.collect()
+    assert pybtex_entry() is None
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+from pybtex.database import Entry
+
+from bibfmt import normalize, tools
+
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+
+@pytest.fixture
+def registered() -> Iterator[list[normalize.Rule]]:
+    rules = normalize._registered.copy()
+    yield normalize._registered
+    normalize._registered[:] = rules
+    normalize.normalizer.cache_clear()
+
+
+def test_page_range_separator() -> None:
+    d = {
+        "a": Entry("article", fields={"pages": "1\N{EN DASH}2", "note": "a-b"}),
+        "b": Entry("article", fields={"Pages": "3---4"}),
+        "c": Entry("article", fields={"title": "x"}),
+    }
+    tools.set_page_range_separator(d, "\\,--")
+    assert dict(d["a"].fields) == {"pages": "1\\,--2", "note": "a-b"}
+    assert dict(d["b"].fields) == {"pages": "3\\,--4"}
+
+
+def test_remove_multiple_spaces() -> None:
+    d = {
+        "a": Entry(
+            "article",
+            fields={"title": "A  b   c ", "url": "x  y", "year": 2000},
+        )
+    }
+    tools.remove_multiple_spaces(d)
+    assert dict(d["a"].fields) == {"title": "A b c", "url": "x  y", "year": 2000}
+
+
+def test_fused_translate_rules() -> None:
+    normalizer = normalize.Normalizer(
+        [
+            normalize.TranslateRule({"a": "b", "x": None}),
+            normalize.TranslateRule({"b": "c"}),
+            normalize.RegexRule("c+", "C"),
+            normalize.TranslateRule({"C": "D"}, fields=["title"]),
+        ]
+    )
+    [translate, regex, _] = normalizer.steps("Title")
+    assert isinstance(translate, normalize.TranslateRule)
+    assert translate.table == {ord("a"): "c", ord("b"): "c", ord("x"): None}
+    assert isinstance(regex, normalize.RegexRule)
+    assert len(normalizer.steps("note")) == 2  # noqa: PLR2004
+    assert normalizer.normalize_value("title", "xabcd") == "Dd"
+    assert normalizer.normalize_value("note", "xabcd") == "Cd"
+
+
+def test_register(registered: list[normalize.Rule]) -> None:
+    normalize.register(normalize.TranslateRule({"\N{NO-BREAK SPACE}": " "}))
+    assert len(registered) == 1
+    d = {"a": Entry("article", fields={"pages": "1-2", "note": "a\N{NO-BREAK SPACE}b"})}
+    normalize.normalize(d, page_range_separator="--")
+    assert dict(d["a"].fields) == {"pages": "1--2", "note": "a b"}
+
+
+def test_rule_abstract() -> None:
+    class Incomplete(normalize.Rule):
+        pass
+
+    with pytest.raises(TypeError, match="abstract"):
+        Incomplete()  # type: ignore[abstract]
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import pytest
+
+from bibfmt import parallel, tools
+from bibfmt.model import from_pybtex
+from bibfmt.pipeline import default_pipeline
+from bibfmt.sort import sort_entries
+
+
+BIBTEX = "\n".join(
+    [
+        '@string{j = "Journal"}',
+        '@preamble{"\\RequirePackage{biblatex}"}',
+        *(
+            f'@article{{key{i}, author = {{Doe, J. and M{{\\"u}}ller, K.}}, '
+            f"journal = j, pages = {{{i}--{i + 1}}}, title = {{Title {i}}}}}"
+            for i in range(50, 0, -1)
+        ),
+        '@string{k = "Other"}',
+        "@book{book, title = k, url = {https://dx.doi.org/10.1/x}}",
+    ]
+)
+
+
+def test_split() -> None:
+    chunks = list(parallel.split(BIBTEX, 500))
+    assert len(chunks) > 2  # noqa: PLR2004
+    assert chunks[0][0] == ""
+    assert all(context == '@string{j = "Journal"}' for context, _, _ in chunks[1:-1])
+    lines = BIBTEX.splitlines()
+    for _, chunk, line in chunks:
+        assert chunk.splitlines()[0] == lines[line - 1]
+
+
+@pytest.mark.parametrize("sort_by", [None, "key", "pages"])
+def test_format_text(sort_by: str | None) -> None:
+    data = tools.new_parser().parse_string(BIBTEX)
+    d = from_pybtex(data.entries)
+    default_pipeline().run(d)
+    if sort_by:
+        d = sort_entries(d, sort_by)
+    expected = tools.dict_to_string(d, "braces", preamble=data._preamble)
+
+    string = parallel.format_text(BIBTEX, jobs=2, sort_by=sort_by, chunk_size=500)
+    assert string == expected
+
+
+def test_format_text_error(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(parallel, "MIN_CHUNK_SIZE", 0)
+    text = f"{BIBTEX}\n@article{{bad,\n  title = {{x}} y}}\n"
+    line = len(BIBTEX.splitlines()) + 2
+    with pytest.raises(
+        RuntimeError, match=rf"^There was an error when parsing x\.bib: .* line {line}:"
+    ):
+        parallel.format_text(text, "x.bib", jobs=2, chunk_size=500)
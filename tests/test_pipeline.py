@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import pytest
+from pybtex.database import Entry
+
+from bibfmt import pipeline, profile
+
+
+def test_fields_relevance() -> None:
+    seen: list[str] = []
+    d = {
+        "a": Entry("article", fields={"URL": "https://dx.doi.org/10.1/x"}),
+        "b": Entry("article", fields={"note": "x"}),
+    }
+    p = pipeline.Pipeline(
+        [
+            pipeline.AdaptDoiUrls("new"),
+            pipeline.FunctionTransform(
+                lambda e: seen.append(e.fields["note"]), fields=["Note"]
+            ),
+        ]
+    )
+    p.run(d)
+    assert d["a"].fields["url"] == "https://doi.org/10.1/x"
+    assert seen == ["x"]
+
+
+def test_passes() -> None:
+    new, short = pipeline.AdaptDoiUrls("new"), pipeline.AdaptDoiUrls("short")
+    drop = pipeline.DropFields(["note"])
+    assert pipeline.Pipeline([short, drop]).passes() == [[short, drop]]
+    assert pipeline.Pipeline([drop, new]).passes() == [[drop, new]]
+    assert pipeline.Pipeline([drop, short, new]).passes() == [[drop], [short, new]]
+
+
+def test_short_doi_after_drop(monkeypatch: pytest.MonkeyPatch) -> None:
+    looked_up: list[str] = []
+
+    def resolve_short_dois(dois: list[str], **_: object) -> dict[str, str]:
+        looked_up.extend(dois)
+        return dict.fromkeys(looked_up, "abc")
+
+    monkeypatch.setattr(pipeline, "resolve_short_dois", resolve_short_dois)
+    d = {
+        "a": Entry("article", fields={"url": "https://doi.org/10.1/a"}),
+        "b": Entry("article", fields={"url": "https://doi.org/10.1/b", "x": "1"}),
+    }
+    p = pipeline.Pipeline(
+        [
+            pipeline.FunctionTransform(
+                lambda e: e.fields.pop("x", None) or e.fields.pop("url")
+            ),
+            pipeline.AdaptDoiUrls("short"),
+        ]
+    )
+    p.run(d)
+    assert looked_up == ["10.1/b"]
+    assert dict(d["a"].fields) == {}
+    assert dict(d["b"].fields) == {"url": "https://doi.org/abc"}
+
+
+def test_profile_stages(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(
+        pipeline, "resolve_short_dois", lambda dois, **_: dict.fromkeys(dois, "abc")
+    )
+    d = {"a": Entry("article", fields={"url": "https://doi.org/10.1/a"})}
+    p = pipeline.Pipeline(
+        [pipeline.DropFields(["note"]), pipeline.AdaptDoiUrls("short")]
+    )
+    with profile.collect() as collected:
+        p.run(d, file="test.bib")
+    assert [(s.file, s.stage, s.entries) for s in collected] == [
+        ("test.bib", "filter_fields", 1),
+        ("test.bib", "adapt_doi_urls.prepare", 1),
+        ("test.bib", "adapt_doi_urls", 1),
+    ]
+
+
+def test_transform_abstract() -> None:
+    class Incomplete(pipeline.Transform):
+        pass
+
+    with pytest.raises(TypeError, match="abstract"):
+        Incomplete()  # type: ignore[abstract]
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import io
+import json
+
+from pybtex.database import BibliographyData, Entry
+
+from bibfmt import profile
+
+
+def test_stage_disabled() -> None:
+    with profile.stage("parse", "test.bib") as stats:
+        assert stats is None
+
+
+def test_stage_hooks() -> None:
+    records: list[profile.StageStats] = []
+    profile.add_hook(records.append)
+    try:
+        with profile.stage("parse", "test.bib", bytes_in=10) as stats:
+            assert stats is not None
+            stats.entries = 2
+        with (
+            profile.collect() as collected,
+            profile.stage("format", "test.bib", entries=2),
+        ):
+            pass
+    finally:
+        profile.remove_hook(records.append)
+    assert not profile.is_enabled()
+
+    [parse] = records
+    assert (parse.file, parse.stage, parse.entries, parse.bytes_in) == (
+        "test.bib",
+        "parse",
+        2,
+        10,
+    )
+    assert parse.wall_time >= 0
+    assert parse.cpu_time >= 0
+    [format_] = collected
+    assert format_.stage == "format"
+
+
+def test_profiler() -> None:
+    profiler = profile.Profiler()
+    for _ in range(2):
+        stats = profile.StageStats("test.bib", "format")
+        stats.entries = 3
+        stats.bytes_out = 100
+        stats.wall_time = 0.5
+        profiler(stats)
+
+    out = io.StringIO()
+    profiler.write_json_lines(out)
+    [line] = out.getvalue().splitlines()
+    assert json.loads(line) == {
+        "file": "test.bib",
+        "stage": "format",
+        "wall_time": 1.0,
+        "cpu_time": 0.0,
+        "entries": 6,
+        "bytes_in": 0,
+        "bytes_out": 200,
+        "max_rss": None,
+    }
+
+    out = io.StringIO()
+    profiler.print_table(out)
+    assert "format" in out.getvalue()
+
+
+def test_profile_pipeline() -> None:
+    from bibfmt.cli._main import FormatArgs, _transform, parser
+
+    args = parser().parse_args(["--drop=note", "-"], namespace=FormatArgs())
+    data = BibliographyData({"k": Entry("article", fields={"note": "x"})})
+    profiler = profile.Profiler()
+    profile.add_hook(profiler)
+    try:
+        _transform(data, args, "test.bib")
+    finally:
+        profile.remove_hook(profiler)
+
+    assert [stage for _, stage in profiler.stats] == [
+        "filter_fields",
+        "adapt_doi_urls",
+        "normalize",
+    ]
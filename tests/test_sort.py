@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import locale
+import random
+
+import pytest
+
+from bibfmt import sort
+from bibfmt.model import Entry, Person
+
+
+ENTRIES = {
+    "b": Entry("article", {"year": "2020", "title": '{\\"U}ber'}),
+    "A": Entry("article", {"year": "2019a", "title": "zebra"}),
+    "c": Entry("misc", {"title": "apple"}),
+    "d": Entry("article", {"year": "in press", "title": "Apple"}),
+    "e": Entry("book", {"year": "2019"}),
+}
+
+
+@pytest.mark.parametrize(
+    ("by", "expected"),
+    [
+        pytest.param("key", ["A", "b", "c", "d", "e"], id="key"),
+        pytest.param("year", ["e", "A", "b", "d", "c"], id="year"),
+        # Case-insensitive and stable, LaTeX is converted, missing fields come last
+        pytest.param("title", ["c", "d", "b", "A", "e"], id="title"),
+    ],
+)
+def test_sort_entries(by: str, expected: list[str]) -> None:
+    assert list(sort.sort_entries(ENTRIES, by)) == expected
+
+
+def test_sort_by_key() -> None:
+    d = dict.fromkeys(["beta", "_x", "Zeta", "Alpha"], Entry("misc"))
+    assert list(sort.sort_entries(d, "key")) == ["Alpha", "Zeta", "_x", "beta"]
+
+
+def test_use_locale() -> None:
+    sort.use_locale()
+    try:
+        assert sort.sort_key("key", "b") > sort.sort_key("key", "Z")
+    finally:
+        sort.use_locale(enable=False)
+    assert locale.setlocale(locale.LC_COLLATE) == "C"
+
+
+def test_sort_by_author() -> None:
+    d = {
+        "x": Entry("misc", persons={"author": [Person(["Jane"], last_names=["Roe"])]}),
+        "y": Entry("misc"),
+        "z": Entry(
+            "misc",
+            persons={"editor": [Person(["John"], last_names=['M{\\"u}ller'])]},
+        ),
+        "w": Entry("misc", persons={"author": [Person(["Anna"], last_names=["Roe"])]}),
+    }
+    assert list(sort.sort_entries(d, "author")) == ["z", "w", "x", "y"]
+
+
+@pytest.mark.parametrize("run_size", [1 << 20, 100, 1])
+def test_external_sorter(monkeypatch: pytest.MonkeyPatch, run_size: int) -> None:
+    monkeypatch.setattr(sort, "MAX_RUNS", 4)
+    rng = random.Random(0)  # noqa: S311
+    items = [((rng.randrange(20),), f"item{i}") for i in range(200)]
+
+    with sort.ExternalSorter(run_size=run_size) as sorter:
+        for key, string in items:
+            sorter.add(key, string)
+        assert sorter.runs <= sort.MAX_RUNS
+        assert (sorter.runs == 0) == (run_size > 1000)  # noqa: PLR2004
+        result = list(sorter)
+
+    # The sort is stable
+    assert result == [string for _, string in sorted(items, key=lambda i: i[0])]
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import io
+
+import pytest
+from pybtex.database.input import bibtex
+
+import bibfmt
+from bibfmt.stream import iter_bibliography, iter_commands, write_segments
+
+
+TEST_BIBTEX = """\
+Some text before the first entry.
+@string{jsc = "J. Sci. Comput."}
+@preamble{"\\RequirePackage{biblatex}"}
+@comment{this is ignored}
+@article{a,
+  title = {A {Nested} title},
+  author = "Doe, John and Roe, Jane",
+  journal = jsc,
+  month = mar,
+  year = 2000,
+}
+@Book(b,
+  title = "Parens ) in quotes",
+  pages = {1--2}
+)
+@misc{c, note = {x} # " and " # {y}}
+"""
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 16])
+def test_iter_commands(chunk_size: int) -> None:
+    commands = list(iter_commands(io.StringIO(TEST_BIBTEX), chunk_size))
+    assert [c.split("{")[0].split("(")[0] for c in commands] == [
+        "@string",
+        "@preamble",
+        "@article",
+        "@Book",
+        "@misc",
+    ]
+    assert commands[3].endswith(")")
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 16])
+def test_stream_matches_parser(chunk_size: int) -> None:
+    ref = bibtex.Parser().parse_string(TEST_BIBTEX)
+    infile = io.StringIO(TEST_BIBTEX)
+    infile.name = "test.bib"
+
+    segments = []
+    for data in iter_bibliography(infile, chunk_size):
+        segments.extend(
+            bibfmt.tools.iter_segments(
+                data.entries,
+                "braces",
+                preamble=data._preamble,
+            )
+        )
+    out = io.StringIO()
+    write_segments(segments, out)
+
+    assert out.getvalue() == bibfmt.dict_to_string(
+        ref.entries, "braces", preamble=ref._preamble
+    )
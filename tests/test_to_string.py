@@ -1,11 +1,18 @@
 from __future__ import annotations
 
+import gzip
+from typing import TYPE_CHECKING
+
 import pytest
 from pybtex.database import Entry, Person
 
 import bibfmt
 
 
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
 @pytest.mark.parametrize(
     ("ref_entry", "ref_str"),
     [
@@ -74,3 +81,29 @@ import bibfmt
 )
 def test_cli_format(ref_entry: Entry, ref_str: list[str]) -> None:
     assert bibfmt.pybtex_to_bibtex_string(ref_entry, "foobar", align=7) == ref_str
+
+
+@pytest.mark.parametrize("mode", ["w", "wb", "wb0"], ids=["text", "binary", "raw"])
+@pytest.mark.parametrize("n_entries", [0, 2])
+def test_dump(tmp_path: Path, mode: str, n_entries: int) -> None:
+    d = {f"k{i}": Entry("misc", fields={"title": "Müller"}) for i in range(n_entries)}
+    preamble = ["\\newcommand{\\x}{y}"]
+    path = tmp_path / "out.bib"
+    encoding = None if "b" in mode else "utf-8"
+    buffering = 0 if mode == "wb0" else -1
+    with path.open(mode[:2], buffering=buffering, encoding=encoding) as f:
+        bibfmt.dump(d, f, "quotes", indent="tab", preamble=preamble)
+        assert not f.closed
+    assert (
+        path.read_bytes()
+        == bibfmt.dict_to_string(d, "quotes", indent="tab", preamble=preamble).encode()
+    )
+
+
+def test_dump_gzip(tmp_path: Path) -> None:
+    d = {"k": Entry("misc", fields={"title": "Müller"})}
+    path = tmp_path / "out.bib.gz"
+    with gzip.open(path, "wb") as f:
+        bibfmt.dump(d, f)
+    expected = bibfmt.dict_to_string(d, "braces").encode()
+    assert gzip.decompress(path.read_bytes()) == expected
@@ -1,9 +1,16 @@
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
 import pybtex
 import pybtex.database
 
 import bibfmt
+from bibfmt import tools
+
+
+if TYPE_CHECKING:
+    import pytest
 
 
 def test_merge() -> None:
@@ -52,3 +59,38 @@ def test_decode_doi() -> None:
     )
     out = bibfmt.decode(d)
     assert out.fields["doi"] == doi
+
+
+def test_month_unknown(caplog: pytest.LogCaptureFixture) -> None:
+    # Unknown months are cached, but still warned about each time
+    months = [bibfmt.translate_month("????") for _ in range(2)]
+    assert months == [None, None]
+    assert [r.message for r in caplog.records] == [
+        "Unknown month value '????'. Skipping."
+    ] * len(months)
+
+
+def test_format_cache() -> None:
+    entry = pybtex.database.Entry(
+        "article",
+        fields={"journal": "Nature", "month": "3", "title": "Yes"},
+        persons={"author": [pybtex.database.Person("Doe, John")]},
+    )
+    tools.format_cache_clear()
+    first = bibfmt.pybtex_to_bibtex_string(entry, "key")
+    second = bibfmt.pybtex_to_bibtex_string(entry, "key2")
+    assert second == first.replace("{key,", "{key2,")
+    assert first == (
+        "@article{key,\n"
+        " author  = {Doe, John},\n"
+        " journal = {Nature},\n"
+        " month   = {mar},\n"
+        " title   = {Yes},\n"
+        "}"
+    ).replace("\n ", "\n  ")
+    # The title line isn’t cached
+    hits = {name: info.hits for name, info in tools.format_cache_info().items()}
+    assert hits == {"persons": 1, "month": 1, "field_line": 3}
+    assert bibfmt.pybtex_to_bibtex_string(pybtex.database.Entry("misc"), "k") == (
+        "@misc{k,\n  }"
+    )
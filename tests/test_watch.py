@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import sys
+from typing import TYPE_CHECKING
+
+import pytest
+
+from bibfmt import watch
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_polling(tmp_path: Path) -> None:
+    (tmp_path / "old.bib").write_text("")
+    watcher = watch.PollingWatcher(tmp_path)
+    assert watcher.changes() == set()
+
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "new.bib").write_text("")
+    (tmp_path / "new.txt").write_text("")
+    assert watcher.changes() == {tmp_path / "sub" / "new.bib"}
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="needs inotify")
+def test_inotify(tmp_path: Path) -> None:
+    watcher = watch.InotifyWatcher(tmp_path)
+    try:
+        assert not watcher.wait(0)
+
+        (tmp_path / "new.bib").write_text("")
+        (tmp_path / "new.txt").write_text("")
+        assert watcher.wait(1)
+        assert watcher.changes() == {tmp_path / "new.bib"}
+
+        # New directories are watched as well
+        (tmp_path / "sub").mkdir()
+        assert watcher.wait(1)
+        assert watcher.changes() == set()
+        (tmp_path / "sub" / "new.bib").write_text("")
+        assert watcher.wait(1)
+        assert watcher.changes() == {tmp_path / "sub" / "new.bib"}
+    finally:
+        watcher.close()
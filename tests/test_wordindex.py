@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from bibfmt import wordindex
+from bibfmt.wordindex import WordIndex, build_word_index
+
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+WORDS = ["gaussian", "Gaussian", "kernel", "über", "a", "zebra", "kernels"]
+
+
+@pytest.fixture
+def index(tmp_path: Path) -> WordIndex:
+    path = tmp_path / "words.idx"
+    build_word_index(WORDS, path)
+    return WordIndex(path)
+
+
+def test_contains(index: WordIndex) -> None:
+    for word in WORDS:
+        assert word in index
+    for word in ["", "kerne", "kernelss", "GAUSSIAN", "uber", "zzz", 1]:
+        assert word not in index
+
+
+def test_set(index: WordIndex) -> None:
+    assert len(index) == len(WORDS)
+    assert set(index) == set(WORDS)
+    assert index == set(WORDS)
+
+
+def test_invalid(tmp_path: Path) -> None:
+    path = tmp_path / "words.idx"
+    path.write_bytes(b"not an index")
+    with pytest.raises(ValueError, match="Not a word index"):
+        WordIndex(path)
+
+
+@pytest.mark.parametrize("size", [1, 20, 40, 80, -1])
+def test_truncated(tmp_path: Path, size: int) -> None:
+    path = tmp_path / "words.idx"
+    build_word_index(WORDS, path)
+    path.write_bytes(path.read_bytes()[:size])
+    with pytest.raises(ValueError, match="word index"):
+        WordIndex(path)
+
+
+def test_load_truncated(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    import platformdirs
+
+    monkeypatch.setattr(platformdirs, "user_cache_dir", lambda _: str(tmp_path))
+    first = wordindex.load_word_index()
+    assert isinstance(first, WordIndex)
+    [path] = tmp_path.iterdir()
+    # Replace the file, as truncating it would break the mapping of `first`
+    truncated = tmp_path / "truncated"
+    truncated.write_bytes(path.read_bytes()[:1000])
+    truncated.replace(path)
+    # The index is built again
+    assert wordindex.load_word_index() == first